@@ -1,63 +1,205 @@
 # app.py (Part 1 - First Half)
 import os
+import copy
 import hashlib
-from datetime import datetime, timedelta
-from flask import Flask, request, redirect, session
+import json
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from http.cookies import CookieError, SimpleCookie
+from functools import lru_cache, wraps
+from zoneinfo import ZoneInfo
+from flask import Flask, g, request, redirect, render_template, url_for
+from markupsafe import Markup
+from werkzeug.middleware.proxy_fix import ProxyFix
+from models import Assignment, QUESTION_BANK
+from storage import open_storage
+from assets import AssetStore, pick_encoding, compress, is_compressible
+from cache import LRUCache
+from deadlines import DeadlineScheduler
+from drafts import DraftBuffer
+from similarity import AnswerIndex
+from scorers import SCORERS, TfidfScorer, register_scorer
+from reference_answers import REFERENCE_ANSWERS
+from metrics import Metrics
+from passwords import PasswordChecker, hash_password, needs_rehash
+from ratelimit import TokenBuckets
+from sessions import SessionStore
+from profiling import StackSampler, install as install_timing, request_summary, span, time_methods
 
 # Create Flask app
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'pd-secret-key')
 
-# Global data
-users = {}
-assignments = {}
-counter = 0
+# Proxies between clients and the app (Railway's edge is one). Each
+# appends the address it received the request from to X-Forwarded-For,
+# and request.remote_addr is taken that many entries from the right.
+# The failed-login limit per client address depends on this: with too
+# few, every client has the proxy's address and one client's failures
+# lock everyone out; with too many, clients can pick their own address.
+# Set 0 when clients connect to gunicorn directly.
+TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 1))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES, x_proto=TRUSTED_PROXIES)
 
-def hash_pass(pwd):
-    return hashlib.sha256(pwd.encode()).hexdigest()
+# Counters and histograms served at /metrics. Under gunicorn every
+# worker writes its own to METRICS_DIR and /metrics adds them up.
+metrics = Metrics(os.environ.get('METRICS_DIR'))
+metrics.describe('pd_submissions_total', 'counter', 'Tests submitted, by topic')
+metrics.describe('pd_autoscore_duration_seconds', 'histogram',
+                 'Time from submission to auto-scores being saved, by topic')
+metrics.describe('pd_tests', 'gauge', 'Tests by status (submitted = awaiting review)')
+metrics.describe('pd_assignments_bytes', 'gauge', 'Estimated size of the stored assignment records')
+metrics.describe('pd_logins_total', 'counter', 'Login attempts, by outcome (ok, failed, limited, busy)')
+
+# Per-route latency histograms and spans (storage, render, scoring).
+# Set PROFILE_DIR to also sample request stacks and keep flamegraph
+# input (.folded) for the PROFILE_KEEP slowest requests per worker.
+PROFILE_DIR = os.environ.get('PROFILE_DIR')
+stack_sampler = StackSampler(
+    PROFILE_DIR,
+    float(os.environ.get('PROFILE_INTERVAL_MS', 5)) / 1000,
+    int(os.environ.get('PROFILE_KEEP', 20))
+) if PROFILE_DIR else None
+install_timing(app, metrics, stack_sampler)
+
+# Worker processes for auto-scoring submissions (0 = score in the request)
+SCORING_WORKERS = int(os.environ.get('SCORING_WORKERS', 2))
+# Their niceness: nothing waits on them, so when the CPU is short the
+# request threads go first
+SCORING_NICE = int(os.environ.get('SCORING_NICE', 10))
+
+# Tests are due this long after they are assigned
+TEST_DURATION = 2 * 24 * 3600  # 2 days, in seconds
+
+# Timestamps are stored as epoch seconds and shown in this zone
+# (an IANA name such as 'Asia/Kolkata'; the server's own zone if unset)
+DISPLAY_TIMEZONE = ZoneInfo(os.environ['TIMEZONE']) if os.environ.get('TIMEZONE') else None
+
+# Storage for users and assessments ('sqlite' survives restarts, 'memory' does not)
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'sqlite')
+DATABASE_PATH = os.environ.get('DATABASE_PATH', 'pd_assessment.db')
+storage = time_methods(open_storage(STORAGE_BACKEND, DATABASE_PATH), (
+    'get_user', 'save_user', 'list_users', 'next_test_number', 'reserve_test_numbers', 'get_test',
+    'save_test', 'save_tests', 'update_test', 'transition_test', 'merge_answers', 'list_deadlines',
+    'list_tests', 'count_tests', 'publish_events', 'get_session', 'save_session', 'delete_session',
+    'similar_answers'
+), 'storage')
+
+# Logins last SESSION_LIFETIME seconds. The SESSION_COOKIE cookie only
+# names a session; who it belongs to is kept in storage (sessions.py).
+SESSION_COOKIE = 'pd_session'
+SESSION_LIFETIME = int(os.environ.get('SESSION_LIFETIME', 7 * 24 * 3600))
+session_store = SessionStore(storage, SESSION_LIFETIME)
+
+# Expires pending tests at their due time; each worker also reloads the
+# pending deadlines every DEADLINE_RESYNC_SECONDS to pick up other workers' tests
+deadlines = DeadlineScheduler(
+    storage,
+    int(os.environ.get('DEADLINE_RESYNC_SECONDS', 30)),
+    on_expire=lambda test: publish((test.engineer_id, 'expired', {'test_id': test.id}))
+)
+
+# Event streams (async mode, asgi.py): how often each worker checks
+# storage for new events, and how long before a deadline engineers are warned
+EVENT_POLL_SECONDS = float(os.environ.get('EVENT_POLL_SECONDS', 0.5))
+DEADLINE_WARNING_SECONDS = 2 * 3600
+
+MAX_ANSWER_LENGTH = 20000
+
+# Largest engineers x topics product one bulk assignment may create
+MAX_BULK_ASSIGNMENTS = 10000
+
+# Passwords are checked on KDF_WORKERS threads per worker, each holding
+# on to scrypt's 16 MB once it has hashed. Past LOGIN_MAX_IN_FLIGHT
+# checks at once /login answers 503, which keeps at least one request
+# thread free for everything else during a login rush.
+KDF_WORKERS = int(os.environ.get('KDF_WORKERS', 2))
+LOGIN_MAX_IN_FLIGHT = int(os.environ.get('LOGIN_MAX_IN_FLIGHT', max(1, int(os.environ.get('WEB_THREADS', 4)) - 1)))
+password_checker = PasswordChecker(KDF_WORKERS, LOGIN_MAX_IN_FLIGHT)
+
+# Failed logins allowed per username and per client address: a burst,
+# then one every 12 (3) seconds. Successful logins are never limited, so
+# a whole cohort signing in from one office address is let through. The
+# address is the client's only with TRUSTED_PROXIES set right.
+failed_logins_by_user = TokenBuckets(burst=5, rate=1 / 12)
+failed_logins_by_address = TokenBuckets(burst=20, rate=1 / 3)
+
+# Fingerprinted, precompressed copies of everything under static/
+assets = AssetStore(app.static_folder)
 
-def check_pass(hashed, pwd):
-    return hashed == hashlib.sha256(pwd.encode()).hexdigest()
+def asset_url(name):
+    """URL for a static file that changes whenever its content does"""
+    return url_for('static', filename=name, v=assets.version(name))
 
-def is_overdue(due_date):
+app.jinja_env.globals['asset_url'] = asset_url
+
+# A test's timestamps never change, so each is formatted once per worker
+@app.template_filter('date')
+@lru_cache(maxsize=16384)
+def format_date(timestamp):
+    if not timestamp:
+        return ''
+    return datetime.fromtimestamp(timestamp, DISPLAY_TIMEZONE).strftime('%Y-%m-%d')
+
+@app.template_filter('datetime')
+@lru_cache(maxsize=16384)
+def format_datetime(timestamp):
+    if not timestamp:
+        return ''
+    return datetime.fromtimestamp(timestamp, DISPLAY_TIMEZONE).strftime('%Y-%m-%d %H:%M')
+
+# Rendered question cards for the review page, keyed by (test_id, revision)
+REVIEW_CACHE_BYTES = int(os.environ.get('REVIEW_CACHE_BYTES', 16 * 1024 * 1024))
+review_fragments = LRUCache(REVIEW_CACHE_BYTES)
+
+# Page templates, compiled once at import so (with preload_app) every
+# worker starts with them already in the Jinja cache
+PAGE_TEMPLATES = (
+    'login.html', 'admin.html', 'admin_review_list.html', 'admin_review_test.html',
+    'review_questions.html', 'student.html', 'student_test.html'
+)
+for name in PAGE_TEMPLATES:
+    app.jinja_env.get_template(name)
+
+def hash_pass(pwd):
+    return hash_password(pwd)
+
+def is_overdue(due):
     """Check if a test is overdue"""
-    try:
-        due = datetime.fromisoformat(due_date)
-        return datetime.now() > due
-    except:
-        return False
+    return time.time() > due
 
-def get_time_remaining(due_date):
+def get_time_remaining(due):
     """Get human-readable time remaining"""
-    try:
-        due = datetime.fromisoformat(due_date)
-        remaining = due - datetime.now()
-        
-        if remaining.total_seconds() <= 0:
-            return "OVERDUE"
-        
-        days = remaining.days
-        hours = remaining.seconds // 3600
-        
-        if days > 0:
-            return f"{days}d {hours}h remaining"
-        elif hours > 0:
-            return f"{hours}h remaining"
-        else:
-            minutes = (remaining.seconds % 3600) // 60
-            return f"{minutes}m remaining"
-    except:
-        return "Unknown"
+    remaining = int(due - time.time())
+    
+    if remaining <= 0:
+        return "OVERDUE"
+    
+    days, seconds = divmod(remaining, 86400)
+    hours = seconds // 3600
+    
+    if days > 0:
+        return f"{days}d {hours}h remaining"
+    elif hours > 0:
+        return f"{hours}h remaining"
+    else:
+        minutes = (seconds % 3600) // 60
+        return f"{minutes}m remaining"
 
 def init_data():
-    global users
-    users['admin'] = {
+    # The default passwords are printed on the login page, so every
+    # engineer shares one hash of theirs; a KDF run each would add a
+    # second or more to startup
+    engineer_password = hash_pass('password123')
+    storage.save_user({
         'id': 'admin',
         'username': 'admin',
         'password': hash_pass('Vibhuaya@3006'),
         'is_admin': True,
         'exp': 5
-    }
+    })
     
     # 18 Individual Engineers
     engineer_data = [
@@ -82,14 +224,14 @@ def init_data():
     ]
     
     for uid, display_name in engineer_data:
-        users[uid] = {
+        storage.save_user({
             'id': uid,
             'username': uid,
             'display_name': display_name,
-            'password': hash_pass('password123'),
+            'password': engineer_password,
             'is_admin': False,
             'exp': 3 + (int(uid[-2:]) % 4)
-        }
+        })
 
 # Questions - 18 per topic (Physical Design)
 QUESTIONS = {
@@ -157,6 +299,79 @@ QUESTIONS = {
     ]
 }
 
+# Tests point at their questions by (topic, QUESTION_VERSION). Bump the
+# version when changing the lists above, and register the old lists too
+# so tests already assigned keep the questions they were given.
+QUESTION_VERSION = 1
+for topic, topic_questions in QUESTIONS.items():
+    QUESTION_BANK[(topic, QUESTION_VERSION)] = tuple(topic_questions)
+
+# Scoring criteria for each topic
+SCORING_CRITERIA = {
+    'sta': {
+        'excellent_terms': ['setup time', 'hold time', 'slack', 'timing violation', 'clock skew', 'timing corner', 'propagated clock', 'jitter', 'ocv'],
+        'good_terms': ['timing', 'clock', 'delay', 'path', 'constraint', 'analysis', 'signoff', 'violation'],
+        'methodology_terms': ['systematic', 'approach', 'method', 'technique', 'optimization', 'analysis']
+    },
+    'cts': {
+        'excellent_terms': ['clock tree', 'skew', 'insertion delay', 'balancing', 'useful skew', 'clock gating', 'h-tree', 'clock mesh', 'power optimization'],
+        'good_terms': ['clock', 'tree', 'buffer', 'delay', 'synthesis', 'distribution', 'domain', 'topology'],
+        'methodology_terms': ['optimization', 'technique', 'approach', 'method', 'strategy', 'implementation']
+    },
+    'signoff': {
+        'excellent_terms': ['drc', 'lvs', 'antenna', 'ir drop', 'electromigration', 'metal density', 'signal integrity', 'formal verification'],
+        'good_terms': ['signoff', 'verification', 'check', 'violation', 'analysis', 'tape-out', 'design rule'],
+        'methodology_terms': ['systematic', 'debug', 'approach', 'method', 'flow', 'process']
+    }
+}
+
+STRUCTURE_MARKERS = ['1.', '2.', 'first', 'second', 'step']
+
+class KeywordMatcher:
+    """Precompiled term table for one topic.
+
+    Terms shared between categories are looked up once. A term without
+    whitespace can only occur inside a single word, so it is looked for
+    in the answer's distinct words rather than the whole text; a
+    multi-word term is checked against the full text only when each of
+    its words is found among them.
+    """
+
+    def __init__(self, categories):
+        terms = sorted({t for ts in categories.values() for t in ts}, key=lambda t: (len(t), t))
+        index = {t: i for i, t in enumerate(terms)}
+        self.terms = tuple(terms)
+        self.phrases = tuple((i, t, tuple(t.split())) for i, t in enumerate(terms) if len(t.split()) > 1)
+        self.categories = tuple(
+            (name, tuple(index[t] for t in dict.fromkeys(ts)))
+            for name, ts in categories.items()
+        )
+        # terms x categories 0/1 matrix for counting many answers at once
+        self.category_matrix = np.zeros((len(terms), len(self.categories)), dtype=np.int32)
+        for c, (_, idx) in enumerate(self.categories):
+            self.category_matrix[list(idx), c] = 1
+
+    def scan(self, text, words):
+        """Count how many terms of each category occur in lowercased text,
+        given its words (text.split())"""
+        # Words joined by a newline: no term can match across two of them,
+        # and multi-word terms never match at all
+        vocabulary = '\n'.join(set(words))
+        found = [term in vocabulary for term in self.terms]
+        for i, term, pieces in self.phrases:
+            for piece in pieces:
+                if piece not in vocabulary:
+                    break
+            else:
+                found[i] = term in text
+        return {name: sum(map(found.__getitem__, idx)) for name, idx in self.categories}
+
+# Compiled once at import; analyze_answer_quality only scans
+SCORING_MATCHERS = {
+    topic: KeywordMatcher(dict(criteria, structure_markers=STRUCTURE_MARKERS))
+    for topic, criteria in SCORING_CRITERIA.items()
+}
+
 def analyze_answer_quality(question, answer, topic):
     """Analyzes answer quality and suggests a score"""
     if not answer or len(answer.strip()) < 20:
@@ -164,36 +379,25 @@ def analyze_answer_quality(question, answer, topic):
     
     answer_lower = answer.lower()
     
-    # Define scoring criteria for each topic
-    scoring_criteria = {
-        'sta': {
-            'excellent_terms': ['setup time', 'hold time', 'slack', 'timing violation', 'clock skew', 'timing corner', 'propagated clock', 'jitter', 'ocv'],
-            'good_terms': ['timing', 'clock', 'delay', 'path', 'constraint', 'analysis', 'signoff', 'violation'],
-            'methodology_terms': ['systematic', 'approach', 'method', 'technique', 'optimization', 'analysis']
-        },
-        'cts': {
-            'excellent_terms': ['clock tree', 'skew', 'insertion delay', 'balancing', 'useful skew', 'clock gating', 'h-tree', 'clock mesh', 'power optimization'],
-            'good_terms': ['clock', 'tree', 'buffer', 'delay', 'synthesis', 'distribution', 'domain', 'topology'],
-            'methodology_terms': ['optimization', 'technique', 'approach', 'method', 'strategy', 'implementation']
-        },
-        'signoff': {
-            'excellent_terms': ['drc', 'lvs', 'antenna', 'ir drop', 'electromigration', 'metal density', 'signal integrity', 'formal verification'],
-            'good_terms': ['signoff', 'verification', 'check', 'violation', 'analysis', 'tape-out', 'design rule'],
-            'methodology_terms': ['systematic', 'debug', 'approach', 'method', 'flow', 'process']
-        }
-    }
-    
-    criteria = scoring_criteria.get(topic, scoring_criteria['sta'])
+    # Lowercasing never adds or removes whitespace, so these are the
+    # answer's words
+    words = answer_lower.split()
     
-    # Count relevant technical terms
-    excellent_count = sum(1 for term in criteria['excellent_terms'] if term in answer_lower)
-    good_count = sum(1 for term in criteria['good_terms'] if term in answer_lower)
-    methodology_count = sum(1 for term in criteria['methodology_terms'] if term in answer_lower)
+    # Count relevant technical terms in a single scan
+    matcher = SCORING_MATCHERS.get(topic, SCORING_MATCHERS['sta'])
+    counts = matcher.scan(answer_lower, words)
+    excellent_count = counts['excellent_terms']
+    good_count = counts['good_terms']
+    methodology_count = counts['methodology_terms']
     
     # Calculate base score
-    word_count = len(answer.split())
-    has_structure = any(marker in answer_lower for marker in ['1.', '2.', 'first', 'second', 'step'])
+    word_count = len(words)
+    has_structure = counts['structure_markers'] > 0
     
+    return score_from_counts(excellent_count, good_count, methodology_count, word_count, has_structure)
+
+def score_from_counts(excellent_count, good_count, methodology_count, word_count, has_structure):
+    """Turns term counts into a (score, reasoning) pair"""
     # Scoring logic
     if excellent_count >= 3 and word_count >= 80:
         base_score = 8
@@ -224,34 +428,478 @@ def analyze_answer_quality(question, answer, topic):
     
     return final_score, reasoning
 
-def create_test(eng_id, topic):
-    global counter
-    counter += 1
-    test_id = f"PD_{topic}_{eng_id}_{counter}"
+# Rough byte frequency in English answers, most common first; anything
+# not listed (digits, most punctuation) counts as rare
+COMMON_BYTES = b' etaoinsrhldcu.mfpgwybv,kxjqz'
+BYTE_RANK = np.zeros(256, dtype=np.int32)
+BYTE_RANK[list(COMMON_BYTES)] = np.arange(len(COMMON_BYTES), 0, -1)
+
+def analyze_answers_batch(topic, answers):
+    """Scores many answers to one topic together.
+
+    The lowercased answers are joined into one NUL-separated byte array.
+    Every term is located across the whole batch with array operations
+    (candidate positions for its rarest pair of adjacent bytes, all
+    pairs gathered in one pass, then narrowed one byte at a time),
+    giving an answers x terms presence matrix that a single matrix
+    product turns into per-category counts. Word counts come from the
+    same array. Returns the same (score, reasoning) pairs, in order, as
+    calling analyze_answer_quality on each answer.
+    """
+    results = [(0, "Answer too short or empty")] * len(answers)
+    rows = [i for i, answer in enumerate(answers) if answer and len(answer.strip()) >= 20]
+    if not rows:
+        return results
     
-    # Each engineer gets all 18 questions from their topic
-    selected_questions = QUESTIONS[topic]
+    matcher = SCORING_MATCHERS.get(topic, SCORING_MATCHERS['sta'])
+    texts = [answers[i] for i in rows]
+    joined = '\0'.join(texts)
+    if joined.isascii():
+        # Lowercasing ASCII keeps every length, so one call does the batch
+        encoded = joined.lower().encode()
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(rows))
+    else:
+        pieces = [text.lower().encode() for text in texts]
+        encoded = b'\0'.join(pieces)
+        lengths = np.fromiter(map(len, pieces), dtype=np.int64, count=len(rows))
+    padding = b'\0' * (max(len(t) for t in matcher.terms) + 1)
+    corpus = np.frombuffer(encoded + padding, dtype=np.uint8)
+    starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
     
-    test = {
-        'id': test_id,
-        'engineer_id': eng_id,
-        'topic': topic,
-        'questions': selected_questions,
-        'answers': {},
-        'status': 'pending',
-        'created': datetime.now().isoformat(),
-        'due': (datetime.now() + timedelta(days=2)).isoformat(),  # 2-day deadline
-        'score': None,
-        'auto_scores': {}
+    # Anchor each term (all are two bytes or longer) on its rarest pair
+    # of adjacent bytes, then collect the positions of every anchor pair
+    # with one pass over the corpus's byte pairs
+    anchors = []
+    for term in matcher.terms:
+        pattern = np.frombuffer(term.encode(), dtype=np.uint8)
+        offset = int(np.argmin(BYTE_RANK[pattern[:-1]] + BYTE_RANK[pattern[1:]]))
+        anchors.append((pattern, offset, int(pattern[offset]) << 8 | int(pattern[offset + 1])))
+    anchor_pairs = sorted({pair for _, _, pair in anchors})
+    lookup = np.zeros(1 << 16, dtype=np.uint8)
+    lookup[anchor_pairs] = np.arange(1, len(anchor_pairs) + 1)
+    pairs = corpus[:-1].astype(np.uint16) << 8 | corpus[1:]
+    hits = np.flatnonzero(lookup[pairs])
+    hit_ids = lookup[pairs[hits]]
+    order = np.argsort(hit_ids, kind='stable')
+    bounds = np.searchsorted(hit_ids[order], np.arange(1, len(anchor_pairs) + 2))
+    by_pair = {
+        pair: hits[order[bounds[n]:bounds[n + 1]]]
+        for n, pair in enumerate(anchor_pairs)
     }
     
-    assignments[test_id] = test
-    return test
+    # answers x terms presence matrix
+    presence = np.zeros((len(rows), len(matcher.terms)), dtype=np.int32)
+    for j, (pattern, offset, pair) in enumerate(anchors):
+        positions = by_pair[pair] - offset
+        positions = positions[positions >= 0]
+        for k in range(len(pattern)):
+            if k not in (offset, offset + 1):
+                positions = positions[corpus[positions + k] == pattern[k]]
+        presence[np.searchsorted(starts, positions, side='right') - 1, j] = 1
+    counts = presence @ matcher.category_matrix
+    
+    # A word starts wherever non-whitespace follows whitespace or a
+    # separator. The bytes str.split() treats as whitespace are 9-13 and
+    # 28-32 (compared as unsigned, so lower bytes wrap around). NUL
+    # inside an answer is not whitespace to it, so the separators and
+    # the padding are marked by position instead.
+    is_space = ((corpus - 9) < 5) | ((corpus - 28) < 5)
+    ends = starts + lengths
+    is_space[ends] = True
+    is_space[ends[-1]:] = True
+    word_start = ~is_space
+    word_start[1:] &= is_space[:-1]
+    word_counts = np.add.reduceat(word_start.view(np.uint8), starts, dtype=np.int32).tolist()
+    
+    names = [name for name, _ in matcher.categories]
+    excellent = counts[:, names.index('excellent_terms')].tolist()
+    good = counts[:, names.index('good_terms')].tolist()
+    methodology = counts[:, names.index('methodology_terms')].tolist()
+    structured = (counts[:, names.index('structure_markers')] > 0).tolist()
+    
+    for k, i in enumerate(rows):
+        answer = answers[i]
+        # Non-ASCII text may hold Unicode whitespace the byte table misses
+        word_count = word_counts[k] if answer.isascii() else len(answer.split())
+        results[i] = score_from_counts(excellent[k], good[k], methodology[k], word_count, structured[k])
+    return results
+
+class KeywordScorer:
+    """The term-counting heuristic above, as a registered scorer"""
+
+    def score(self, question, answer, topic):
+        return analyze_answer_quality(question, answer, topic)
+
+    def score_batch(self, topic, questions, answers):
+        return analyze_answers_batch(topic, answers)
+
+register_scorer('keyword', KeywordScorer())
+register_scorer('tfidf', TfidfScorer(QUESTIONS, REFERENCE_ANSWERS))
+
+# Scorer for each topic; e.g. TOPIC_SCORERS="sta=tfidf,cts=tfidf" to
+# compare answers with reference_answers.py instead of counting terms
+TOPIC_SCORERS = {topic: 'keyword' for topic in QUESTIONS}
+TOPIC_SCORERS.update(
+    item.split('=', 1) for item in os.environ.get('TOPIC_SCORERS', '').split(',') if item
+)
+for topic, name in TOPIC_SCORERS.items():
+    if name not in SCORERS:
+        raise ValueError(f"Unknown scorer {name!r} for topic {topic!r}")
+
+def scorer_for(topic):
+    return SCORERS[TOPIC_SCORERS.get(topic, 'keyword')]
+
+def rescore_assignments(tests):
+    """Re-runs auto-scoring for every answered test, one batch per topic.
+
+    Answers already in the score memo are not scored again. Updates the
+    given tests in place and returns the ones rescored.
+    """
+    by_topic = {}
+    for test in tests:
+        if any(test.answers):
+            by_topic.setdefault(test.topic, []).append(test)
+    
+    rescored = []
+    for topic, topic_tests in by_topic.items():
+        keys = [(test, i) for test in topic_tests for i, answer in enumerate(test.answers) if answer]
+        results = score_many(
+            topic,
+            [test.questions[i] for test, i in keys],
+            [test.answers[i] for test, i in keys]
+        )
+        for test in topic_tests:
+            count = len(test.answers)
+            test.auto_scores, test.reasoning = [None] * count, [None] * count
+            # Only a pending test's hashes are ever read (reuse_draft_scores)
+            test.scored_hashes = [None] * count if test.status == 'pending' else None
+        for (test, i), (score, reasoning, digest) in zip(keys, results):
+            test.auto_scores[i], test.reasoning[i] = score, reasoning
+            if test.scored_hashes is not None:
+                test.scored_hashes[i] = digest
+        rescored.extend(topic_tests)
+    return rescored
+
+def score_answers(topic, questions, answers):
+    """Auto-scores one submission; runs inside a scoring worker process.
+
+    Returns (scores, reasoning), each indexed like answers. Only the
+    scorer runs here, never the score memo: workers are forked from a
+    process with request threads, and a lock one of them held at the
+    fork would stay locked in the worker forever.
+    """
+    scores = [None] * len(answers)
+    reasoning = [None] * len(answers)
+    answered = [i for i, answer in enumerate(answers) if answer]
+    with span('scoring'):
+        results = scorer_for(topic).score_batch(
+            topic, [questions[i] for i in answered], [answers[i] for i in answered]
+        )
+    for i, (score, text) in zip(answered, results):
+        scores[i], reasoning[i] = score, text
+    return scores, reasoning
+
+# Bump when the scoring logic itself changes. Edits to the criteria,
+# the reference answers or the scorer chosen for a topic change
+# SCORER_VERSION on their own, which retires every memoized score and
+# every draft score saved under the old version.
+SCORER_REVISION = 1
+SCORER_VERSION = hashlib.blake2b(
+    json.dumps(
+        [SCORER_REVISION, SCORING_CRITERIA, STRUCTURE_MARKERS, TOPIC_SCORERS, REFERENCE_ANSWERS],
+        sort_keys=True
+    ).encode(),
+    digest_size=4
+).hexdigest()
+
+# Scorer results by answer_hash()
+SCORE_MEMO_BYTES = int(os.environ.get('SCORE_MEMO_BYTES', 16 * 1024 * 1024))
+SCORE_MEMO_TTL = float(os.environ.get('SCORE_MEMO_TTL', 24 * 3600))
+score_memo = LRUCache(SCORE_MEMO_BYTES, ttl=SCORE_MEMO_TTL)
+
+def answer_hash(question, answer, topic):
+    """Hash of one scorer input under the current SCORER_VERSION"""
+    data = '\0'.join((SCORER_VERSION, topic, question, answer))
+    return hashlib.blake2b(data.encode(), digest_size=8).hexdigest()
+
+def score_many(topic, questions, answers):
+    """(score, reasoning, hash) for each answer, from the memo where it can.
+
+    Answers the memo doesn't have are scored in one batch by the topic's
+    scorer.
+    """
+    digests = [answer_hash(q, a, topic) for q, a in zip(questions, answers)]
+    results = score_memo.get_many(digests)
+    missing = [k for k, result in enumerate(results) if result is None]
+    if missing:
+        with span('scoring'):
+            scored = scorer_for(topic).score_batch(
+                topic, [questions[k] for k in missing], [answers[k] for k in missing]
+            )
+        for k, result in zip(missing, scored):
+            results[k] = result
+        # key, tuple and reasoning string
+        score_memo.put_many(
+            (digests[k], results[k], 200 + len(results[k][1])) for k in missing
+        )
+    return [result + (digest,) for result, digest in zip(results, digests)]
+
+def score_draft(topic, question_version, index, text):
+    return score_many(topic, [QUESTION_BANK[(topic, question_version)][index]], [text])[0]
+
+def reuse_draft_scores(test, answers):
+    """Scores already computed for these exact answers while they were drafts.
+
+    Returns (scores, reasoning, hashes); questions with no reusable
+    score hold None in scores.
+    """
+    count = len(answers)
+    scores, reasoning, hashes = [None] * count, [None] * count, [None] * count
+    saved = test.scored_hashes or [None] * count
+    questions = test.questions
+    for i, answer in enumerate(answers):
+        if not answer:
+            continue
+        hashes[i] = answer_hash(questions[i], answer, test.topic)
+        if saved[i] == hashes[i] and test.auto_scores[i] is not None:
+            scores[i], reasoning[i] = test.auto_scores[i], test.reasoning[i]
+        else:
+            cached = score_memo.get(hashes[i])
+            if cached is not None:
+                scores[i], reasoning[i] = cached
+    return scores, reasoning, hashes
+
+# Autosaved answer edits, scored and written to storage every DRAFT_FLUSH_SECONDS
+drafts = DraftBuffer(storage, float(os.environ.get('DRAFT_FLUSH_SECONDS', 2)), score_draft)
+
+def set_storage(new_storage):
+    """Switches the app, and everything holding on to its storage, to
+    another backend (benchmarks seed a fresh one per run)"""
+    global storage
+    storage = new_storage
+    for holder in (session_store, deadlines, drafts, answer_index):
+        holder.storage = new_storage
+
+scoring_executor = None
+
+def get_scoring_executor():
+    global scoring_executor
+    if scoring_executor is None:
+        scoring_executor = ProcessPoolExecutor(
+            max_workers=SCORING_WORKERS, initializer=os.nice, initargs=(SCORING_NICE,)
+        )
+    return scoring_executor
+
+# Near-duplicate answers between engineers, flagged in the review list;
+# their MinHash signatures are computed in the scoring workers
+answer_index = AnswerIndex(
+    storage,
+    float(os.environ.get('SIMILARITY_THRESHOLD', 0.8)),
+    get_scoring_executor if SCORING_WORKERS > 0 else None
+)
+
+def stop_background():
+    """Writes pending drafts and waits for queued scoring to finish"""
+    drafts.flush()
+    if scoring_executor is not None:
+        scoring_executor.shutdown(wait=True)
+
+def queue_scoring(test):
+    """Hands a submitted test to the scoring workers.
+
+    The test shows as scoring until its auto_scores land; the request
+    that submitted it does not wait. Questions that already have a
+    score (reused from drafts) are not scored again.
+    """
+    global scoring_executor
+    known_scores = test.auto_scores or [None] * len(test.answers)
+    known_reasoning = test.reasoning or [None] * len(test.answers)
+    unscored = [answer if known_scores[i] is None else None for i, answer in enumerate(test.answers)]
+    args = (test.topic, test.questions, unscored)
+    queued = time.perf_counter()
+    
+    def record(result):
+        # Memoized here, in the web process; see score_answers
+        for i, answer in enumerate(unscored):
+            if answer:
+                digest = answer_hash(test.questions[i], answer, test.topic)
+                score_memo.put(digest, (result[0][i], result[1][i]), 200 + len(result[1][i]))
+        scores = [known if known is not None else new for known, new in zip(known_scores, result[0])]
+        reasoning = [known if known is not None else new for known, new in zip(known_reasoning, result[1])]
+        storage.update_test(test.id, auto_scores=scores, reasoning=reasoning, scoring=False)
+        metrics.observe('pd_autoscore_duration_seconds', (('topic', test.topic),), time.perf_counter() - queued)
+        publish(('admins', 'scored', {'test_id': test.id}))
+    
+    if SCORING_WORKERS <= 0:
+        record(score_answers(*args))
+        return
+    
+    def scoring_done(future):
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"⚠️ Scoring worker failed for {test.id}: {e}; scoring inline")
+            result = score_answers(*args)
+        record(result)
+    
+    try:
+        future = get_scoring_executor().submit(score_answers, *args)
+    except RuntimeError as e:
+        # Broken or shut-down pool: start a fresh one for the next submission
+        print(f"⚠️ Scoring pool unavailable ({e}); scoring {test.id} inline")
+        scoring_executor = None
+        record(score_answers(*args))
+        return
+    future.add_done_callback(scoring_done)
+
+def create_test(eng_id, topic):
+    return create_tests([(eng_id, topic)])[0]
+
+def create_tests(assignments):
+    """Creates one test per (engineer id, topic) pair.
+
+    Test numbers come from a single reserved block and every test is
+    saved in one storage transaction.
+    """
+    numbers = storage.reserve_test_numbers(len(assignments))
+    
+    # Each engineer gets all 18 questions from their topic (by reference)
+    now = time.time()
+    tests = [
+        Assignment(
+            id=f"PD_{topic}_{eng_id}_{number}",
+            engineer_id=eng_id,
+            topic=topic,
+            question_version=QUESTION_VERSION,
+            created=now,
+            due=now + TEST_DURATION
+        )
+        for (eng_id, topic), number in zip(assignments, numbers)
+    ]
+    
+    storage.save_tests(tests)
+    deadlines.schedule_many((test.id, test.due) for test in tests)
+    publish(*[
+        (test.engineer_id, 'assigned', {'test_id': test.id, 'topic': test.topic, 'due': test.due})
+        for test in tests
+    ])
+    return tests
+
+def publish(*events):
+    """Sends (audience, kind, data) events to users' event streams.
+
+    audience is a user id or 'admins'. Streams only exist in async
+    mode, but events are cheap to record either way, and a failure to
+    record one never fails the request that caused it.
+    """
+    try:
+        storage.publish_events(events)
+    except Exception as e:
+        print(f"⚠️ Could not publish events: {e}")
+
+def stream_audience(headers):
+    """Event stream audience for a request's headers: 'admins', the
+    engineer's user id, or None without a valid session cookie"""
+    try:
+        cookies = SimpleCookie(headers.get(b'cookie', b'').decode('latin-1'))
+    except CookieError:
+        return None
+    morsel = cookies.get(SESSION_COOKIE)
+    user = session_store.resolve(morsel.value) if morsel is not None else None
+    if user is None:
+        return None
+    return 'admins' if user.get('is_admin') else user['id']
+
+def stream_deadlines(audience):
+    """(test id, due) of the pending tests to warn an event stream about"""
+    if audience == 'admins':
+        return []
+    return [(test.id, test.due) for test in storage.list_tests(engineer_id=audience, status='pending')]
+
+def current_user():
+    """The logged-in user's record (no password hash), or None.
+    Resolved from the session cookie once per request."""
+    if 'user' not in g:
+        g.user = session_store.resolve(request.cookies.get(SESSION_COOKIE))
+    return g.user
+
+def admin_required(view):
+    """Lets admins through; anyone else goes to /login (JSON requests get 401)"""
+    @wraps(view)
+    def guarded(*args, **kwargs):
+        user = current_user()
+        if not user or not user.get('is_admin'):
+            if request.is_json:
+                return {'error': 'admin login required'}, 401
+            return redirect('/login')
+        return view(*args, **kwargs)
+    return guarded
+
+def engineer_required(view):
+    """Lets engineers through; anyone else goes to /login (JSON requests get 401)"""
+    @wraps(view)
+    def guarded(*args, **kwargs):
+        user = current_user()
+        if not user or user.get('is_admin'):
+            if request.is_json:
+                return {'error': 'login required'}, 401
+            return redirect('/login')
+        return view(*args, **kwargs)
+    return guarded
+
+@app.before_request
+def start_background():
+    # Once per worker process; a no-op afterwards
+    deadlines.ensure_running()
+    drafts.ensure_running()
+    answer_index.ensure_running()
+
+@app.after_request
+def cache_and_compress(response):
+    """Long-lived caching for assets; ETags and compression for pages"""
+    encoding = pick_encoding(request.headers.get('Accept-Encoding', ''))
+    
+    if request.endpoint == 'static':
+        name = (request.view_args or {}).get('filename')
+        if name not in assets.files:
+            return response
+        if request.args.get('v') == assets.version(name):
+            # The URL changes with the content, so this copy never goes stale
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = 31536000
+            response.cache_control.immutable = True
+        response.vary.add('Accept-Encoding')
+        if encoding and response.status_code == 200:
+            response.close()
+            response.direct_passthrough = False
+            response.set_data(assets.encoded(name, encoding))
+            response.headers['Content-Encoding'] = encoding
+            etag, _ = response.get_etag()
+            if etag:
+                response.set_etag(etag, weak=True)
+        return response
+    
+    if response.mimetype == 'text/html' and response.status_code == 200:
+        # Pages are per-user: let the browser keep a copy but revalidate it.
+        # The weak ETag covers every encoding of the same page.
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.vary.add('Cookie')
+        response.add_etag(weak=True)
+        response.make_conditional(request)
+    
+    if encoding and is_compressible(response):
+        response.set_data(compress(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+    return response
 
 @app.route('/')
 def home():
-    if 'user_id' in session:
-        if session.get('is_admin'):
+    user = current_user()
+    if user:
+        if user.get('is_admin'):
             return redirect('/admin')
         return redirect('/student')
     return redirect('/login')
@@ -260,162 +908,86 @@ def home():
 def health():
     return 'OK'
 
+@app.route('/metrics')
+def metrics_text():
+    """Prometheus text format, summed over every worker"""
+    gauges = [
+        ('pd_tests', (('status', status),), storage.count_tests(status))
+        for status in ('pending', 'submitted', 'completed', 'overdue')
+    ]
+    gauges.append(('pd_assignments_bytes', (), storage.size_bytes()))
+    return metrics.render(gauges), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+@app.route('/events')
+def events():
+    # Served by the event hub in async mode (asgi.py). Under plain WSGI,
+    # 204 tells the browser's EventSource not to reconnect.
+    return '', 204
+
+@app.route('/admin/timings')
+@admin_required
+def admin_timings():
+    """This worker's request timings and cache counters, as JSON"""
+    return {
+        'pid': os.getpid(),
+        'routes': request_summary(metrics),
+        'review_fragments': review_fragments.stats(),
+        'score_memo': score_memo.stats(),
+        'drafts': drafts.stats(),
+        'deadlines': deadlines.stats(),
+        'answer_index': answer_index.stats(),
+        'sessions': session_store.stats(),
+        'passwords': password_checker.stats(),
+        'failed_logins': {
+            'by_user': failed_logins_by_user.stats(),
+            'by_address': failed_logins_by_address.stats()
+        }
+    }
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
         username = request.form.get('username', '').strip()
         password = request.form.get('password', '').strip()
+        address = request.remote_addr
         
-        user = users.get(username)
-        if user and check_pass(user['password'], password):
-            session['user_id'] = user['id']
-            session['username'] = user['username']
-            session['is_admin'] = user.get('is_admin', False)
-            
-            if user.get('is_admin'):
-                return redirect('/admin')
-            return redirect('/student')
-    
-    return '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Vibhuayu Technologies - PD Assessment</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { 
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-            background: linear-gradient(135deg, #0f0f23 0%, #1a1a2e 50%, #16213e 100%); 
-            min-height: 100vh; 
-            display: flex; 
-            align-items: center; 
-            justify-content: center; 
-        }
-        .container {
-            background: rgba(255, 255, 255, 0.98);
-            border-radius: 24px;
-            padding: 50px 40px;
-            width: 450px;
-            box-shadow: 0 25px 50px rgba(0, 0, 0, 0.25);
-        }
-        .logo {
-            width: 80px;
-            height: 80px;
-            margin: 0 auto 20px;
-            background: linear-gradient(135deg, #2563eb, #7c3aed, #db2777);
-            border-radius: 20px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: white;
-            font-size: 36px;
-            font-weight: 900;
-        }
-        .title {
-            font-size: 28px;
-            font-weight: 700;
-            text-align: center;
-            margin-bottom: 8px;
-        }
-        .subtitle {
-            color: #64748b;
-            font-size: 16px;
-            text-align: center;
-            margin-bottom: 35px;
-        }
-        .form-group {
-            margin-bottom: 24px;
-        }
-        .form-group label {
-            display: block;
-            margin-bottom: 8px;
-            color: #374151;
-            font-weight: 600;
-        }
-        .form-input {
-            width: 100%;
-            padding: 16px 20px;
-            border: 2px solid #e5e7eb;
-            border-radius: 12px;
-            font-size: 16px;
-        }
-        .form-input:focus {
-            outline: none;
-            border-color: #3b82f6;
-        }
-        .login-btn {
-            width: 100%;
-            padding: 16px;
-            background: linear-gradient(135deg, #3b82f6, #1d4ed8);
-            color: white;
-            border: none;
-            border-radius: 12px;
-            font-size: 16px;
-            font-weight: 600;
-            cursor: pointer;
-            margin-bottom: 30px;
-        }
-        .info-card {
-            background: #f8fafc;
-            border-radius: 16px;
-            padding: 24px;
-            text-align: center;
-        }
-        .credentials {
-            background: white;
-            border-radius: 8px;
-            padding: 12px;
-            margin: 12px 0;
-            border-left: 4px solid #3b82f6;
-        }
-        .eng-list {
-            font-size: 12px;
-            color: #64748b;
-            line-height: 1.6;
-            margin-top: 12px;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="logo">V7</div>
-        <div class="title">PD Assessment Portal</div>
-        <div class="subtitle">Physical Design Evaluation System</div>
+        wait = max(failed_logins_by_user.retry_after(username), failed_logins_by_address.retry_after(address))
+        if wait:
+            metrics.inc('pd_logins_total', (('outcome', 'limited'),))
+            error = 'Too many failed logins. Please wait a minute and try again.'
+            return render_template('login.html', error=error), 429, {'Retry-After': str(int(wait) + 1)}
         
-        <form method="POST">
-            <div class="form-group">
-                <label>Username</label>
-                <input type="text" name="username" class="form-input" placeholder="Enter your username" required>
-            </div>
-            <div class="form-group">
-                <label>Password</label>
-                <input type="password" name="password" class="form-input" placeholder="Enter your password" required>
-            </div>
-            <button type="submit" class="login-btn">Access Assessment Portal</button>
-        </form>
+        user = storage.get_user(username)
+        ok = password_checker.check(user['password'] if user else None, password)
+        if ok is None:
+            metrics.inc('pd_logins_total', (('outcome', 'busy'),))
+            error = 'Lots of people are logging in right now. Please try again in a moment.'
+            return render_template('login.html', error=error), 503, {'Retry-After': '1'}
+        if ok:
+            metrics.inc('pd_logins_total', (('outcome', 'ok'),))
+            if needs_rehash(user['password']):
+                # Hashed by an older version (or with older parameters)
+                storage.save_user(dict(user, password=password_checker.hash(password)))
+            session_store.end(request.cookies.get(SESSION_COOKIE))
+            response = redirect('/admin' if user.get('is_admin') else '/student')
+            response.set_cookie(
+                SESSION_COOKIE, session_store.create(user), httponly=True, samesite='Lax',
+                secure=app.config['SESSION_COOKIE_SECURE']
+            )
+            return response
         
-        <div class="info-card">
-            <div style="font-weight: 700; margin-bottom: 16px;">🔐 Test Credentials</div>
-            <div class="credentials">
-                <strong>Engineers:</strong> eng001 through eng018<br>
-                <strong>Password:</strong> password123<br>
-                <strong>Admin:</strong> admin / Vibhuaya@3006
-            </div>
-            <div class="eng-list">
-                <strong>18 Engineers:</strong><br>
-                Kranthi • Neela • Bhanu • Lokeshwari • Nagesh • VJ<br>
-                Pravalika • Daniel • Karthik • Hema • Naveen • Srinivas<br>
-                Meera • Suraj • Akhil • Vikas • Sahith • Sravan
-            </div>
-        </div>
-    </div>
-</body>
-</html>'''
+        metrics.inc('pd_logins_total', (('outcome', 'failed'),))
+        failed_logins_by_user.take(username)
+        failed_logins_by_address.take(address)
+    
+    return render_template('login.html')
 
 @app.route('/logout')
 def logout():
-    session.clear()
-    return redirect('/login')
+    session_store.end(request.cookies.get(SESSION_COOKIE))
+    response = redirect('/login')
+    response.delete_cookie(SESSION_COOKIE)
+    return response
 
 # END OF PART 1
 # Continue with Part 2...
@@ -423,167 +995,22 @@ def logout():
 # CONTINUE FROM PART 1 - Add this after Part 1
 
 @app.route('/admin')
+@admin_required
 def admin():
-    if not session.get('is_admin'):
-        return redirect('/login')
-    
-    engineers = [u for u in users.values() if not u.get('is_admin')]
-    all_tests = list(assignments.values())
-    pending = [a for a in all_tests if a['status'] == 'submitted']
-    
-    eng_options = ''
-    for eng in engineers:
-        display_name = eng.get('display_name', eng['username'])
-        eng_options += f'<option value="{eng["id"]}">{display_name} (2+ Experience)</option>'
-    
-    return f'''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Admin Dashboard</title>
-    <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f5f5f5; margin: 0; }}
-        .header {{ background: #2563eb; color: white; padding: 20px; }}
-        .header-content {{
-            max-width: 1200px;
-            margin: 0 auto;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-        .nav-links a {{ color: white; text-decoration: none; margin-left: 20px; padding: 8px 16px; background: rgba(255,255,255,0.2); border-radius: 6px; }}
-        .nav-links a:hover {{ background: rgba(255,255,255,0.3); }}
-        .container {{ max-width: 1200px; margin: 20px auto; padding: 0 20px; }}
-        .stats {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 20px; margin-bottom: 30px; }}
-        .stat {{ background: white; padding: 25px; border-radius: 12px; text-align: center; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .stat-num {{ font-size: 32px; font-weight: bold; color: #2563eb; margin-bottom: 5px; }}
-        .stat-label {{ color: #64748b; font-weight: 600; }}
-        .quick-actions {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }}
-        .action-card {{
-            background: linear-gradient(135deg, #f8fafc, #f1f5f9);
-            border-radius: 12px;
-            padding: 25px;
-            text-align: center;
-            border-left: 4px solid #3b82f6;
-        }}
-        .action-card.review {{ border-left-color: #f59e0b; }}
-        .action-card.create {{ border-left-color: #10b981; }}
-        .action-btn {{
-            background: linear-gradient(135deg, #3b82f6, #1d4ed8);
-            color: white;
-            padding: 12px 24px;
-            text-decoration: none;
-            border-radius: 8px;
-            display: inline-block;
-            font-weight: 600;
-            margin-top: 15px;
-            transition: transform 0.2s ease;
-        }}
-        .action-btn:hover {{ transform: translateY(-2px); }}
-        .action-btn.review {{ background: linear-gradient(135deg, #f59e0b, #d97706); }}
-        .action-btn.create {{ background: linear-gradient(135deg, #10b981, #059669); }}
-        select, button {{ padding: 12px; border: 1px solid #ddd; border-radius: 6px; margin: 5px; }}
-        .btn-primary {{ background: #2563eb; color: white; border: none; cursor: pointer; }}
-        .pending-count {{
-            background: #f59e0b;
-            color: white;
-            padding: 4px 8px;
-            border-radius: 10px;
-            font-size: 12px;
-            font-weight: 600;
-            margin-left: 8px;
-        }}
-        .card {{ background: white; border-radius: 12px; padding: 30px; margin: 20px 0; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <div class="header-content">
-            <h1>🎯 Admin Dashboard</h1>
-            <div class="nav-links">
-                <a href="/admin/review">📋 Review Center</a>
-                <a href="/logout">Logout</a>
-            </div>
-        </div>
-    </div>
+    engineers = [u for u in storage.list_users() if not u.get('is_admin')]
+    total_tests = storage.count_tests()
+    status_counts = {s: storage.count_tests(s) for s in ('pending', 'submitted', 'completed', 'overdue')}
     
-    <div class="container">
-        <div class="stats">
-            <div class="stat">
-                <div class="stat-num">{len(engineers)}</div>
-                <div class="stat-label">Engineers</div>
-            </div>
-            <div class="stat">
-                <div class="stat-num">{len(all_tests)}</div>
-                <div class="stat-label">Total Tests</div>
-            </div>
-            <div class="stat">
-                <div class="stat-num">{len(pending)}</div>
-                <div class="stat-label">Pending Review</div>
-            </div>
-            <div class="stat">
-                <div class="stat-num">54</div>
-                <div class="stat-label">Total Questions</div>
-            </div>
-        </div>
-        
-        <div class="quick-actions">
-            <div class="action-card review">
-                <h3>📋 Review Submissions</h3>
-                <p>Review and grade submitted assessments from engineers</p>
-                <a href="/admin/review" class="action-btn review">
-                    Review Tests
-                    {f'<span class="pending-count">{len(pending)}</span>' if len(pending) > 0 else ''}
-                </a>
-            </div>
-            
-            <div class="action-card create">
-                <h3>➕ Create Assessment</h3>
-                <p>Assign new technical assessments to engineers (⏰ 2-day deadline)</p>
-                <div style="margin-top: 15px;">
-                    <form method="POST" action="/admin/create" style="display: inline;">
-                        <select name="engineer_id" required style="display: block; width: 100%; margin-bottom: 10px;">
-                            <option value="">Select Engineer...</option>
-                            {eng_options}
-                        </select>
-                        <select name="topic" required style="display: block; width: 100%; margin-bottom: 15px;">
-                            <option value="">Select Topic...</option>
-                            <option value="sta">STA (Static Timing Analysis)</option>
-                            <option value="cts">CTS (Clock Tree Synthesis)</option>
-                            <option value="signoff">Signoff Checks</option>
-                        </select>
-                        <button type="submit" class="action-btn create" style="margin: 0; width: 100%;">Create Assessment</button>
-                    </form>
-                </div>
-            </div>
-        </div>
-        
-        <div class="card">
-            <h2>📊 System Overview</h2>
-            <div style="color: #64748b;">
-                <p>• <strong>{len([t for t in all_tests if t['status'] == 'pending'])}</strong> assessments in progress</p>
-                <p>• <strong>{len([t for t in all_tests if t['status'] == 'submitted'])}</strong> submissions awaiting review</p>
-                <p>• <strong>{len([t for t in all_tests if t['status'] == 'completed'])}</strong> assessments completed</p>
-                <p>• <strong>{len([t for t in all_tests if t['status'] == 'overdue'])}</strong> overdue assessments</p>
-                <p>• <strong>⏰ 2-day hard deadline</strong> enforced for all new assessments</p>
-                <p>• <strong>Auto-scoring system</strong> provides initial evaluation</p>
-                <p>• <strong>Manual review</strong> allows score adjustment before finalization</p>
-            </div>
-        </div>
-    </div>
-</body>
-</html>'''
+    return render_template(
+        'admin.html',
+        engineers=engineers,
+        total_tests=total_tests,
+        status_counts=status_counts
+    )
 
 @app.route('/admin/create', methods=['POST'])
+@admin_required
 def admin_create():
-    if not session.get('is_admin'):
-        return redirect('/login')
-    
     eng_id = request.form.get('engineer_id')
     topic = request.form.get('topic')
     
@@ -592,1149 +1019,368 @@ def admin_create():
     
     return redirect('/admin')
 
+@app.route('/admin/create/bulk', methods=['POST'])
+@admin_required
+def admin_create_bulk():
+    """Assigns every chosen topic to every chosen engineer.
+
+    Takes the admin form (engineer_id and topic, each repeatable) or
+    JSON {"engineers": [...], "topics": [...]}; the engineer "all"
+    stands for every engineer. JSON callers get the new test IDs back.
+    """
+    if request.is_json:
+        payload = request.get_json(silent=True) or {}
+        if not isinstance(payload, dict):
+            return {'error': 'expected a JSON object'}, 400
+        eng_ids = payload.get('engineers') or []
+        topics = payload.get('topics') or []
+        if not (isinstance(eng_ids, list) and isinstance(topics, list) and
+                all(isinstance(value, str) for value in eng_ids + topics)):
+            return {'error': 'engineers and topics must be lists of strings'}, 400
+    else:
+        eng_ids = request.form.getlist('engineer_id')
+        topics = request.form.getlist('topic')
+    
+    engineers = [u['id'] for u in storage.list_users() if not u.get('is_admin')]
+    if 'all' in eng_ids:
+        eng_ids = engineers
+    eng_ids = list(dict.fromkeys(eng_ids))
+    topics = list(dict.fromkeys(topics))
+    known = set(engineers)
+    unknown = [e for e in eng_ids if e not in known] + [t for t in topics if t not in QUESTIONS]
+    if request.is_json:
+        if unknown:
+            return {'error': f'unknown engineers or topics: {unknown}'}, 400
+        if len(eng_ids) * len(topics) > MAX_BULK_ASSIGNMENTS:
+            return {'error': f'at most {MAX_BULK_ASSIGNMENTS} assignments per request'}, 400
+    
+    # The form can only post known values; drop anything else like admin_create does
+    assignments = [(e, t) for e in eng_ids if e in known for t in topics if t in QUESTIONS]
+    tests = create_tests(assignments[:MAX_BULK_ASSIGNMENTS]) if assignments else []
+    
+    if request.is_json:
+        return {'created': [test.id for test in tests]}, 201
+    return redirect('/admin')
+
+@app.route('/admin/rescore', methods=['POST'])
+@admin_required
+def admin_rescore():
+    # Copies: the memory backend hands out its stored records
+    for test in rescore_assignments([copy.copy(test) for test in storage.list_tests()]):
+        review_fragments.discard((test.id, test.revision))
+        storage.update_test(
+            test.id,
+            auto_scores=test.auto_scores,
+            reasoning=test.reasoning,
+            scored_hashes=test.scored_hashes,
+            scoring=False
+        )
+    
+    return redirect('/admin/review')
+
 @app.route('/admin/review')
+@admin_required
 def admin_review_list():
-    if not session.get('is_admin'):
-        return redirect('/login')
+    pending_tests = storage.list_tests(status='submitted')
+    similar_pairs = answer_index.similar([test.id for test in pending_tests])
     
-    pending_tests = [a for a in assignments.values() if a['status'] == 'submitted']
-    
-    # Build pending tests HTML
-    pending_html = ''
+    # One summary row per pending test
+    reviews = []
     for test in pending_tests:
-        engineer = users.get(test['engineer_id'], {})
-        eng_name = engineer.get('display_name', test['engineer_id'])
+        engineer = storage.get_user(test.engineer_id) or {}
+        
+        similar = {}
+        for i, other_id, other_engineer, similarity in similar_pairs[test.id]:
+            if other_id not in similar:
+                other = storage.get_user(other_engineer) or {}
+                similar[other_id] = {
+                    'eng_name': other.get('display_name', other_engineer),
+                    'questions': [],
+                    'similarity': round(similarity * 100)
+                }
+            similar[other_id]['questions'].append(i + 1)
         
         # Calculate summary stats
-        total_questions = len(test['questions'])
-        answered = len(test['answers'])
-        auto_scores = test.get('auto_scores', {})
+        answered = test.answered
+        scored = [score for score in test.auto_scores or () if score is not None]
         avg_score = 0
-        if auto_scores:
-            total_auto_score = sum(score_data['score'] for score_data in auto_scores.values())
-            avg_score = round(total_auto_score / len(auto_scores), 1)
+        if scored:
+            avg_score = round(sum(scored) / len(scored), 1)
         
-        pending_html += f'''
-        <div class="review-card">
-            <div class="review-header">
-                <h3>👤 {eng_name}</h3>
-                <span class="topic-badge">{test["topic"].upper()}</span>
-            </div>
-            <div class="review-meta">
-                <div class="meta-item">📅 Submitted: {test.get("submitted_date", "")[:10]}</div>
-                <div class="meta-item">📝 Questions: {answered}/{total_questions}</div>
-                <div class="meta-item">🎯 Avg Auto-Score: {avg_score}/10</div>
-                <div class="meta-item">📊 Estimated Total: {int(avg_score * answered)}/180</div>
-            </div>
-            <div class="review-actions">
-                <a href="/admin/review/{test['id']}" class="btn-review">Review Answers</a>
-                <span class="status-badge submitted">Awaiting Review</span>
-            </div>
-        </div>'''
+        reviews.append({
+            'id': test.id,
+            'eng_name': engineer.get('display_name', test.engineer_id),
+            'topic': test.topic,
+            'submitted': test.submitted_date,
+            'answered': answered,
+            'total_questions': len(test.questions),
+            'scoring': test.scoring,
+            'avg_score': avg_score,
+            'estimated_total': int(avg_score * answered),
+            'similar': list(similar.values())
+        })
     
-    if not pending_html:
-        pending_html = '''
-        <div class="no-reviews">
-            <h3>✅ All Caught Up!</h3>
-            <p>No tests pending review at this time.</p>
-        </div>'''
+    return render_template(
+        'admin_review_list.html',
+        reviews=reviews,
+        completed_count=storage.count_tests('completed'),
+        in_progress_count=storage.count_tests('pending'),
+        total_tests=storage.count_tests()
+    )
+
+def review_questions_html(test):
+    """Question cards for the review page, rendered once per test revision.
+
+    Answers and auto-scores only change through update_test, which bumps
+    the revision, so a cached copy is never stale. Cards shown while
+    scoring is still running are not cached.
+    """
+    key = (test.id, test.revision)
+    cached = review_fragments.get(key)
+    if cached is not None:
+        return Markup(cached.decode())
     
-    return f'''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Review Center - Admin</title>
-    <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f5f5f5; margin: 0; }}
-        .header {{ background: #2563eb; color: white; padding: 20px; }}
-        .header-content {{
-            max-width: 1200px;
-            margin: 0 auto;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-        .nav-links a {{ color: white; text-decoration: none; margin-left: 20px; }}
-        .container {{ max-width: 1200px; margin: 20px auto; padding: 0 20px; }}
-        .stats-row {{
-            display: grid;
-            grid-template-columns: repeat(4, 1fr);
-            gap: 20px;
-            margin-bottom: 30px;
-        }}
-        .stat-card {{ background: white; padding: 25px; border-radius: 12px; text-align: center; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .stat-number {{ font-size: 32px; font-weight: bold; color: #2563eb; }}
-        .stat-label {{ color: #64748b; font-weight: 600; margin-top: 5px; }}
-        .section {{ background: white; border-radius: 12px; padding: 30px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .review-card {{
-            background: linear-gradient(135deg, #f8fafc, #f1f5f9);
-            border-radius: 12px;
-            padding: 25px;
-            margin: 20px 0;
-            border-left: 4px solid #f59e0b;
-        }}
-        .review-header {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 15px;
-        }}
-        .review-header h3 {{ margin: 0; color: #1e293b; }}
-        .topic-badge {{
-            background: #dbeafe;
-            color: #1e40af;
-            padding: 6px 12px;
-            border-radius: 15px;
-            font-size: 12px;
-            font-weight: 600;
-        }}
-        .review-meta {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-            margin-bottom: 20px;
-        }}
-        .meta-item {{ color: #64748b; font-size: 14px; }}
-        .review-actions {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-        .btn-review {{
-            background: linear-gradient(135deg, #2563eb, #1d4ed8);
-            color: white;
-            padding: 10px 20px;
-            text-decoration: none;
-            border-radius: 8px;
-            font-weight: 600;
-            transition: transform 0.2s ease;
-        }}
-        .btn-review:hover {{ transform: translateY(-2px); }}
-        .status-badge {{
-            padding: 6px 12px;
-            border-radius: 15px;
-            font-size: 12px;
-            font-weight: 600;
-        }}
-        .status-badge.submitted {{
-            background: #fef3c7;
-            color: #92400e;
-        }}
-        .no-reviews {{
-            text-align: center;
-            padding: 60px 20px;
-            color: #64748b;
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <div class="header-content">
-            <h1>📋 Review Center</h1>
-            <div class="nav-links">
-                <a href="/admin">← Back to Dashboard</a>
-                <a href="/logout">Logout</a>
-            </div>
-        </div>
-    </div>
+    # One card per question with the answer and its auto-analysis
+    count = len(test.questions)
+    scores = test.auto_scores or [None] * count
+    reasoning = test.reasoning or [None] * count
+    items = []
+    for question, answer, score, why in zip(test.questions, test.answers, scores, reasoning):
+        items.append({
+            'question': question,
+            'answer': answer or 'No answer provided',
+            'auto_score': score or 0,
+            'reasoning': why or 'No auto-analysis available'
+        })
     
-    <div class="container">
-        <div class="stats-row">
-            <div class="stat-card">
-                <div class="stat-number">{len(pending_tests)}</div>
-                <div class="stat-label">Pending Review</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-number">{len([t for t in assignments.values() if t['status'] == 'completed'])}</div>
-                <div class="stat-label">Completed</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-number">{len([t for t in assignments.values() if t['status'] == 'pending'])}</div>
-                <div class="stat-label">In Progress</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-number">{len(assignments)}</div>
-                <div class="stat-label">Total Tests</div>
-            </div>
-        </div>
-        
-        <div class="section">
-            <h2>⏳ Tests Awaiting Review</h2>
-            {pending_html}
-        </div>
-    </div>
-</body>
-</html>'''
+    html = render_template('review_questions.html', items=items, scoring=test.scoring)
+    if not test.scoring:
+        # Kept as UTF-8: the emoji would make the str four bytes per character
+        encoded = html.encode()
+        review_fragments.put(key, encoded, len(encoded))
+    return Markup(html)
 
 @app.route('/admin/review/<test_id>', methods=['GET', 'POST'])
+@admin_required
 def admin_review_test(test_id):
-    if not session.get('is_admin'):
-        return redirect('/login')
-    
-    test = assignments.get(test_id)
+    test = storage.get_test(test_id)
     if not test:
         return redirect('/admin/review')
     
-    engineer = users.get(test['engineer_id'], {})
-    eng_name = engineer.get('display_name', test['engineer_id'])
+    engineer = storage.get_user(test.engineer_id) or {}
+    eng_name = engineer.get('display_name', test.engineer_id)
     
     if request.method == 'POST':
         # Handle manual scoring
-        final_scores = {}
+        final_scores = [None] * len(test.questions)
         total_score = 0
         
-        for i in range(len(test['questions'])):
+        for i in range(len(final_scores)):
             manual_score = request.form.get(f'score_{i}')
             if manual_score and manual_score.isdigit():
                 score = min(10, max(0, int(manual_score)))
-                final_scores[str(i)] = score
+                final_scores[i] = score
                 total_score += score
         
-        # Save final scores and complete the test
-        test['final_scores'] = final_scores
-        test['score'] = total_score
-        test['status'] = 'completed'
-        test['graded_by'] = 'admin'
-        test['graded_date'] = datetime.now().isoformat()
+        # Save final scores and complete the test, unless another admin
+        # graded it or it changed (e.g. auto-scores landed) since this
+        # admin opened it
+        revision = request.form.get('revision', '')
+        graded = storage.transition_test(
+            test_id,
+            'submitted',
+            expected_revision=int(revision) if revision.isdigit() else None,
+            final_scores=final_scores,
+            score=total_score,
+            status='completed',
+            graded_by=current_user()['username'],
+            graded_date=time.time()
+        )
+        if not graded:
+            return redirect(f'/admin/review/{test_id}?conflict=1')
         
+        review_fragments.discard((test_id, test.revision))
         return redirect('/admin/review')
     
-    # Generate questions and answers HTML
-    qa_html = ''
-    for i, question in enumerate(test['questions']):
-        answer = test['answers'].get(str(i), 'No answer provided')
-        auto_score_data = test.get('auto_scores', {}).get(str(i), {})
-        auto_score = auto_score_data.get('score', 0)
-        reasoning = auto_score_data.get('reasoning', 'No auto-analysis available')
-        
-        qa_html += f'''
-        <div class="qa-card">
-            <div class="question-section">
-                <div class="question-header">
-                    <span class="q-number">Q{i+1}</span>
-                    <span class="auto-score">Auto Score: {auto_score}/10</span>
-                </div>
-                <div class="question-text">{question}</div>
-            </div>
-            
-            <div class="answer-section">
-                <h4>📝 Student Answer:</h4>
-                <div class="answer-text">{answer}</div>
-                <div class="analysis">
-                    <strong>🤖 Auto Analysis:</strong> {reasoning}
-                </div>
-            </div>
-            
-            <div class="scoring-section">
-                <label for="score_{i}">Manual Score (0-10):</label>
-                <input type="number" id="score_{i}" name="score_{i}" min="0" max="10" value="{auto_score}" class="score-input">
-            </div>
-        </div>'''
-    
-    return f'''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Review: {eng_name} - {test["topic"].upper()}</title>
-    <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f5f5f5; margin: 0; }}
-        .header {{ background: #2563eb; color: white; padding: 20px; }}
-        .header-content {{
-            max-width: 1200px;
-            margin: 0 auto;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-        .nav-links a {{ color: white; text-decoration: none; margin-left: 20px; }}
-        .container {{ max-width: 1200px; margin: 20px auto; padding: 0 20px; }}
-        .test-info {{
-            background: white;
-            border-radius: 12px;
-            padding: 25px;
-            margin-bottom: 20px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .info-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin-top: 15px;
-        }}
-        .qa-card {{
-            background: white;
-            border-radius: 12px;
-            padding: 25px;
-            margin: 20px 0;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            border-left: 4px solid #3b82f6;
-        }}
-        .question-section {{
-            background: #f8fafc;
-            border-radius: 8px;
-            padding: 20px;
-            margin-bottom: 20px;
-        }}
-        .question-header {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 15px;
-        }}
-        .q-number {{
-            background: #3b82f6;
-            color: white;
-            padding: 6px 12px;
-            border-radius: 15px;
-            font-weight: 600;
-            font-size: 14px;
-        }}
-        .auto-score {{
-            background: #dbeafe;
-            color: #1e40af;
-            padding: 6px 12px;
-            border-radius: 15px;
-            font-weight: 600;
-            font-size: 14px;
-        }}
-        .question-text {{
-            color: #1e293b;
-            line-height: 1.6;
-            font-weight: 500;
-        }}
-        .answer-section {{
-            margin-bottom: 20px;
-        }}
-        .answer-section h4 {{
-            color: #374151;
-            margin-bottom: 10px;
-        }}
-        .answer-text {{
-            background: #f9fafb;
-            border: 1px solid #e5e7eb;
-            border-radius: 8px;
-            padding: 15px;
-            line-height: 1.6;
-            color: #1f2937;
-            white-space: pre-wrap;
-            margin-bottom: 10px;
-        }}
-        .analysis {{
-            background: #fef3c7;
-            border: 1px solid #f59e0b;
-            border-radius: 8px;
-            padding: 12px;
-            font-size: 14px;
-            color: #92400e;
-        }}
-        .scoring-section {{
-            background: #f0f9ff;
-            border-radius: 8px;
-            padding: 15px;
-            border: 1px solid #0ea5e9;
-        }}
-        .scoring-section label {{
-            display: block;
-            margin-bottom: 8px;
-            color: #0c4a6e;
-            font-weight: 600;
-        }}
-        .score-input {{
-            width: 80px;
-            padding: 8px 12px;
-            border: 1px solid #cbd5e1;
-            border-radius: 6px;
-            font-size: 16px;
-            text-align: center;
-        }}
-        .submit-section {{
-            background: white;
-            border-radius: 12px;
-            padding: 30px;
-            text-align: center;
-            margin-top: 30px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .total-display {{
-            background: #f0f9ff;
-            border: 2px solid #0ea5e9;
-            border-radius: 12px;
-            padding: 20px;
-            margin-bottom: 25px;
-            text-align: center;
-        }}
-        .total-score {{
-            font-size: 32px;
-            font-weight: bold;
-            color: #0c4a6e;
-        }}
-        .btn {{
-            padding: 12px 24px;
-            border: none;
-            border-radius: 8px;
-            font-weight: 600;
-            cursor: pointer;
-            margin: 8px;
-            text-decoration: none;
-            display: inline-block;
-        }}
-        .btn-primary {{
-            background: linear-gradient(135deg, #10b981, #059669);
-            color: white;
-        }}
-        .btn-secondary {{
-            background: #e5e7eb;
-            color: #374151;
-        }}
-        .warning {{
-            background: #fef3c7;
-            border: 1px solid #f59e0b;
-            border-radius: 8px;
-            padding: 15px;
-            margin-bottom: 20px;
-            color: #92400e;
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <div class="header-content">
-            <h1>📝 Review: {eng_name}</h1>
-            <div class="nav-links">
-                <a href="/admin/review">← Back to Reviews</a>
-                <a href="/admin">Dashboard</a>
-                <a href="/logout">Logout</a>
-            </div>
-        </div>
-    </div>
-    
-    <div class="container">
-        <div class="test-info">
-            <h2>📊 Assessment Details</h2>
-            <div class="info-grid">
-                <div><strong>Engineer:</strong> {eng_name}</div>
-                <div><strong>Topic:</strong> {test["topic"].upper()}</div>
-                <div><strong>Submitted:</strong> {test.get("submitted_date", "")[:10]}</div>
-                <div><strong>Questions:</strong> {len(test["answers"])}/{len(test["questions"])}</div>
-            </div>
-        </div>
-        
-        <form method="POST" id="reviewForm">
-            {qa_html}
-            
-            <div class="submit-section">
-                <div class="total-display">
-                    <div class="total-score" id="totalScore">0/180</div>
-                    <div>Total Assessment Score</div>
-                </div>
-                
-                <div class="warning">
-                    ⚠️ <strong>Final Review:</strong> Please verify all scores before submitting. This will complete the assessment.
-                </div>
-                
-                <button type="submit" class="btn btn-primary">✅ Submit Final Grades</button>
-                <a href="/admin/review" class="btn btn-secondary">Cancel</a>
-            </div>
-        </form>
-    </div>
-    
-    <script>
-        // Calculate total score dynamically
-        function updateTotal() {{
-            const scoreInputs = document.querySelectorAll('.score-input');
-            let total = 0;
-            
-            scoreInputs.forEach(input => {{
-                const value = parseInt(input.value) || 0;
-                total += Math.min(10, Math.max(0, value));
-            }});
-            
-            document.getElementById('totalScore').textContent = total + '/180';
-        }}
-        
-        // Add event listeners to all score inputs
-        document.querySelectorAll('.score-input').forEach(input => {{
-            input.addEventListener('input', function() {{
-                // Ensure value is between 0-10
-                const value = parseInt(this.value);
-                if (value > 10) this.value = 10;
-                if (value < 0) this.value = 0;
-                
-                updateTotal();
-            }});
-        }});
-        
-        // Form submission confirmation
-        document.getElementById('reviewForm').addEventListener('submit', function(e) {{
-            if (!confirm('Are you sure you want to submit these final grades? This action cannot be undone.')) {{
-                e.preventDefault();
-                return false;
-            }}
-        }});
-        
-        // Initial total calculation
-        updateTotal();
-    </script>
-</body>
-</html>'''
+    return render_template(
+        'admin_review_test.html',
+        test=test,
+        eng_name=eng_name,
+        scoring=test.scoring,
+        conflict=bool(request.args.get('conflict')),
+        questions_html=review_questions_html(test)
+    )
 
 @app.route('/student')
+@engineer_required
 def student():
-    if not session.get('user_id') or session.get('is_admin'):
-        return redirect('/login')
+    user = current_user()
+    user_id = user['id']
+    my_tests = storage.list_tests(engineer_id=user_id)
     
-    user_id = session['user_id']
-    user = users.get(user_id, {})
-    my_tests = [a for a in assignments.values() if a['engineer_id'] == user_id]
-    
-    # Build tests HTML
-    tests_html = ''
+    # One card per test
+    cards = []
     for test in my_tests:
-        status = test['status']
-        time_remaining = get_time_remaining(test['due'])
+        time_remaining = get_time_remaining(test.due)
         is_urgent = 'remaining' in time_remaining and ('h' in time_remaining or 'm' in time_remaining)
-        overdue = is_overdue(test['due'])
         
-        if status == 'completed':
-            tests_html += f'''
-            <div class="test-card completed">
-                <h3>📊 {test["topic"].upper()} Assessment</h3>
-                <div class="test-meta">✅ Completed | Score: {test.get("score", 0)}/180 points</div>
-                <div class="test-status completed-status">Assessment Completed</div>
-            </div>'''
-        elif status == 'submitted':
-            tests_html += f'''
-            <div class="test-card submitted">
-                <h3>📝 {test["topic"].upper()} Assessment</h3>
-                <div class="test-meta">⏳ Under Review | 18 Questions | Submitted: {test.get("submitted_date", "")[:10]}</div>
-                <div class="test-status review-status">Awaiting Results</div>
-            </div>'''
-        elif status == 'overdue' or overdue:
-            test['status'] = 'overdue'  # Update status if overdue
-            tests_html += f'''
-            <div class="test-card overdue">
-                <h3>❌ {test["topic"].upper()} Assessment</h3>
-                <div class="test-meta">🚨 OVERDUE | Deadline: {test["due"][:16].replace('T', ' ')} | Status: LOCKED</div>
-                <div class="test-status overdue-status">Deadline Exceeded - Contact Admin</div>
-            </div>'''
-        else:
-            # Pending test with deadline enforcement
-            urgency_class = 'urgent' if is_urgent else 'normal'
-            tests_html += f'''
-            <div class="test-card pending {urgency_class}">
-                <h3>🎯 {test["topic"].upper()} Assessment</h3>
-                <div class="test-meta">
-                    📋 18 Questions | ⏰ {time_remaining} | 🎖️ Max: 180 points<br>
-                    <strong>HARD DEADLINE:</strong> {test["due"][:16].replace('T', ' ')}
-                </div>
-                {'<div class="urgent-alert">🚨 URGENT: Less than 24 hours remaining!</div>' if is_urgent else ''}
-                <a href="/student/test/{test["id"]}" class="start-btn">Start Assessment</a>
-            </div>'''
+        cards.append({
+            'id': test.id,
+            'topic': test.topic,
+            'status': test.status,
+            'score': test.score or 0,
+            'submitted': test.submitted_date,
+            'deadline': test.due,
+            'time_remaining': time_remaining,
+            'is_urgent': is_urgent
+        })
     
-    if not tests_html:
-        tests_html = '''
-        <div class="no-tests">
-            <h3>📭 No Assessments Assigned</h3>
-            <p>Your administrator will assign assessments soon. Check back later!</p>
-        </div>'''
-    
-    return f'''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Engineer Dashboard - {user.get('display_name', user_id)}</title>
-    <style>
-        body {{ 
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-            margin: 0; 
-            min-height: 100vh;
-        }}
-        .header {{ 
-            background: rgba(255,255,255,0.15); 
-            backdrop-filter: blur(10px);
-            color: white; 
-            padding: 20px 0;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-        }}
-        .header-content {{
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 0 20px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-        .header h1 {{ margin: 0; font-size: 28px; }}
-        .logout {{ 
-            background: rgba(255,255,255,0.2); 
-            color: white; 
-            padding: 10px 20px; 
-            text-decoration: none; 
-            border-radius: 8px;
-            transition: all 0.3s ease;
-        }}
-        .logout:hover {{ background: rgba(255,255,255,0.3); }}
-        .container {{ 
-            max-width: 1200px; 
-            margin: 30px auto; 
-            padding: 0 20px; 
-        }}
-        .stats {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }}
-        .stat {{
-            background: rgba(255,255,255,0.95);
-            padding: 25px;
-            border-radius: 16px;
-            text-align: center;
-            box-shadow: 0 8px 25px rgba(0,0,0,0.1);
-        }}
-        .stat-num {{ 
-            font-size: 32px; 
-            font-weight: 800; 
-            color: #667eea; 
-            margin-bottom: 5px;
-        }}
-        .stat-label {{ 
-            color: #64748b; 
-            font-weight: 600; 
-            font-size: 14px;
-        }}
-        .section {{
-            background: rgba(255,255,255,0.95);
-            border-radius: 20px;
-            padding: 30px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.1);
-        }}
-        .section h2 {{
-            color: #1e293b;
-            margin-bottom: 25px;
-            font-size: 24px;
-        }}
-        .test-card {{
-            background: linear-gradient(135deg, #f8fafc, #f1f5f9);
-            border-radius: 12px;
-            padding: 25px;
-            margin: 20px 0;
-            border-left: 5px solid #667eea;
-            transition: transform 0.3s ease;
-        }}
-        .test-card:hover {{ transform: translateY(-2px); }}
-        .test-card h3 {{ 
-            color: #1e293b; 
-            margin-bottom: 10px; 
-            font-size: 20px;
-        }}
-        .test-meta {{ 
-            color: #64748b; 
-            margin-bottom: 15px; 
-            font-size: 14px;
-        }}
-        .start-btn {{
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            color: white;
-            padding: 12px 25px;
-            text-decoration: none;
-            border-radius: 8px;
-            display: inline-block;
-            font-weight: 600;
-            transition: all 0.3s ease;
-        }}
-        .start-btn:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 8px 20px rgba(102, 126, 234, 0.4);
-        }}
-        .test-status {{
-            padding: 8px 15px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: 600;
-            display: inline-block;
-        }}
-        .completed-status {{
-            background: #dcfce7;
-            color: #166534;
-        }}
-        .review-status {{
-            background: #fef3c7;
-            color: #92400e;
-        }}
-        .overdue-status {{
-            background: #fee2e2;
-            color: #991b1b;
-        }}
-        .no-tests {{
-            text-align: center;
-            padding: 60px 20px;
-            color: #64748b;
-        }}
-        .pending {{ border-left-color: #3b82f6; }}
-        .pending.urgent {{ border-left-color: #dc2626; animation: urgentPulse 2s infinite; }}
-        .submitted {{ border-left-color: #f59e0b; }}
-        .completed {{ border-left-color: #10b981; }}
-        .overdue {{ border-left-color: #dc2626; background: linear-gradient(135deg, #fef2f2, #fee2e2); }}
-        
-        @keyframes urgentPulse {{
-            0%, 100% {{ transform: scale(1); }}
-            50% {{ transform: scale(1.02); }}
-        }}
-        
-        .urgent-alert {{
-            background: #fee2e2;
-            border: 2px solid #dc2626;
-            color: #991b1b;
-            padding: 10px 15px;
-            border-radius: 8px;
-            margin: 10px 0;
-            font-weight: bold;
-            animation: urgentPulse 2s infinite;
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <div class="header-content">
-            <h1>👋 Welcome, {user.get('display_name', user_id)}</h1>
-            <a href="/logout" class="logout">Logout</a>
-        </div>
-    </div>
-    
-    <div class="container">
-        <div class="stats">
-            <div class="stat">
-                <div class="stat-num">{len(my_tests)}</div>
-                <div class="stat-label">Total Tests</div>
-            </div>
-            <div class="stat">
-                <div class="stat-num">{len([t for t in my_tests if t['status'] == 'pending'])}</div>
-                <div class="stat-label">Pending</div>
-            </div>
-            <div class="stat">
-                <div class="stat-num">{len([t for t in my_tests if t['status'] == 'completed'])}</div>
-                <div class="stat-label">Completed</div>
-            </div>
-            <div class="stat">
-                <div class="stat-num">{user.get('exp', 0)}+</div>
-                <div class="stat-label">Years Exp</div>
-            </div>
-        </div>
-        
-        <div class="section">
-            <h2>📋 My Assessments</h2>
-            {tests_html}
-        </div>
-    </div>
-</body>
-</html>'''
+    return render_template(
+        'student.html',
+        display_name=user.get('display_name', user_id),
+        exp=user.get('exp', 0),
+        cards=cards,
+        pending_count=sum(1 for c in cards if c['status'] == 'pending'),
+        completed_count=sum(1 for c in cards if c['status'] == 'completed')
+    )
 
 @app.route('/student/test/<test_id>', methods=['GET', 'POST'])
+@engineer_required
 def student_test(test_id):
-    if not session.get('user_id') or session.get('is_admin'):
-        return redirect('/login')
-    
-    test = assignments.get(test_id)
-    if not test or test['engineer_id'] != session['user_id']:
-        return redirect('/student')
-    
-    # Check if test is overdue and block access
-    if is_overdue(test['due']) and test['status'] == 'pending':
-        test['status'] = 'overdue'
+    test = storage.get_test(test_id)
+    if not test or test.engineer_id != current_user()['id']:
         return redirect('/student')
     
-    if request.method == 'POST' and test['status'] == 'pending':
-        # Double-check deadline before accepting submission
-        if is_overdue(test['due']):
-            test['status'] = 'overdue'
+    if request.method == 'POST' and test.status == 'pending':
+        # The scheduler may be a moment behind; never accept a late submission
+        if is_overdue(test.due):
+            storage.transition_test(test_id, 'pending', status='overdue')
             return redirect('/student')
-            
-        answers = {}
-        for i in range(18):  # 18 questions
-            answer = request.form.get(f'answer_{i}', '').strip()
-            if answer:
-                answers[str(i)] = answer
         
-        if len(answers) >= 15:  # At least 15 answers required
-            test['answers'] = answers
-            test['status'] = 'submitted'
-            test['submitted_date'] = datetime.now().isoformat()
+        # Autosave has normally sent every answer already; anything posted
+        # with the form (no JavaScript, or a failed save) takes precedence
+        drafts.flush(test_id, score=False)
+        test = storage.get_test(test_id) or test
+        answers = list(test.answers)
+        for i in range(len(answers)):
+            if f'answer_{i}' in request.form:
+                answers[i] = request.form[f'answer_{i}'].strip()[:MAX_ANSWER_LENGTH] or None
+        
+        if sum(1 for answer in answers if answer) >= 15:  # At least 15 answers required
+            # Answers scored as drafts keep their scores; only the rest
+            # (edited since, or never autosaved) go to the scoring workers
+            scores, reasoning, _ = reuse_draft_scores(test, answers)
+            unscored = any(answer and score is None for answer, score in zip(answers, scores))
             
-            # Auto-score the answers
-            test['auto_scores'] = {}
-            for i, answer in answers.items():
-                if answer:
-                    suggested_score, reasoning = analyze_answer_quality(
-                        test['questions'][int(i)], answer, test['topic']
-                    )
-                    test['auto_scores'][i] = {
-                        'score': suggested_score,
-                        'reasoning': reasoning
-                    }
+            # Only a still-pending test can be submitted (not one that just expired)
+            test = storage.transition_test(
+                test_id,
+                'pending',
+                answers=answers,
+                status='submitted',
+                submitted_date=time.time(),
+                auto_scores=scores,
+                reasoning=reasoning,
+                scored_hashes=None,
+                scoring=unscored
+            )
+            
+            # Auto-score the answers in the background
+            if test and unscored:
+                queue_scoring(test)
+            if test:
+                metrics.inc('pd_submissions_total', (('topic', test.topic),))
+                answer_index.submit(test)
+                engineer = storage.get_user(test.engineer_id) or {}
+                publish(('admins', 'submission', {
+                    'test_id': test.id,
+                    'engineer': engineer.get('display_name', test.engineer_id),
+                    'topic': test.topic,
+                    'scoring': test.scoring
+                }))
         
         return redirect('/student')
     
     # If already submitted or overdue, redirect
-    if test['status'] != 'pending':
+    if test.status != 'pending':
         return redirect('/student')
     
     # Calculate time remaining
-    time_remaining = get_time_remaining(test['due'])
+    time_remaining = get_time_remaining(test.due)
     is_urgent = 'remaining' in time_remaining and ('h' in time_remaining or 'm' in time_remaining)
     
-    questions_html = ''
-    for i, q in enumerate(test['questions']):
-        questions_html += f'''
-        <div class="question-card">
-            <div class="question-header">
-                <span class="question-number">Question {i+1} of 18</span>
-                <span class="topic-badge">{test["topic"].upper()}</span>
-            </div>
-            <div class="question-text">{q}</div>
-            <div class="answer-section">
-                <label for="answer_{i}">Your Answer:</label>
-                <textarea id="answer_{i}" name="answer_{i}" placeholder="Provide detailed technical answer..." required></textarea>
-                <div class="char-count" id="count_{i}">0 characters</div>
-            </div>
-        </div>'''
+    # Saved answers plus any edits this worker hasn't flushed yet
+    answers = list(test.answers)
+    for i, text in drafts.peek(test_id).items():
+        answers[i] = text
     
-    return f'''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>{test["topic"].upper()} Assessment - DEADLINE: 2 DAYS</title>
-    <style>
-        body {{ 
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-            margin: 0; 
-            min-height: 100vh;
-        }}
-        .header {{ 
-            background: rgba(255,255,255,0.15); 
-            backdrop-filter: blur(10px);
-            color: white; 
-            padding: 20px 0;
-            position: sticky;
-            top: 0;
-            z-index: 100;
-        }}
-        .header-content {{
-            max-width: 1000px;
-            margin: 0 auto;
-            padding: 0 20px;
-            text-align: center;
-        }}
-        .deadline-alert {{
-            background: {'linear-gradient(135deg, #dc2626, #b91c1c)' if is_urgent else 'linear-gradient(135deg, #f59e0b, #d97706)'};
-            color: white;
-            padding: 15px;
-            text-align: center;
-            font-weight: bold;
-            margin-bottom: 20px;
-            border-radius: 12px;
-            animation: {'urgentPulse 2s infinite' if is_urgent else 'none'};
-        }}
-        @keyframes urgentPulse {{
-            0%, 100% {{ transform: scale(1); }}
-            50% {{ transform: scale(1.02); }}
-        }}
-        .container {{ 
-            max-width: 1000px; 
-            margin: 20px auto; 
-            padding: 0 20px; 
-        }}
-        .test-info {{
-            background: rgba(255,255,255,0.95);
-            border-radius: 16px;
-            padding: 25px;
-            margin-bottom: 25px;
-            text-align: center;
-            border: {'3px solid #dc2626' if is_urgent else '2px solid #f59e0b'};
-        }}
-        .question-card {{
-            background: rgba(255,255,255,0.95);
-            border-radius: 16px;
-            padding: 30px;
-            margin: 25px 0;
-            box-shadow: 0 8px 25px rgba(0,0,0,0.1);
-        }}
-        .question-header {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 20px;
-        }}
-        .question-number {{
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            color: white;
-            padding: 8px 16px;
-            border-radius: 20px;
-            font-weight: 600;
-            font-size: 14px;
-        }}
-        .topic-badge {{
-            background: #f1f5f9;
-            color: #64748b;
-            padding: 6px 12px;
-            border-radius: 15px;
-            font-size: 12px;
-            font-weight: 600;
-        }}
-        .question-text {{
-            background: linear-gradient(135deg, #f8fafc, #f1f5f9);
-            padding: 20px;
-            border-radius: 12px;
-            margin-bottom: 20px;
-            border-left: 4px solid #667eea;
-            line-height: 1.6;
-            color: #1e293b;
-        }}
-        .answer-section label {{
-            display: block;
-            margin-bottom: 8px;
-            font-weight: 600;
-            color: #374151;
-        }}
-        textarea {{
-            width: 100%;
-            min-height: 120px;
-            padding: 16px;
-            border: 2px solid #e5e7eb;
-            border-radius: 12px;
-            font-size: 14px;
-            font-family: inherit;
-            resize: vertical;
-            transition: border-color 0.3s ease;
-        }}
-        textarea:focus {{
-            outline: none;
-            border-color: #667eea;
-            box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-        }}
-        .char-count {{
-            text-align: right;
-            font-size: 12px;
-            color: #64748b;
-            margin-top: 5px;
-        }}
-        .submit-section {{
-            background: rgba(255,255,255,0.95);
-            border-radius: 16px;
-            padding: 30px;
-            text-align: center;
-            margin-top: 30px;
-            border: {'3px solid #dc2626' if is_urgent else '2px solid #f59e0b'};
-        }}
-        .warning {{
-            background: #fef3c7;
-            border: 1px solid #f59e0b;
-            padding: 16px;
-            border-radius: 12px;
-            margin-bottom: 20px;
-            color: #92400e;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }}
-        .urgent-warning {{
-            background: #fee2e2;
-            border: 2px solid #dc2626;
-            color: #991b1b;
-            animation: urgentPulse 2s infinite;
-        }}
-        .btn {{
-            padding: 14px 28px;
-            border: none;
-            border-radius: 10px;
-            font-weight: 600;
-            cursor: pointer;
-            margin: 8px;
-            text-decoration: none;
-            display: inline-block;
-            transition: all 0.3s ease;
-        }}
-        .btn-primary {{
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            color: white;
-        }}
-        .btn-primary:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 8px 20px rgba(102, 126, 234, 0.4);
-        }}
-        .btn-secondary {{
-            background: rgba(107,114,128,0.1);
-            color: #374151;
-        }}
-        .progress-bar {{
-            background: #e5e7eb;
-            height: 6px;
-            border-radius: 3px;
-            margin: 20px 0;
-            overflow: hidden;
-        }}
-        .progress-fill {{
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            height: 100%;
-            width: 0%;
-            transition: width 0.3s ease;
-        }}
-        .time-remaining {{
-            font-size: 18px;
-            font-weight: bold;
-            color: {'#dc2626' if is_urgent else '#f59e0b'};
-            margin: 10px 0;
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <div class="header-content">
-            <h1>📝 {test["topic"].upper()} Assessment</h1>
-            <p>⏰ HARD DEADLINE: 2 DAYS FROM ASSIGNMENT</p>
-        </div>
-    </div>
+    return render_template(
+        'student_test.html',
+        test=test,
+        answers=answers,
+        is_urgent=is_urgent,
+        time_remaining=time_remaining
+    )
+
+def is_question_index(value, count):
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value < count
+
+def is_timestamp(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+
+@app.route('/student/test/<test_id>/draft', methods=['POST'])
+@engineer_required
+def student_test_draft(test_id):
+    """Autosave: takes {"answers": [[question index, text, edited at], ...]}
+    as JSON, edited at in epoch milliseconds.
+
+    The page sends one last save with "flush": true before submitting,
+    listing in "expect" [question index, edited at] for every answer it
+    has changed. That save is written to storage before the response,
+    which names in "missing" the questions storage has an older edit
+    for: saves still buffered in another worker. The page then posts
+    its answers with the form instead.
+    """
+    test = storage.get_test(test_id)
+    if not test or test.engineer_id != current_user()['id']:
+        return {'error': 'test not found'}, 404
+    if test.status != 'pending' or is_overdue(test.due):
+        return {'error': 'test is closed'}, 409
     
-    <div class="container">
-        <div class="deadline-alert">
-            🚨 MANDATORY DEADLINE: Complete within 2 days or test will be auto-locked! 🚨
-        </div>
-        
-        <div class="test-info">
-            <h2>📋 Assessment Details</h2>
-            <div class="time-remaining">⏰ {time_remaining}</div>
-            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 20px; margin-top: 20px;">
-                <div><strong>Questions:</strong> 18 Technical</div>
-                <div><strong>Max Points:</strong> 180 (10 each)</div>
-                <div><strong>Hard Deadline:</strong> {test["due"][:16].replace('T', ' ')}</div>
-                <div><strong>Topic:</strong> {test["topic"].upper()}</div>
-            </div>
-            <div class="progress-bar">
-                <div class="progress-fill" id="progressBar"></div>
-            </div>
-            <div id="progressText">Progress: 0/18 questions answered</div>
-        </div>
-        
-        <form method="POST" id="assessmentForm">
-            {questions_html}
-            
-            <div class="submit-section">
-                <div class="{'urgent-warning' if is_urgent else 'warning'}">
-                    {'🚨 URGENT: Less than 24 hours remaining! Submit immediately or lose access!' if is_urgent else '⚠️ DEADLINE ENFORCEMENT: Test will be automatically locked after 2 days. Submit before deadline!'}
-                </div>
-                <button type="submit" class="btn btn-primary" id="submitBtn" disabled>Submit Assessment</button>
-                <a href="/student" class="btn btn-secondary">Save & Exit</a>
-                <div style="margin-top: 15px; font-size: 14px; color: #64748b;">
-                    Auto-save enabled • Time remaining: <strong>{time_remaining}</strong>
-                </div>
-            </div>
-        </form>
-    </div>
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict):
+        return {'error': 'expected a JSON object'}, 400
+    answers = payload.get('answers') or []
+    expect = payload.get('expect') or []
+    if not (isinstance(answers, list) and isinstance(expect, list)):
+        return {'error': 'answers and expect must be lists'}, 400
+    count = len(test.questions)
+    edits = {}
+    for edit in answers:
+        if not (isinstance(edit, list) and len(edit) in (2, 3)):
+            return {'error': 'each edit must be [index, text, edited at]'}, 400
+        index, text, edited_at = (edit + [None])[:3]
+        if not (is_question_index(index, count) and isinstance(text, str) and
+                (edited_at is None or is_timestamp(edited_at))):
+            return {'error': f'bad edit for question {index!r}'}, 400
+        edits[index] = (text.strip()[:MAX_ANSWER_LENGTH] or None, edited_at)
+    for item in expect:
+        if not (isinstance(item, list) and len(item) == 2 and
+                is_question_index(item[0], count) and is_timestamp(item[1])):
+            return {'error': 'each expected edit must be [index, edited at]'}, 400
     
-    <script>
-        // Deadline checking
-        function checkDeadline() {{
-            const dueDate = new Date('{test["due"]}');
-            const now = new Date();
-            
-            if (now > dueDate) {{
-                alert('⏰ DEADLINE EXCEEDED! This test is now locked. Redirecting to dashboard.');
-                window.location.href = '/student';
-                return;
-            }}
-            
-            // Show warning if less than 2 hours remaining
-            const timeLeft = dueDate - now;
-            const hoursLeft = timeLeft / (1000 * 60 * 60);
-            
-            if (hoursLeft <= 2 && hoursLeft > 0) {{
-                document.body.style.background = 'linear-gradient(135deg, #dc2626 0%, #991b1b 100%)';
-            }}
-        }}
-        
-        // Check deadline every minute
-        setInterval(checkDeadline, 60000);
-        checkDeadline(); // Initial check
-        
-        // Character counting and progress tracking
-        const textareas = document.querySelectorAll('textarea');
-        const progressBar = document.getElementById('progressBar');
-        const progressText = document.getElementById('progressText');
-        const submitBtn = document.getElementById('submitBtn');
-        
-        textareas.forEach((textarea, index) => {{
-            const counter = document.getElementById(`count_${{index}}`);
-            
-            textarea.addEventListener('input', function() {{
-                const length = this.value.length;
-                counter.textContent = `${{length}} characters`;
-                
-                // Update progress
-                updateProgress();
-            }});
-        }});
-        
-        function updateProgress() {{
-            const answered = Array.from(textareas).filter(ta => ta.value.trim().length >= 20).length;
-            const percentage = (answered / 18) * 100;
-            
-            progressBar.style.width = percentage + '%';
-            progressText.textContent = `Progress: ${{answered}}/18 questions answered`;
-            
-            // Enable submit button if at least 15 questions answered
-            submitBtn.disabled = answered < 15;
-            if (answered >= 15) {{
-                submitBtn.style.opacity = '1';
-                submitBtn.style.cursor = 'pointer';
-            }} else {{
-                submitBtn.style.opacity = '0.6';
-                submitBtn.style.cursor = 'not-allowed';
-            }}
-        }}
-        
-        // Form submission validation
-        document.getElementById('assessmentForm').addEventListener('submit', function(e) {{
-            // Final deadline check
-            const dueDate = new Date('{test["due"]}');
-            const now = new Date();
-            
-            if (now > dueDate) {{
-                e.preventDefault();
-                alert('⏰ DEADLINE EXCEEDED! Cannot submit after deadline.');
-                window.location.href = '/student';
-                return false;
-            }}
-            
-            const answered = Array.from(textareas).filter(ta => ta.value.trim().length >= 20).length;
-            if (answered < 15) {{
-                e.preventDefault();
-                alert('Please answer at least 15 questions (minimum 20 characters each) before submitting.');
-                return false;
-            }}
-            
-            if (!confirm('⏰ FINAL SUBMISSION: Are you sure you want to submit? You cannot edit after submission and the deadline is enforced!')) {{
-                e.preventDefault();
-                return false;
-            }}
-        }});
-        
-        // Auto-save to localStorage
-        textareas.forEach((textarea, index) => {{
-            const key = `test_{test["id"]}_answer_${{index}}`;
-            textarea.value = localStorage.getItem(key) || '';
-            
-            textarea.addEventListener('input', function() {{
-                localStorage.setItem(key, this.value);
-            }});
-        }});
-        
-        // Initial progress update
-        updateProgress();
-    </script>
-</body>
-</html>'''
+    drafts.add(test_id, test.topic, test.question_version, edits)
+    if not payload.get('flush'):
+        return {'saved': len(edits)}
+    
+    # About to submit: write through, unscored, so the submit finds it
+    drafts.flush(test_id, score=False)
+    test = storage.get_test(test_id)
+    if not test or test.status != 'pending':
+        return {'error': 'test is closed'}, 409
+    saved_at = test.edited_at or [None] * count
+    missing = sorted({index for index, at in expect if saved_at[index] is None or saved_at[index] < at})
+    return {'saved': len(edits), 'missing': missing}
 
 if __name__ == '__main__':
     try:
@@ -0,0 +1,38 @@
+# asgi.py - async entry point, for many long-lived event streams:
+#
+#   WEB_WORKER_CLASS=asgi.EventStreamWorker gunicorn -c gunicorn.conf.py asgi:app
+#
+# GET /events is served on each worker's event loop (events.py); every
+# other request runs the Flask app on a pool of WEB_THREADS threads.
+# The uvicorn worker exits on a signal without running atexit, so
+# drafts and the scoring pool are stopped at lifespan shutdown instead.
+import os
+
+from a2wsgi import WSGIMiddleware
+from uvicorn.workers import UvicornWorker
+
+from app import (
+    DEADLINE_WARNING_SECONDS, EVENT_POLL_SECONDS, stop_background, storage, stream_audience, stream_deadlines
+)
+from events import EventHub, EventStreamApp
+from wsgi import app as flask_app
+
+hub = EventHub(storage, EVENT_POLL_SECONDS, DEADLINE_WARNING_SECONDS)
+app = EventStreamApp(
+    WSGIMiddleware(flask_app, workers=int(os.environ.get('WEB_THREADS', 4))),
+    hub,
+    stream_audience,
+    stream_deadlines,
+    on_shutdown=stop_background
+)
+
+
+class EventStreamWorker(UvicornWorker):
+    """uvicorn's gunicorn worker, except that on shutdown requests still
+    open (event streams never end by themselves) are cut after half of
+    graceful_timeout, leaving the rest for stop_background. Browsers
+    reconnect to another worker and replay what they missed."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = self.cfg.graceful_timeout / 2
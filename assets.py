@@ -0,0 +1,79 @@
+# assets.py - fingerprinted static files and response compression
+import gzip
+import hashlib
+import os
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Bodies smaller than this aren't worth the compression overhead
+MIN_COMPRESS_SIZE = 512
+
+COMPRESSIBLE_TYPES = ('text/html', 'text/css', 'application/javascript', 'text/javascript', 'application/json')
+
+
+class AssetStore:
+    """Static files with content fingerprints and precompressed bodies.
+
+    Everything under static/ is read and hashed once at startup. Pages
+    link to '<file>?v=<fingerprint>', so a changed file gets a new URL
+    and the old one can be cached forever. The gzip/brotli encodings of
+    each file are built here too, so serving an asset never compresses.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.files = {}
+        for name in sorted(os.listdir(folder)):
+            path = os.path.join(folder, name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            encoded = {'gzip': gzip.compress(data, 9, mtime=0)}
+            if brotli is not None:
+                encoded['br'] = brotli.compress(data)
+            self.files[name] = {
+                'version': hashlib.sha256(data).hexdigest()[:12],
+                'encoded': encoded
+            }
+
+    def version(self, name):
+        return self.files[name]['version']
+
+    def encoded(self, name, encoding):
+        return self.files[name]['encoded'].get(encoding)
+
+
+def pick_encoding(accept_encoding):
+    """Best content-coding the client accepts: 'br', 'gzip' or None"""
+    accepted = set()
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        # Quality 5 is close to gzip -9 in speed with noticeably smaller output
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, 6, mtime=0)
+
+
+def is_compressible(response):
+    return (
+        response.status_code == 200
+        and not response.direct_passthrough
+        and 'Content-Encoding' not in response.headers
+        and response.mimetype in COMPRESSIBLE_TYPES
+        and len(response.get_data()) >= MIN_COMPRESS_SIZE
+    )
@@ -0,0 +1,28 @@
+# background.py - per-process setup for objects that run background threads
+import os
+
+
+class Background:
+    """Base for objects whose threads and pools belong to one process.
+
+    Threads don't survive a fork, so each worker process has to start
+    its own. ensure_running() calls start_in_process() once per process
+    id, under self.lock, and is cheap to call on every request after
+    that. The process id is recorded only once start_in_process() has
+    returned, so a thread that finds it set also finds what it set up.
+    """
+
+    pid = None
+
+    def ensure_running(self):
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.start_in_process()
+            self.pid = os.getpid()
+
+    def start_in_process(self):
+        """Resets per-process state and starts this process's threads"""
+        raise NotImplementedError
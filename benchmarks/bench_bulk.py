@@ -0,0 +1,72 @@
+"""Benchmark: bulk assignment against one create_test call per test.
+
+Creates --count tests (every engineer x topic, repeated) once with a
+create_test loop, as the single-assignment form does, and once with
+create_tests through POST /admin/create/bulk, on both storage backends.
+
+    python benchmarks/bench_bulk.py [--count 5400] [--engineers 300]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['SCORING_WORKERS'] = '0'
+
+import app
+from storage import open_storage
+
+
+def add_engineers(count):
+    password = app.hash_pass('password123')
+    for n in range(1, count + 1):
+        app.storage.save_user({
+            'id': f'eng{n:03d}', 'username': f'eng{n:03d}', 'display_name': f'Engineer {n}',
+            'password': password, 'is_admin': False, 'exp': 3
+        })
+
+
+def measure(backend, path, count, engineers):
+    """Returns (loop seconds, bulk seconds) for count tests"""
+    app.set_storage(open_storage(backend, path))
+    app.init_data()
+    add_engineers(engineers)
+    topics = list(app.QUESTIONS)
+    eng_ids = [f'eng{n:03d}' for n in range(1, engineers + 1)]
+    pairs = [(e, t) for e in eng_ids for t in topics]
+    rounds = max(1, count // len(pairs))
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for eng_id, topic in pairs:
+            app.create_test(eng_id, topic)
+    loop = time.perf_counter() - start
+
+    client = app.app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'Vibhuaya@3006'})
+    start = time.perf_counter()
+    for _ in range(rounds):
+        response = client.post('/admin/create/bulk', json={'engineers': ['all'], 'topics': topics})
+        assert response.status_code == 201 and len(response.json['created']) == len(pairs), response.data
+    bulk = time.perf_counter() - start
+    assert app.storage.count_tests() == 2 * rounds * len(pairs)
+    return loop, bulk, rounds * len(pairs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=5400)
+    parser.add_argument('--engineers', type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'backend':8s} {'tests':>6s} {'create_test loop':>17s} {'bulk request':>13s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend, path in (('memory', None), ('sqlite', os.path.join(tmp, 'bulk.db'))):
+            loop, bulk, created = measure(backend, path, args.count, args.engineers)
+            print(f"{backend:8s} {created:6d} {loop * 1000:15.0f}ms {bulk * 1000:11.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
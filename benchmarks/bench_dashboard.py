@@ -0,0 +1,68 @@
+"""Benchmark: dashboard latency as the test archive grows.
+
+Seeds the in-memory store with a growing archive of completed tests
+from past cohorts, while the current cohort (eng001-eng018) keeps the
+same handful of tests. With indexed lookups the /student, /admin and
+/admin/review pages should cost the same at every archive size.
+
+    python benchmarks/bench_dashboard.py [--sizes 1000 10000 50000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['STORAGE_BACKEND'] = 'memory'
+
+import app
+from storage import MemoryStorage
+
+
+def seed(archive_size):
+    app.set_storage(MemoryStorage())
+    app.init_data()
+    topics = list(app.QUESTIONS)
+    for n in range(archive_size):
+        test = app.create_test(f'past{n % 500:03d}', topics[n % 3])
+        app.storage.update_test(test.id, status='completed', score=120)
+    for n in range(1, 19):
+        for topic in topics:
+            test = app.create_test(f'eng{n:03d}', topic)
+        app.storage.update_test(test.id, status='submitted', answers=['answer'] + [None] * 17)
+
+
+def login(client, username, password):
+    client.get('/logout')
+    client.post('/login', data={'username': username, 'password': password})
+
+
+def latency_ms(client, path, repeat):
+    client.get(path)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        response = client.get(path)
+        assert response.status_code == 200, f"{path}: {response.status}"
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'archived tests':>15}  {'/student':>10}  {'/admin':>10}  {'/admin/review':>14}")
+    for size in args.sizes:
+        seed(size)
+        client = app.app.test_client()
+        login(client, 'eng001', 'password123')
+        student = latency_ms(client, '/student', args.repeat)
+        login(client, 'admin', 'Vibhuaya@3006')
+        admin = latency_ms(client, '/admin', args.repeat)
+        review = latency_ms(client, '/admin/review', args.repeat)
+        print(f"{size:>15}  {student:>8.2f}ms  {admin:>8.2f}ms  {review:>12.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
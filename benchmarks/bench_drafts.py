@@ -0,0 +1,71 @@
+"""Benchmark: autosave traffic and storage writes while engineers type.
+
+Every engineer works through one test, sending a draft request per
+debounce window (a couple of questions per request) while the
+flusher writes the buffer to a SQLite file. Reports draft requests
+per second, how many storage writes the edits coalesced into, and the
+size of the final save that confirms a submission compared with
+posting all 18 answers.
+
+    python benchmarks/bench_drafts.py [--engineers 18] [--saves 60] [--flush 0.5]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TMP = tempfile.mkdtemp()
+os.environ['STORAGE_BACKEND'] = 'sqlite'
+os.environ['DATABASE_PATH'] = os.path.join(TMP, 'drafts.db')
+os.environ['SCORING_WORKERS'] = '0'
+
+import app
+
+ANSWER = 'Setup and hold slack with clock skew, OCV derates and a systematic approach. ' * 6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--engineers', type=int, default=18)
+    parser.add_argument('--saves', type=int, default=60, help='draft requests per engineer')
+    parser.add_argument('--flush', type=float, default=0.5, help='flush interval in seconds')
+    args = parser.parse_args()
+
+    app.drafts.flush_seconds = args.flush
+    app.init_data()
+    sessions = []
+    for n in range(args.engineers):
+        eng_id = f'eng{n % 18 + 1:03d}'
+        client = app.app.test_client()
+        client.post('/login', data={'username': eng_id, 'password': 'password123'})
+        sessions.append((client, app.create_test(eng_id, 'sta').id))
+
+    start = time.perf_counter()
+    for save in range(args.saves):
+        for client, test_id in sessions:
+            # Typing in one or two questions since the last save
+            edited_at = int(time.time() * 1000)
+            edits = [[save % 18, ANSWER[:40 + save * 7], edited_at], [(save + 1) % 18, ANSWER[:30 + save * 5], edited_at]]
+            client.post(f'/student/test/{test_id}/draft', json={'answers': edits})
+    elapsed = time.perf_counter() - start
+    app.drafts.flush()
+    requests = args.saves * args.engineers
+    stats = app.drafts.stats()
+
+    full_form = len(urlencode({f'answer_{i}': ANSWER for i in range(18)}))
+    # Nothing left unsaved: the final save only lists when each answer was typed
+    edited_at = int(time.time() * 1000)
+    final_save = len(json.dumps({'answers': [], 'flush': True, 'expect': [[i, edited_at] for i in range(18)]}))
+    print(f"{args.engineers} engineers x {args.saves} autosaves, flush every {args.flush:g}s")
+    print(f"draft requests: {requests / elapsed:8.0f}/s  ({elapsed / requests * 1000:.3f} ms each)")
+    print(f"edits: {stats['edits']}  storage writes: {stats['writes']}  "
+          f"({stats['edits'] / max(1, stats['writes']):.1f} edits per write)")
+    print(f"final save before submit: {final_save} bytes (was {full_form} bytes with every answer posted)")
+
+
+if __name__ == '__main__':
+    main()
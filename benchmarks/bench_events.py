@@ -0,0 +1,137 @@
+"""Benchmark: cost of open event streams against page polling.
+
+Starts gunicorn with the event stream worker (asgi:app) on a fresh SQLite
+database, opens --streams admin event streams and measures:
+
+  memory   worker RSS growth per open stream
+  idle     worker CPU used in --idle seconds with every stream open
+  fan-out  time from an engineer's submit returning to the
+           "submission" event reaching every stream
+  polling  worker CPU to serve the same number of /admin/review page
+           loads, i.e. one poll per client
+
+    python benchmarks/bench_events.py [--streams 2000] [--idle 10] [--workers 1]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATABASE = os.path.join(tempfile.mkdtemp(prefix='pd-events-'), 'events.db')
+os.environ['STORAGE_BACKEND'] = 'sqlite'
+os.environ['DATABASE_PATH'] = DATABASE
+
+import app
+from load_test import ADMIN, Client, ENGINEER, start_server
+
+
+def workers_of(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+
+def rss_mb(pids, field='VmRSS'):
+    """Summed resident set (or another /proc status field) of pids"""
+    total = 0
+    for pid in pids:
+        with open(f'/proc/{pid}/status') as f:
+            total += next(int(line.split()[1]) for line in f if line.startswith(field + ':'))
+    return total / 1024
+
+
+def cpu_seconds(pids):
+    total = 0
+    for pid in pids:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        total += int(fields[11]) + int(fields[12])
+    return total / os.sysconf('SC_CLK_TCK')
+
+
+async def open_stream(port, cookie):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET /events HTTP/1.1\r\nHost: localhost\r\nCookie: {cookie}\r\n\r\n'.encode())
+    await writer.drain()
+    status = await reader.readline()
+    if b' 200 ' not in status:
+        raise RuntimeError(f'event stream refused: {status!r}')
+    while await reader.readline() not in (b'\r\n', b''):
+        pass
+    return reader, writer
+
+
+async def wait_for(reader, kind):
+    marker = f'event: {kind}'.encode()
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise RuntimeError('event stream closed')
+        if line.startswith(marker):
+            return time.perf_counter()
+
+
+async def measure(port, server, streams, idle):
+    admin, engineer = Client('127.0.0.1', port), Client('127.0.0.1', port)
+    admin.login(ADMIN)
+    engineer.login(ENGINEER)
+    pids = workers_of(server.pid)
+    before = rss_mb(pids)
+
+    opened = []
+    for start in range(0, streams, 200):
+        opened += await asyncio.gather(*(open_stream(port, admin.cookie) for _ in range(start, min(streams, start + 200))))
+    await asyncio.sleep(1)
+    after = rss_mb(pids)
+    print(f"memory:  {before:.1f} MB -> {after:.1f} MB with {streams} streams "
+          f"({(after - before) * 1024 / streams:.1f} KB per stream)")
+
+    cpu = cpu_seconds(pids)
+    await asyncio.sleep(idle)
+    print(f"idle:    {cpu_seconds(pids) - cpu:.2f} CPU s in {idle:g}s with {streams} streams open")
+
+    test = app.create_test(ENGINEER[0], 'sta')
+    form = {f'answer_{i}': f'First, setup and hold slack with clock skew, answer {i}' for i in range(18)}
+    waiters = [asyncio.ensure_future(wait_for(reader, 'submission')) for reader, _ in opened]
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, engineer.request, 'POST', f'/student/test/{test.id}', form)
+    submitted = time.perf_counter()
+    arrivals = sorted(await asyncio.wait_for(asyncio.gather(*waiters), 30))
+    print(f"fan-out: submission reached {len(arrivals)} streams, "
+          f"first after {(arrivals[0] - submitted) * 1000:.0f} ms, last after {(arrivals[-1] - submitted) * 1000:.0f} ms")
+
+    cpu = cpu_seconds(pids)
+    for _ in range(streams):
+        await loop.run_in_executor(None, admin.request, 'GET', '/admin/review')
+    print(f"polling: {cpu_seconds(pids) - cpu:.2f} CPU s to serve {streams} /admin/review loads (one poll each)")
+
+    for _, writer in opened:
+        writer.close()
+    print(f"peak worker RSS {rss_mb(pids, 'VmHWM'):.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--streams', type=int, default=2000)
+    parser.add_argument('--idle', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    app.init_data()
+    server, port = start_server(
+        'asgi:app', DATABASE_PATH=DATABASE, WEB_CONCURRENCY=str(args.workers),
+        WEB_WORKER_CLASS='asgi.EventStreamWorker'
+    )
+    try:
+        asyncio.run(measure(port, server, args.streams, args.idle))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
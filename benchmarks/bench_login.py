@@ -0,0 +1,146 @@
+"""Benchmark: login throughput under a burst.
+
+Seeds --users accounts, each with its own scrypt hash, on a fresh SQLite
+database, then runs three phases from --clients threads:
+
+  burst   every user logs in at once; a login refused as busy (503) is
+          retried after its Retry-After, as a person would
+  again   the same burst a second time, answered from the credential
+          cache instead of the KDF
+  flood   one address sends wrong passwords until it is rate limited
+          (429)
+
+During each phase a bystander thread keeps loading /health, to show
+whether logins crowd out other requests. By default requests go
+in-process through the Flask test client (one worker's KDF pool); with
+--serve they go over HTTP to gunicorn (gunicorn.conf.py, so several
+workers).
+
+    python benchmarks/bench_login.py [--users 100] [--clients 16] [--serve]
+"""
+import argparse
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATABASE = os.path.join(tempfile.mkdtemp(prefix='pd-login-'), 'login.db')
+os.environ['STORAGE_BACKEND'] = 'sqlite'
+os.environ['DATABASE_PATH'] = DATABASE
+
+import app
+from load_test import Client, TestClient, percentile, start_server
+
+
+def seed(users):
+    app.init_data()
+    for n in range(users):
+        app.storage.save_user({
+            'id': f'user{n:04d}',
+            'username': f'user{n:04d}',
+            'display_name': f'User {n}',
+            'password': app.hash_pass(f'password-{n}'),
+            'is_admin': False,
+            'exp': 3
+        })
+
+
+def bystander(make_client, stop, latencies):
+    client = make_client()
+    while not stop.is_set():
+        start = time.perf_counter()
+        client.request('GET', '/health')
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.01)
+
+
+def run_phase(make_client, clients, attempts):
+    """Runs attempts (username, password, expected status) on threads.
+
+    Returns (wall seconds, latencies of the final attempts, statuses
+    seen, bystander latencies).
+    """
+    pending = queue.Queue()
+    for attempt in attempts:
+        pending.put(attempt)
+    latencies, statuses, lock = [], {}, threading.Lock()
+
+    def worker():
+        client = make_client()
+        while True:
+            try:
+                username, password, done_status = pending.get_nowait()
+            except queue.Empty:
+                return
+            start = time.perf_counter()
+            while True:
+                status = client.request('POST', '/login', {'username': username, 'password': password})
+                with lock:
+                    statuses[status] = statuses.get(status, 0) + 1
+                if status != 503 or done_status == 503:
+                    break
+                time.sleep(float(client.retry_after or 1))
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    stop, quiet = threading.Event(), []
+    watcher = threading.Thread(target=bystander, args=(make_client, stop, quiet))
+    watcher.start()
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    watcher.join()
+    return elapsed, sorted(latencies), statuses, sorted(quiet)
+
+
+def report(name, elapsed, latencies, statuses, quiet):
+    codes = ', '.join(f'{count} x {status}' for status, count in sorted(statuses.items()))
+    print(f"{name:6s} {len(latencies)} logins in {elapsed:.2f}s ({len(latencies) / elapsed:.0f}/s), "
+          f"p50 {percentile(latencies, 50) * 1000:.0f} ms, p95 {percentile(latencies, 95) * 1000:.0f} ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.0f} ms  [{codes}]")
+    print(f"{'':6s} /health meanwhile: p50 {percentile(quiet, 50) * 1000:.1f} ms, "
+          f"p95 {percentile(quiet, 95) * 1000:.1f} ms over {len(quiet)} requests")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--flood', type=int, default=200, help='wrong passwords sent in the flood phase')
+    parser.add_argument('--serve', action='store_true', help='log in over HTTP against gunicorn')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seed(args.users)
+    print(f"seeded {args.users} users in {time.perf_counter() - start:.1f}s")
+
+    server = None
+    if args.serve:
+        server, port = start_server()
+        make_client = lambda: Client('127.0.0.1', port)
+    else:
+        make_client = lambda: TestClient(app.app)
+    try:
+        burst = [(f'user{n:04d}', f'password-{n}', 302) for n in range(args.users)]
+        report('burst', *run_phase(make_client, args.clients, burst))
+        report('again', *run_phase(make_client, args.clients, burst))
+        flood = [('user0000', 'wrong', 429)] * args.flood
+        report('flood', *run_phase(make_client, args.clients, flood))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
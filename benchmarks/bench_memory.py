@@ -0,0 +1,112 @@
+"""Benchmark: memory held by the in-memory store per 10k tests.
+
+Assigns tests, fills in 18 answers each (distinct strings per test, as
+real submissions would be), auto-scores them with the batch rescorer
+and measures the Python heap the store grew by, using tracemalloc.
+Answer text is the bulk of it, so the answer bytes are reported as
+well and the per-test record overhead is shown separately. The score
+memo the rescore fills (capped by SCORE_MEMO_BYTES, not per test) is
+emptied after the snapshot and reported on its own.
+
+Pass --ref to run the same measurement against an older commit:
+
+    python benchmarks/bench_memory.py [--tests 10000] [--ref HEAD~1]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(root, count):
+    """Returns (heap bytes, answer bytes, score memo bytes) for count
+    submitted, scored tests"""
+    sys.path.insert(0, root)
+    sys.path.insert(0, os.path.join(root, 'benchmarks'))
+    os.environ['STORAGE_BACKEND'] = 'memory'
+    os.environ['SCORING_WORKERS'] = '0'
+    import app
+    from bench_scoring import make_answers
+
+    app.init_data()
+    samples = [answer for _, answer, _ in make_answers(18, 40, seed=3)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    answer_bytes = 0
+    for n in range(count):
+        test = app.create_test(f'eng{n % 18 + 1:03d}', ('sta', 'cts', 'signoff')[n % 3])
+        answers = [f'{text} {n}' for text in samples]
+        answer_bytes += sum(sys.getsizeof(a) for a in answers)
+        if isinstance(test, dict):
+            answers = {str(i): answer for i, answer in enumerate(answers)}
+            test_id = test['id']
+        else:
+            test_id = test.id
+        app.storage.update_test(test_id, answers=answers, status='submitted', submitted_date=time.time())
+    app.rescore_assignments(app.storage.list_tests())
+    used = tracemalloc.get_traced_memory()[0] - before
+    memo_bytes = 0
+    memo = getattr(app, 'score_memo', None)
+    if memo is not None:
+        # What the memo alone holds: reasoning it shares with the records stays
+        memo.entries.clear()
+        memo_bytes = used - (tracemalloc.get_traced_memory()[0] - before)
+    tracemalloc.stop()
+    return used, answer_bytes, memo_bytes
+
+
+def measure_ref(ref, count):
+    """Exports ref into a temp dir and measures it in a fresh interpreter"""
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = subprocess.run(['git', 'archive', ref], cwd=ROOT, check=True,
+                                 capture_output=True).stdout
+        with tempfile.TemporaryFile() as f:
+            f.write(archive)
+            f.seek(0)
+            tarfile.open(fileobj=f).extractall(tmp)
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--root', tmp, '--json',
+             '--tests', str(count)],
+            cwd=tmp, check=True, capture_output=True, text=True
+        ).stdout
+        return json.loads(output.splitlines()[-1])
+
+
+def report(label, used, answer_bytes, memo_bytes, count):
+    scale = 10000 / count
+    print(f"{label:>12}  {used * scale / 2**20:9.1f} MB  {answer_bytes * scale / 2**20:9.1f} MB"
+          f"  {(used - answer_bytes - memo_bytes) * scale / 2**20:9.1f} MB  {memo_bytes / 2**20:9.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tests', type=int, default=10000)
+    parser.add_argument('--ref', help='git ref to compare against')
+    parser.add_argument('--root', default=ROOT, help=argparse.SUPPRESS)
+    parser.add_argument('--json', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        current = measure(args.root, args.tests)
+    if args.json:
+        print(json.dumps(current))
+        return
+
+    print(f"per 10k submitted, scored tests ({args.tests} measured)")
+    print(f"{'':>12}  {'total':>12}  {'answers':>12}  {'records':>12}  {'score memo':>12}")
+    report('current', *current, args.tests)
+    if args.ref:
+        report(args.ref, *measure_ref(args.ref, args.tests), args.tests)
+
+
+if __name__ == '__main__':
+    main()
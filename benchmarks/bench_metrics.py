@@ -0,0 +1,86 @@
+"""Benchmark: cost of recording metrics on the request path.
+
+Several threads each record a submission counter and a latency
+observation per iteration, the way the submit handler does. The same
+loop then runs against a single dict guarded by one lock, for
+comparison. Also times building /metrics from several worker files.
+
+    python benchmarks/bench_metrics.py [--threads 8] [--events 100000] [--workers 4]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import LATENCY_BUCKETS, Metrics
+
+
+class LockedMetrics:
+    """One shared dict behind one lock (reference only)"""
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def inc(self, name, labels=(), value=1):
+        with self.lock:
+            self.counters[(name, labels)] = self.counters.get((name, labels), 0) + value
+
+    def observe(self, name, labels, seconds):
+        with self.lock:
+            histogram = self.histograms.setdefault((name, labels), [0] * (len(LATENCY_BUCKETS) + 1) + [0.0])
+            histogram[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            histogram[-1] += seconds
+
+
+def hammer(sink, threads, events):
+    labels = [(('topic', topic),) for topic in ('sta', 'cts', 'signoff')]
+    routes = [(('route', route),) for route in ('GET /student', 'POST /student/test/<test_id>')]
+
+    def work():
+        for n in range(events):
+            sink.inc('pd_submissions_total', labels[n % 3])
+            sink.observe('pd_request_duration_seconds', routes[n % 2], 0.003)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * events / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--events', type=int, default=100000, help='per thread')
+    parser.add_argument('--workers', type=int, default=4, help='worker files for /metrics')
+    args = parser.parse_args()
+
+    sharded = Metrics()
+    print(f"{args.threads} threads x {args.events} events (one counter + one histogram each)")
+    print(f"sharded: {hammer(sharded, args.threads, args.events):10.0f} events/s")
+    print(f"locked:  {hammer(LockedMetrics(), args.threads, args.events):10.0f} events/s")
+    counters, _ = sharded.snapshot()
+    assert sum(counters.values()) == args.threads * args.events
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sharded.directory = tmp
+        for pid in range(args.workers):
+            sharded.flush()
+            os.rename(os.path.join(tmp, f'{os.getpid()}.json'), os.path.join(tmp, f'{pid}.json'))
+        start = time.perf_counter()
+        text = sharded.render([('pd_tests', (('status', 'submitted'),), 12)])
+        elapsed = time.perf_counter() - start
+    print(f"/metrics from {args.workers} worker files: {elapsed * 1000:.2f} ms, {len(text)} bytes")
+
+
+if __name__ == '__main__':
+    main()
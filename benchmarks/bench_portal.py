@@ -0,0 +1,277 @@
+"""Benchmark: whole-portal flows, compared with a stored baseline.
+
+Seeds --engineers engineers (eng001 onwards, password123) and --tests
+tests spread over them and the three topics, on a fresh SQLite
+database. Then replays what people do with the portal:
+
+  engineers  log in, open the dashboard, open each of their tests and
+             submit 18 answers, open the dashboard again
+  admin      log in, open the admin page and the review list, then
+             open and grade every submitted test
+
+Sessions run on --clients threads. By default requests go in-process
+through the Flask test client; with --serve a gunicorn server
+(gunicorn.conf.py, so several workers) is started on the same database
+and requests go over keep-alive HTTP connections.
+
+Reports requests/s, p50/p95/p99 per step and peak RSS (this process,
+or the largest server process with --serve). Results are compared with
+the baseline for the same mode: throughput or peak RSS that got worse,
+or the p95 of a step with at least MIN_COMPARED requests that grew, by
+more than --tolerance makes the script exit with status 1.
+--save-baseline records the run as the new baseline.
+
+    python benchmarks/bench_portal.py [--engineers 50] [--tests 300] [--clients 4] [--serve]
+                                      [--baseline benchmarks/portal_baseline.json] [--save-baseline]
+"""
+import argparse
+import json
+import os
+import queue
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATABASE = os.path.join(tempfile.mkdtemp(prefix='pd-bench-'), 'portal.db')
+os.environ['STORAGE_BACKEND'] = 'sqlite'
+os.environ['DATABASE_PATH'] = DATABASE
+
+import app
+from bench_scoring import make_answers
+from load_test import ADMIN, Client, TestClient, percentile, start_server
+
+TOPICS = ('sta', 'cts', 'signoff')
+
+# Steps with fewer requests than this aren't compared with the baseline
+MIN_COMPARED = 20
+
+
+
+def seed(engineers, tests):
+    """Creates the accounts and tests; returns {engineer id: [test ids]}"""
+    app.init_data()
+    password = app.hash_pass('password123')
+    for n in range(19, engineers + 1):
+        app.storage.save_user({
+            'id': f'eng{n:03d}',
+            'username': f'eng{n:03d}',
+            'display_name': f'Engineer {n}',
+            'password': password,
+            'is_admin': False,
+            'exp': 3 + n % 4
+        })
+    assigned = {f'eng{n:03d}': [] for n in range(1, engineers + 1)}
+    for n in range(tests):
+        eng_id = f'eng{n % engineers + 1:03d}'
+        assigned[eng_id].append(app.create_test(eng_id, TOPICS[n % len(TOPICS)]).id)
+    return assigned
+
+
+class Recorder:
+    """Latencies per step, from every client thread"""
+
+    def __init__(self):
+        self.steps = {}
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def timed(self, client, step, method, path, form=None):
+        start = time.perf_counter()
+        status = client.request(method, path, form)
+        while status == 503 and client.retry_after:
+            # Too many logins at once: wait as told, as a person would
+            time.sleep(float(client.retry_after))
+            status = client.request(method, path, form)
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.steps.setdefault(step, []).append(elapsed)
+            if status >= 400:
+                self.errors += 1
+
+
+def engineer_session(make_client, recorder, eng_id, test_ids, words):
+    client = make_client()
+    recorder.timed(client, 'POST /login', 'POST', '/login', {'username': eng_id, 'password': 'password123'})
+    recorder.timed(client, 'GET /student', 'GET', '/student')
+    for test_id in test_ids:
+        # Distinct text per test, or every answer would be a near-duplicate
+        answers = make_answers(18, words, seed=test_id)
+        form = {f'answer_{i}': answer for i, (_, answer, _) in enumerate(answers)}
+        recorder.timed(client, 'GET /student/test/<id>', 'GET', f'/student/test/{test_id}')
+        recorder.timed(client, 'POST /student/test/<id>', 'POST', f'/student/test/{test_id}', form)
+    recorder.timed(client, 'GET /student', 'GET', '/student')
+
+
+def admin_session(make_client, recorder, test_ids):
+    client = make_client()
+    username, password = ADMIN
+    recorder.timed(client, 'POST /login', 'POST', '/login', {'username': username, 'password': password})
+    recorder.timed(client, 'GET /admin', 'GET', '/admin')
+    recorder.timed(client, 'GET /admin/review', 'GET', '/admin/review')
+    for n, test_id in enumerate(test_ids):
+        form = {f'score_{i}': str((n + i) % 11) for i in range(18)}
+        recorder.timed(client, 'GET /admin/review/<id>', 'GET', f'/admin/review/{test_id}')
+        recorder.timed(client, 'POST /admin/review/<id>', 'POST', f'/admin/review/{test_id}', form)
+
+
+def run_sessions(sessions, clients):
+    """Runs the session callables on `clients` threads; returns wall seconds"""
+    pending = queue.Queue()
+    for session in sessions:
+        pending.put(session)
+
+    def worker():
+        while True:
+            try:
+                session = pending.get_nowait()
+            except queue.Empty:
+                return
+            session()
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def peak_rss_mb(pid):
+    """Largest VmHWM (peak resident set) among pid and its children"""
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            pids += [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+    peak = 0
+    for p in pids:
+        try:
+            with open(f'/proc/{p}/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        peak = max(peak, int(line.split()[1]))
+        except OSError:
+            continue
+    return peak / 1024
+
+
+def compare(result, baseline, tolerance):
+    """Prints the change against baseline; returns the regressions found"""
+    regressions = []
+
+    def check(label, now, then, higher_is_worse=True):
+        if not then:
+            return
+        change = now / then - 1
+        worse = change > tolerance if higher_is_worse else change < -tolerance
+        print(f"  {label:32s} {then:10.2f} -> {now:10.2f}  {change:+7.1%}{'  ⚠️ regression' if worse else ''}")
+        if worse:
+            regressions.append(label)
+
+    print(f"\nagainst baseline (tolerance {tolerance:.0%}):")
+    check('requests/s', result['requests_per_second'], baseline['requests_per_second'], higher_is_worse=False)
+    check('peak RSS MB', result['peak_rss_mb'], baseline['peak_rss_mb'])
+    for step, stats in result['steps'].items():
+        # A p95 over a handful of requests is mostly noise
+        if step in baseline['steps'] and stats['count'] >= MIN_COMPARED:
+            check(f'{step} p95 ms', stats['p95'], baseline['steps'][step]['p95'])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--engineers', type=int, default=50)
+    parser.add_argument('--tests', type=int, default=300)
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--words', type=int, default=120, help='words per answer')
+    parser.add_argument('--serve', action='store_true', help='replay over HTTP against gunicorn')
+    parser.add_argument('--baseline', default=os.path.join(ROOT, 'benchmarks', 'portal_baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='allowed change, as a fraction (run-to-run noise is about 25%%)')
+    args = parser.parse_args()
+
+    mode = 'serve' if args.serve else 'test_client'
+    assigned = seed(args.engineers, args.tests)
+
+    server = None
+    if args.serve:
+        server, port = start_server()
+        make_client = lambda: Client('127.0.0.1', port)
+    else:
+        make_client = lambda: TestClient(app.app)
+
+    recorder = Recorder()
+    try:
+        elapsed = run_sessions(
+            [lambda e=e, t=t: engineer_session(make_client, recorder, e, t, args.words) for e, t in assigned.items()],
+            args.clients
+        )
+        test_ids = [test_id for ids in assigned.values() for test_id in ids]
+        shares = [test_ids[k::args.clients] for k in range(args.clients)]
+        elapsed += run_sessions(
+            [lambda s=s: admin_session(make_client, recorder, s) for s in shares if s],
+            args.clients
+        )
+        if server:
+            rss = peak_rss_mb(server.pid)
+        else:
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    total = sum(len(latencies) for latencies in recorder.steps.values())
+    result = {
+        'config': {'engineers': args.engineers, 'tests': args.tests, 'clients': args.clients, 'words': args.words},
+        'requests_per_second': round(total / elapsed, 1),
+        'peak_rss_mb': round(rss, 1),
+        'steps': {}
+    }
+    print(f"{mode}: {args.engineers} engineers, {args.tests} tests, {args.clients} clients")
+    print(f"{'step':28s} {'count':>6s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}")
+    for step, latencies in recorder.steps.items():
+        latencies.sort()
+        stats = {
+            'count': len(latencies),
+            'p50': round(percentile(latencies, 50) * 1000, 3),
+            'p95': round(percentile(latencies, 95) * 1000, 3),
+            'p99': round(percentile(latencies, 99) * 1000, 3)
+        }
+        result['steps'][step] = stats
+        print(f"{step:28s} {stats['count']:6d} {stats['p50']:9.2f} {stats['p95']:9.2f} {stats['p99']:9.2f}")
+    print(f"{total} requests in {elapsed:.2f}s: {result['requests_per_second']:.0f} req/s, "
+          f"{recorder.errors} errors, peak RSS {rss:.0f} MB")
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    if args.save_baseline:
+        baselines[mode] = result
+        with open(args.baseline, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"✅ Saved {mode} baseline to {args.baseline}")
+        return
+    baseline = baselines.get(mode)
+    if baseline is None:
+        print(f"No {mode} baseline in {args.baseline}; run with --save-baseline to record one")
+        return
+    if baseline['config'] != result['config']:
+        print(f"⚠️ Baseline was recorded with {baseline['config']}; comparing anyway")
+    regressions = compare(result, baseline, args.tolerance)
+    if regressions or recorder.errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Benchmark: page size and render latency for every portal page.
+
+Renders each page through the Flask test client on the in-memory
+backend and reports the response bytes and mean latency, plus the bytes
+a browser actually receives: once with Accept-Encoding: br, gzip, and
+again on a repeat visit that revalidates its copy with If-None-Match.
+Static files are counted separately: browsers fetch them once and cache
+them, so they are not part of the per-page cost.
+
+Pass --ref to run the same measurement against an older commit (for
+example the last one with inline f-string HTML) and print both side by
+side:
+
+    python benchmarks/bench_render.py [--repeat 300] [--ref HEAD~1]
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ['/login', '/admin', '/admin/review', '/admin/review/<id>', '/student', '/student/test/<id>']
+
+
+def measure(root, repeat):
+    """Returns {page: (bytes, ms, wire bytes, repeat bytes)} for the app at root"""
+    sys.path.insert(0, root)
+    os.environ['STORAGE_BACKEND'] = 'memory'
+    os.environ['SCORING_WORKERS'] = '0'
+    import app
+
+    app.init_data()
+    client = app.app.test_client()
+
+    def login(username, password):
+        client.get('/logout')
+        client.post('/login', data={'username': username, 'password': password})
+
+    # One pending and one graded-pending test for eng001
+    login('admin', 'Vibhuaya@3006')
+    client.post('/admin/create', data={'engineer_id': 'eng001', 'topic': 'sta'})
+    client.post('/admin/create', data={'engineer_id': 'eng001', 'topic': 'cts'})
+    login('eng001', 'password123')
+    ids = re.findall(rb'/student/test/([^"]+)"', client.get('/student').data)
+    pending_id, submitted_id = ids[0].decode(), ids[1].decode()
+    answers = {f'answer_{i}': 'Setup and hold slack with clock skew and OCV derates. ' * 4 for i in range(18)}
+    client.post(f'/student/test/{submitted_id}', data=answers)
+
+    def time_page(path):
+        client.get(path)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            response = client.get(path)
+        ms = (time.perf_counter() - start) / repeat * 1000
+        first = client.get(path, headers={'Accept-Encoding': 'br, gzip'})
+        revalidate = {'Accept-Encoding': 'br, gzip'}
+        if first.headers.get('ETag'):
+            revalidate['If-None-Match'] = first.headers['ETag']
+        again = client.get(path, headers=revalidate)
+        return len(response.data), ms, len(first.data), len(again.data)
+
+    results = {}
+    client.get('/logout')
+    results['/login'] = time_page('/login')
+    login('admin', 'Vibhuaya@3006')
+    results['/admin'] = time_page('/admin')
+    results['/admin/review'] = time_page('/admin/review')
+    results['/admin/review/<id>'] = time_page(f'/admin/review/{submitted_id}')
+    login('eng001', 'password123')
+    results['/student'] = time_page('/student')
+    results['/student/test/<id>'] = time_page(f'/student/test/{pending_id}')
+
+    static = os.path.join(root, 'static')
+    if os.path.isdir(static):
+        size = sum(os.path.getsize(os.path.join(static, name)) for name in os.listdir(static))
+        results['static files'] = (size, 0.0, 0, 0)
+    return results
+
+
+def measure_ref(ref, repeat):
+    """Exports ref into a temp dir and measures it in a fresh interpreter"""
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = subprocess.run(['git', 'archive', ref], cwd=ROOT, check=True,
+                                 capture_output=True).stdout
+        with tempfile.TemporaryFile() as f:
+            f.write(archive)
+            f.seek(0)
+            tarfile.open(fileobj=f).extractall(tmp)
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--root', tmp,
+             '--repeat', str(repeat), '--json'],
+            cwd=tmp, check=True, capture_output=True, text=True
+        ).stdout
+        return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=300)
+    parser.add_argument('--ref', help='git ref to compare against')
+    parser.add_argument('--root', default=ROOT, help=argparse.SUPPRESS)
+    parser.add_argument('--json', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.json:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            print(json.dumps(measure(args.root, args.repeat)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        current = measure(args.root, args.repeat)
+    before = measure_ref(args.ref, args.repeat) if args.ref else {}
+
+    columns = f"{'bytes':>8s} {'ms':>7s} {'wire':>7s} {'repeat':>7s}"
+    header = f"{'page':22s} {columns}"
+    if before:
+        header += f"   {columns}   ({args.ref})"
+    print(header)
+    for page in PAGES + ['static files']:
+        if page not in current and page not in before:
+            continue
+        line = f"{page:22s} " + row(current.get(page))
+        if before:
+            line += "   " + row(before.get(page))
+        print(line)
+    print("wire = compressed first visit, repeat = revalidated visit;")
+    print("static files are fetched once per browser and cached, not per page")
+
+
+def row(result):
+    size, ms, wire, repeat = result or (0, 0.0, 0, 0)
+    return f"{size:8d} {ms:7.3f} {wire:7d} {repeat:7d}"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark: re-scoring the whole assignments store.
+
+Seeds the store with submitted tests and compares the per-answer loop
+used by student_test with the batched rescore_assignments path, then
+rescores again with the score memo warm (as after a rescore that
+changed nothing, or a cohort of resubmitted answers).
+
+    python benchmarks/bench_rescore.py [--tests 600] [--words 150]
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+
+import app
+from bench_scoring import make_answers
+
+
+def seed_tests(count, words):
+    engineers = [f'eng{n:03d}' for n in range(1, 19)]
+    samples = make_answers(count * 18, words)
+    tests = []
+    for n in range(count):
+        topic = list(app.QUESTIONS)[n % len(app.QUESTIONS)]
+        test = app.create_test(engineers[n % len(engineers)], topic)
+        chunk = samples[n * 18:(n + 1) * 18]
+        test.answers = [answer for _, answer, _ in chunk]
+        test.status = 'submitted'
+        tests.append(test)
+    return tests
+
+
+def per_answer_loop(tests):
+    for test in tests:
+        test.auto_scores = [None] * len(test.answers)
+        test.reasoning = [None] * len(test.answers)
+        for i, answer in enumerate(test.answers):
+            test.auto_scores[i], test.reasoning[i] = app.analyze_answer_quality(
+                test.questions[i], answer, test.topic
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tests', type=int, default=600)
+    parser.add_argument('--words', type=int, default=150)
+    args = parser.parse_args()
+
+    tests = seed_tests(args.tests, args.words)
+    expected = copy.deepcopy(tests)
+
+    start = time.perf_counter()
+    per_answer_loop(expected)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    app.rescore_assignments(tests)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    app.rescore_assignments(tests)
+    warm_time = time.perf_counter() - start
+
+    if [(t.auto_scores, t.reasoning) for t in tests] != [(t.auto_scores, t.reasoning) for t in expected]:
+        print("❌ batch scores differ from analyze_answer_quality")
+        sys.exit(1)
+
+    answers = sum(t.answered for t in tests)
+    print(f"tests: {len(tests)}  answers: {answers} (identical scores)")
+    print(f"per-answer loop: {loop_time * 1000:8.1f} ms")
+    print(f"batch rescore:   {batch_time * 1000:8.1f} ms  ({batch_time / loop_time:.0%} of loop time)")
+    print(f"memoized rescore:{warm_time * 1000:8.1f} ms  ({warm_time / loop_time:.0%} of loop time)")
+    print(f"score memo: {app.score_memo.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark: review page latency with and without the fragment cache.
+
+Seeds submitted, auto-scored tests and has an admin tab between them at
+random, the way a reviewer works through the queue. Reports the mean
+latency of /admin/review/<id> and the fragment cache hit rate, first
+with the cache disabled and then with the default memory cap.
+
+    python benchmarks/bench_review_cache.py [--tests 200] [--views 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['STORAGE_BACKEND'] = 'memory'
+os.environ['SCORING_WORKERS'] = '0'
+
+import app
+from bench_scoring import make_answers
+from cache import LRUCache
+
+
+def seed(count):
+    app.init_data()
+    answers = make_answers(18, 60, seed=7)
+    test_ids = []
+    for n in range(count):
+        test = app.create_test(f'eng{n % 18 + 1:03d}', ('sta', 'cts', 'signoff')[n % 3])
+        test = app.storage.update_test(
+            test.id,
+            answers=[answer for _, answer, _ in answers],
+            status='submitted'
+        )
+        app.queue_scoring(test)
+        test_ids.append(test.id)
+    return test_ids
+
+
+def run(client, test_ids, views, cache_bytes):
+    app.review_fragments = LRUCache(cache_bytes)
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for _ in range(views):
+        client.get(f'/admin/review/{rng.choice(test_ids)}')
+    elapsed = time.perf_counter() - start
+    stats = app.review_fragments.stats()
+    lookups = stats['hits'] + stats['misses']
+    hit_rate = stats['hits'] / lookups if lookups else 0.0
+    print(f"{cache_bytes // 1024:>10} KB  {elapsed / views * 1000:8.3f} ms  "
+          f"{hit_rate:7.1%}  {stats['entries']:>7}  {stats['evictions']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tests', type=int, default=200)
+    parser.add_argument('--views', type=int, default=2000)
+    args = parser.parse_args()
+
+    test_ids = seed(args.tests)
+    client = app.app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'Vibhuaya@3006'})
+
+    print(f"{args.tests} submitted tests, {args.views} random review page views")
+    print(f"{'cache cap':>13}  {'latency':>11}  {'hits':>7}  {'entries':>7}  {'evictions':>9}")
+    run(client, test_ids, args.views, 0)
+    run(client, test_ids, args.views, app.REVIEW_CACHE_BYTES)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark: throughput of the registered scorers.
+
+Scores the same synthetic answers with every scorer in the registry,
+one call per answer (as a submission is scored) and as one batch per
+topic (as rescore_assignments does), bypassing the score memo.
+
+    python benchmarks/bench_scorers.py [--answers 5400] [--words 150]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+
+import app
+from scorers import SCORERS
+from bench_scoring import make_answers
+
+
+def per_answer(scorer, samples):
+    start = time.perf_counter()
+    for question, answer, topic in samples:
+        scorer.score(question, answer, topic)
+    return len(samples) / (time.perf_counter() - start)
+
+
+def batched(scorer, samples):
+    by_topic = {}
+    for question, answer, topic in samples:
+        by_topic.setdefault(topic, ([], []))
+        by_topic[topic][0].append(question)
+        by_topic[topic][1].append(answer)
+    start = time.perf_counter()
+    for topic, (questions, answers) in by_topic.items():
+        scorer.score_batch(topic, questions, answers)
+    return len(samples) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--answers', type=int, default=5400)
+    parser.add_argument('--words', type=int, default=150)
+    args = parser.parse_args()
+
+    samples = make_answers(args.answers, args.words)
+    print(f"answers: {args.answers} x ~{args.words} words")
+    print(f"{'scorer':>10}  {'per answer':>14}  {'batch':>14}")
+    for name, scorer in SCORERS.items():
+        print(f"{name:>10}  {per_answer(scorer, samples):>10.0f} /s  {batched(scorer, samples):>10.0f} /s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark: auto-scorer throughput on long answers.
+
+Compares the original per-call implementation of analyze_answer_quality
+(criteria dict rebuilt on every call, one substring scan per term per
+category) with the precompiled per-topic matcher in app.py.
+
+    python benchmarks/bench_scoring.py [--answers 2000] [--words 400]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+
+import app
+
+
+def legacy_analyze_answer_quality(question, answer, topic):
+    """Scorer as it was before the precompiled matcher (reference only)"""
+    if not answer or len(answer.strip()) < 20:
+        return 0, "Answer too short or empty"
+    answer_lower = answer.lower()
+    scoring_criteria = {
+        topic_name: {name: list(terms) for name, terms in criteria.items()}
+        for topic_name, criteria in app.SCORING_CRITERIA.items()
+    }
+    criteria = scoring_criteria.get(topic, scoring_criteria['sta'])
+    excellent_count = sum(1 for term in criteria['excellent_terms'] if term in answer_lower)
+    good_count = sum(1 for term in criteria['good_terms'] if term in answer_lower)
+    methodology_count = sum(1 for term in criteria['methodology_terms'] if term in answer_lower)
+    word_count = len(answer.split())
+    has_structure = any(marker in answer_lower for marker in ['1.', '2.', 'first', 'second', 'step'])
+    if excellent_count >= 3 and word_count >= 80:
+        base_score = 8
+        reasoning = f"Strong technical content ({excellent_count} advanced terms)"
+    elif excellent_count >= 2 and word_count >= 50:
+        base_score = 7
+        reasoning = f"Good technical knowledge ({excellent_count} advanced terms)"
+    elif excellent_count >= 1 or good_count >= 3:
+        base_score = 6
+        reasoning = f"Adequate technical understanding"
+    elif good_count >= 2 and word_count >= 30:
+        base_score = 5
+        reasoning = f"Basic technical knowledge"
+    else:
+        base_score = 4
+        reasoning = "Limited technical content"
+    if methodology_count >= 1:
+        base_score += 1
+        reasoning += " + methodology"
+    if has_structure:
+        base_score += 0.5
+        reasoning += " + structured"
+    final_score = min(10, round(base_score))
+    reasoning += f" ({word_count} words)"
+    return final_score, reasoning
+
+
+FILLER = ('the design flow uses buffers and we check routing placement congestion '
+          'power grid metal layers via cells library netlist floorplan macro we then '
+          'review the result with the team and iterate until closure is reached').split()
+
+
+def make_answers(count, words, seed=7):
+    """Long synthetic answers: mostly filler with a sprinkling of topic terms"""
+    rng = random.Random(seed)
+    topics = list(app.QUESTIONS)
+    samples = []
+    for n in range(count):
+        topic = topics[n % len(topics)]
+        criteria = app.SCORING_CRITERIA[topic]
+        vocab = [t for terms in criteria.values() for t in terms] + app.STRUCTURE_MARKERS
+        picks = rng.sample(vocab, rng.randint(0, 6))
+        body = [rng.choice(FILLER) for _ in range(words)]
+        for term in picks:
+            body.insert(rng.randrange(len(body)), term.upper() if rng.random() < 0.2 else term)
+        question = app.QUESTIONS[topic][n % len(app.QUESTIONS[topic])]
+        samples.append((question, ' '.join(body), topic))
+    return samples
+
+
+def throughput(scorer, samples, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for question, answer, topic in samples:
+            scorer(question, answer, topic)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(samples) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--answers', type=int, default=2000)
+    parser.add_argument('--words', type=int, default=400)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    samples = make_answers(args.answers, args.words)
+    mismatches = sum(
+        1 for s in samples
+        if legacy_analyze_answer_quality(*s) != app.analyze_answer_quality(*s)
+    )
+    if mismatches:
+        print(f"❌ {mismatches} answers scored differently from the legacy scorer")
+        sys.exit(1)
+
+    before = throughput(legacy_analyze_answer_quality, samples, args.repeat)
+    after = throughput(app.analyze_answer_quality, samples, args.repeat)
+    print(f"answers: {args.answers} x ~{args.words} words (identical scores)")
+    print(f"before: {before:10.0f} answers/s")
+    print(f"after:  {after:10.0f} answers/s  ({after / before:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark: cost of finding out who is logged in, per request.
+
+Compares, on a fresh SQLite database with --users users:
+
+  cookie   what each route used to do: check and decode Flask's signed
+           session cookie, then load the user from storage
+  miss     SessionStore.resolve with nothing cached: the session and
+           user rows are read from SQLite
+  hit      SessionStore.resolve answered from the per-worker cache
+
+    python benchmarks/bench_sessions.py [--users 1000] [--repeat 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['STORAGE_BACKEND'] = 'sqlite'
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='pd-sessions-'), 'sessions.db')
+
+import app
+
+
+def per_call_us(func, ids, repeat):
+    start = time.perf_counter()
+    for n in range(repeat):
+        func(ids[n % len(ids)])
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20000)
+    args = parser.parse_args()
+
+    password = app.hash_pass('password123')
+    users = []
+    for n in range(args.users):
+        user = {'id': f'user{n:04d}', 'username': f'user{n:04d}', 'display_name': f'User {n}',
+                'password': password, 'is_admin': False, 'exp': 3}
+        app.storage.save_user(user)
+        users.append(user)
+    random.Random(1).shuffle(users)
+
+    serializer = app.app.session_interface.get_signing_serializer(app.app)
+    max_age = int(app.app.permanent_session_lifetime.total_seconds())
+    cookies = [serializer.dumps({'user_id': u['id'], 'username': u['username'], 'is_admin': False}) for u in users]
+    session_ids = [app.session_store.create(u) for u in users]
+
+    def from_cookie(cookie):
+        return app.storage.get_user(serializer.loads(cookie, max_age=max_age)['user_id'])
+
+    def uncached(session_id):
+        app.session_store.users.discard(session_id)
+        return app.session_store.resolve(session_id)
+
+    results = {
+        'cookie': per_call_us(from_cookie, cookies, args.repeat),
+        'miss': per_call_us(uncached, session_ids, args.repeat),
+        'hit': per_call_us(app.session_store.resolve, session_ids, args.repeat)
+    }
+    print(f"{args.users} users, {args.repeat} lookups each")
+    for name, us in results.items():
+        print(f"{name:8s} {us:8.1f} us per request")
+
+
+if __name__ == '__main__':
+    main()
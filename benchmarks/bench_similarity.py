@@ -0,0 +1,81 @@
+"""Benchmark: near-duplicate detection cost as the answer archive grows.
+
+Adds synthetic 18-answer tests to an AnswerIndex one submission at a
+time. A share of them copy another engineer's answers with a few
+words changed. Reports the time per submission and the candidates
+compared at each archive size, against comparing with every stored
+answer of the same question, and how many planted copies were flagged.
+Indexing runs in the background after a submit; the review list only
+reads the pairs found, timed last from a fresh index as a newly
+started worker would.
+
+    python benchmarks/bench_similarity.py [--tests 5000] [--copies 0.02] [--words 120] [--backend sqlite]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+
+import app
+from models import Assignment
+from similarity import AnswerIndex
+from storage import open_storage
+from bench_scoring import make_answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tests', type=int, default=5000)
+    parser.add_argument('--copies', type=float, default=0.02, help='share of tests that copy another')
+    parser.add_argument('--words', type=int, default=120)
+    parser.add_argument('--backend', choices=['memory', 'sqlite'], default='memory')
+    args = parser.parse_args()
+
+    storage = open_storage(args.backend, os.path.join(tempfile.mkdtemp(prefix='pd-similarity-'), 'similarity.db'))
+
+    rng = random.Random(5)
+    pool = [answer for _, answer, _ in make_answers(2000, args.words, seed=11)]
+    index = AnswerIndex(storage)
+    tests, planted = [], set()
+    checkpoints = {args.tests // 10, args.tests // 2, args.tests}
+    elapsed = 0
+    print(f"{'archive':>8}  {'per submit':>11}  {'compared':>9}  {'brute force':>11}")
+    for n in range(args.tests):
+        if tests and rng.random() < args.copies:
+            source = rng.choice(tests)
+            answers = []
+            for answer in source.answers:
+                words = answer.split()
+                for _ in range(3):
+                    words[rng.randrange(len(words))] = 'edited'
+                answers.append(' '.join(words))
+            planted.add(n)
+        else:
+            answers = [' '.join(rng.sample(rng.choice(pool).split(), args.words // 2)) for _ in range(18)]
+        test = Assignment(
+            id=f'T{n}', engineer_id=f'eng{n}', topic='sta', question_version=app.QUESTION_VERSION,
+            created=0, due=0, status='submitted', answers=answers
+        )
+        start = time.perf_counter()
+        index.add([test])
+        elapsed += time.perf_counter() - start
+        tests.append(test)
+        if n + 1 in checkpoints:
+            print(f"{n + 1:>8}  {elapsed / (n + 1) * 1000:>9.2f}ms  {index.comparisons / (n + 1):>9.1f}"
+                  f"  {18 * n / 2:>11.0f}")
+    start = time.perf_counter()
+    similar = AnswerIndex(storage).similar([test.id for test in tests])
+    lookup = time.perf_counter() - start
+    flagged = sum(1 for n in planted if similar[f'T{n}'])
+    print(f"planted copies flagged: {flagged}/{len(planted)}  "
+          f"flagged tests: {sum(1 for pairs in similar.values() if pairs)}")
+    print(f"pairs for all {len(tests)} tests from a fresh index: {lookup * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
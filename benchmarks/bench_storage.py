@@ -0,0 +1,96 @@
+"""Benchmark: storage reads and writes per second under concurrent requests.
+
+Each thread plays a request handler: mostly page reads (one test, an
+engineer's dashboard list, the submitted queue) with a share of writes
+(create a test, submit/grade via update_test).
+
+    python benchmarks/bench_storage.py [--threads 8] [--seconds 3] [--tests 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Assignment, QUESTION_BANK
+from storage import open_storage
+
+ENGINEERS = [f'eng{n:03d}' for n in range(1, 19)]
+TOPICS = ['sta', 'cts', 'signoff']
+for topic in TOPICS:
+    QUESTION_BANK[(topic, 1)] = tuple(f'Question {i}' for i in range(18))
+
+
+def make_test(storage, eng_id, topic):
+    test_id = f"PD_{topic}_{eng_id}_{storage.next_test_number()}"
+    now = time.time()
+    test = Assignment(id=test_id, engineer_id=eng_id, topic=topic, question_version=1,
+                      created=now, due=now + 2 * 24 * 3600)
+    storage.save_test(test)
+    return test_id
+
+
+def worker(storage, test_ids, seconds, write_share, counts, seed):
+    rng = random.Random(seed)
+    reads = writes = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        if rng.random() < write_share:
+            if rng.random() < 0.3:
+                test_ids.append(make_test(storage, rng.choice(ENGINEERS), rng.choice(TOPICS)))
+            else:
+                storage.update_test(
+                    rng.choice(test_ids),
+                    status=rng.choice(['submitted', 'completed']),
+                    answers=['answer text ' * 20] * 18
+                )
+            writes += 1
+        else:
+            op = rng.random()
+            if op < 0.5:
+                storage.get_test(rng.choice(test_ids))
+            elif op < 0.9:
+                storage.list_tests(engineer_id=rng.choice(ENGINEERS))
+            else:
+                storage.count_tests('submitted')
+            reads += 1
+    counts.append((reads, writes))
+
+
+def run(backend, path, threads, seconds, tests, write_share):
+    storage = open_storage(backend, path)
+    test_ids = [make_test(storage, ENGINEERS[n % 18], TOPICS[n % 3]) for n in range(tests)]
+    counts = []
+    pool = [
+        threading.Thread(target=worker, args=(storage, test_ids, seconds, write_share, counts, n))
+        for n in range(threads)
+    ]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    reads = sum(r for r, _ in counts)
+    writes = sum(w for _, w in counts)
+    print(f"{backend:7s} reads: {reads / seconds:9.0f}/s   writes: {writes / seconds:8.0f}/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--tests', type=int, default=2000)
+    parser.add_argument('--write-share', type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads, {args.tests} seeded tests, {args.write_share:.0%} writes")
+    run('memory', None, args.threads, args.seconds, args.tests, args.write_share)
+    with tempfile.TemporaryDirectory() as tmp:
+        run('sqlite', os.path.join(tmp, 'bench.db'), args.threads, args.seconds, args.tests, args.write_share)
+
+
+if __name__ == '__main__':
+    main()
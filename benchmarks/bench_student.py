@@ -0,0 +1,115 @@
+"""Benchmark: the /student dashboard for an engineer with hundreds of tests.
+
+Seeds one engineer's history through the app's own routes (assign,
+submit, grade), so it works whatever format the tree stores dates in:
+a third of the tests are left pending, a third submitted and a third
+graded. Then times GET /student, which formats a deadline, a
+time-remaining string and a submitted date for every card.
+
+Pass --ref to run the same measurement against an older commit and
+print both side by side:
+
+    python benchmarks/bench_student.py [--tests 100 300 1000] [--ref HEAD~1]
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ANSWERS = {f'answer_{i}': 'Setup and hold slack with clock skew and OCV derates. ' * 2 for i in range(18)}
+
+
+def measure(root, sizes, repeat):
+    """Returns {tests: ms per /student} for the app at root"""
+    sys.path.insert(0, root)
+    os.environ['STORAGE_BACKEND'] = 'memory'
+    os.environ['SCORING_WORKERS'] = '0'
+    import app
+    from storage import MemoryStorage
+
+    results = {}
+    for size in sizes:
+        if hasattr(app, 'set_storage'):
+            app.set_storage(MemoryStorage())
+        else:
+            # Older trees: rebind what they have by hand
+            app.storage = MemoryStorage()
+            if hasattr(app, 'deadlines'):
+                app.deadlines.storage = app.storage
+        app.init_data()
+        admin = app.app.test_client()
+        admin.post('/login', data={'username': 'admin', 'password': 'Vibhuaya@3006'})
+        engineer = app.app.test_client()
+        engineer.post('/login', data={'username': 'eng001', 'password': 'password123'})
+
+        for n in range(size):
+            admin.post('/admin/create', data={'engineer_id': 'eng001', 'topic': ('sta', 'cts', 'signoff')[n % 3]})
+        test_ids = re.findall(r'/student/test/([^"]+)"', engineer.get('/student').get_data(as_text=True))
+        for n, test_id in enumerate(test_ids):
+            if n % 3:
+                engineer.post(f'/student/test/{test_id}', data=ANSWERS)
+            if n % 3 == 2:
+                admin.post(f'/admin/review/{test_id}', data={f'score_{i}': '7' for i in range(18)})
+
+        engineer.get('/student')
+        start = time.perf_counter()
+        for _ in range(repeat):
+            response = engineer.get('/student')
+            assert response.status_code == 200, f"/student: {response.status}"
+        results[size] = (time.perf_counter() - start) / repeat * 1000
+    return results
+
+
+def measure_ref(ref, sizes, repeat):
+    """Exports ref into a temp dir and measures it in a fresh interpreter"""
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = subprocess.run(['git', 'archive', ref], cwd=ROOT, check=True,
+                                 capture_output=True).stdout
+        with tempfile.TemporaryFile() as f:
+            f.write(archive)
+            f.seek(0)
+            tarfile.open(fileobj=f).extractall(tmp)
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--root', tmp, '--json',
+             '--repeat', str(repeat), '--tests', *map(str, sizes)],
+            cwd=tmp, check=True, capture_output=True, text=True
+        ).stdout
+        return {int(size): ms for size, ms in json.loads(output.splitlines()[-1]).items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tests', type=int, nargs='+', default=[100, 300, 1000])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--ref', help='git ref to compare against')
+    parser.add_argument('--root', default=ROOT, help=argparse.SUPPRESS)
+    parser.add_argument('--json', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        current = measure(args.root, args.tests, args.repeat)
+    if args.json:
+        print(json.dumps(current))
+        return
+    before = measure_ref(args.ref, args.tests, args.repeat) if args.ref else {}
+
+    header = f"{'tests':>7}  {'/student':>10}"
+    if before:
+        header += f"  {args.ref:>10}"
+    print(header)
+    for size in args.tests:
+        line = f"{size:>7}  {current[size]:>8.2f}ms"
+        if before:
+            line += f"  {before[size]:>8.2f}ms"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
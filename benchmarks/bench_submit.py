@@ -0,0 +1,61 @@
+"""Benchmark: submit latency against answer length.
+
+For each answer length, one engineer fills in all 18 questions. With
+--drafts (the default) the answers arrive as autosaves and are scored
+when the draft buffer flushes, so the submit itself only compares
+hashes; without it the whole form is posted at submit time, as a
+browser without JavaScript would. Scoring runs inline
+(SCORING_WORKERS=0), so the submit timing includes any scoring left.
+
+    python benchmarks/bench_submit.py [--words 50 200 800] [--tests 30] [--no-drafts]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['STORAGE_BACKEND'] = 'memory'
+os.environ['SCORING_WORKERS'] = '0'
+
+import app
+from bench_scoring import make_answers
+
+
+def measure(words, count, use_drafts):
+    """Returns ms per submit for count tests with answers of about words words"""
+    client = app.app.test_client()
+    client.post('/login', data={'username': 'eng001', 'password': 'password123'})
+    elapsed = 0
+    for n in range(count):
+        test = app.create_test('eng001', 'sta')
+        answers = [f'{answer} {n}' for _, answer, _ in make_answers(18, words, seed=n)]
+        form = {}
+        if use_drafts:
+            client.post(f'/student/test/{test.id}/draft', json={'answers': list(enumerate(answers))})
+            app.drafts.flush()
+        else:
+            form = {f'answer_{i}': answer for i, answer in enumerate(answers)}
+        start = time.perf_counter()
+        client.post(f'/student/test/{test.id}', data=form)
+        elapsed += time.perf_counter() - start
+        assert app.storage.get_test(test.id).auto_scores[0] is not None
+    return elapsed / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--words', type=int, nargs='+', default=[50, 200, 800])
+    parser.add_argument('--tests', type=int, default=30)
+    parser.add_argument('--no-drafts', action='store_true', help='post every answer at submit')
+    args = parser.parse_args()
+
+    app.init_data()
+    print(f"{'words':>7}  {'submit':>10}  ({'full form' if args.no_drafts else 'after autosave'})")
+    for words in args.words:
+        print(f"{words:>7}  {measure(words, args.tests, not args.no_drafts):>8.2f}ms")
+    print(f"score memo: {app.score_memo.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""Load test against a locally served instance.
+
+Start the server first, for example:
+
+    STORAGE_BACKEND=sqlite DATABASE_PATH=/tmp/load.db PORT=8000 \\
+        gunicorn -c gunicorn.conf.py wsgi:app
+
+then run:
+
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --clients 16 --seconds 10
+
+Each client keeps one keep-alive connection and its own session cookie.
+The script reports requests/s and p50/p99 latency for POST /login,
+GET /student and GET /admin.
+"""
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENGINEER = ('eng001', 'password123')
+ADMIN = ('admin', 'Vibhuaya@3006')
+
+
+class Client:
+    """One browser: a persistent connection plus the session cookie"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.conn = http.client.HTTPConnection(host, port, timeout=30)
+        self.cookie = None
+        self.retry_after = None
+
+    def request(self, method, path, form=None):
+        headers = {}
+        body = None
+        if form is not None:
+            body = urlencode(form)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        if self.cookie:
+            headers['Cookie'] = self.cookie
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            # Server closed the keep-alive connection (e.g. worker recycled)
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+        response.read()
+        self.retry_after = response.getheader('Retry-After')
+        cookie = response.getheader('Set-Cookie')
+        if cookie:
+            self.cookie = cookie.split(';', 1)[0]
+        return response.status
+
+    def login(self, credentials):
+        username, password = credentials
+        return self.request('POST', '/login', {'username': username, 'password': password})
+
+
+class TestClient(Client):
+    """Client in-process: the Flask test client keeps the cookie"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+        self.retry_after = None
+
+    def request(self, method, path, form=None):
+        response = self.client.open(path, method=method, data=form)
+        self.retry_after = response.headers.get('Retry-After')
+        return response.status_code
+
+
+def start_server(target='wsgi:app', **env):
+    """gunicorn (gunicorn.conf.py) serving target on a free port, with
+    env added to this process's environment; returns (process, port)"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    env = dict(os.environ, PORT=str(port), WEB_ACCESS_LOG='/dev/null', **env)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', target],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if Client('127.0.0.1', port).request('GET', '/health') == 200:
+                return server, port
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    sys.exit("❌ gunicorn did not start")
+
+
+def run_route(host, port, route, clients, seconds):
+    """Hammers one route from several clients; returns the latency list"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def client_loop():
+        client = Client(host, port)
+        if route == '/student':
+            client.login(ENGINEER)
+        elif route == '/admin':
+            client.login(ADMIN)
+        local = []
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            if route == '/login':
+                status = client.login(ENGINEER)
+            else:
+                status = client.request('GET', route)
+            local.append(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(status)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client_loop) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--routes', nargs='+', default=['/login', '/student', '/admin'])
+    args = parser.parse_args()
+
+    target = urlsplit(args.url)
+    print(f"{args.url}  {args.clients} clients x {args.seconds:g}s per route")
+    print(f"{'route':10s} {'req/s':>10s} {'p50 ms':>9s} {'p99 ms':>9s} {'errors':>7s}")
+    for route in args.routes:
+        latencies, errors = run_route(target.hostname, target.port or 80, route,
+                                      args.clients, args.seconds)
+        latencies.sort()
+        print(f"{route:10s} {len(latencies) / args.seconds:10.0f} "
+              f"{percentile(latencies, 50) * 1000:9.2f} {percentile(latencies, 99) * 1000:9.2f} "
+              f"{len(errors):7d}")
+
+
+if __name__ == '__main__':
+    main()
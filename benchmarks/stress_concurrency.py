@@ -0,0 +1,251 @@
+"""Stress test: concurrent submits and grades must never lose an update.
+
+Assigns --tests tests from several threads at once, then runs two
+phases of concurrent requests through the Flask test client:
+
+  submit  --submitters sessions per test each submit a full, distinct
+          set of answers while autosaves for the same test arrive
+  grade   --graders admin sessions per test each grade it with
+          distinct scores while rescores bump revisions underneath
+          (a grader told of a conflict reloads and tries again, unless
+          the test has been graded)
+
+A checker thread keeps reading random tests during both phases. At the
+end every test must hold exactly one submitter's answers and exactly
+one grader's scores, each test must have been submitted and graded
+exactly once, no test ID may repeat, and no read may have seen a
+half-applied update. Exits with status 1 on any violation.
+
+With --processes the requests are split over that many forked
+processes sharing one SQLite database, as gunicorn workers would.
+
+    python benchmarks/stress_concurrency.py [--tests 300] [--threads 16] [--backend memory|sqlite]
+                                            [--processes 1] [--submitters 2] [--graders 2]
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ADMIN = ('admin', 'Vibhuaya@3006')
+REVISION = re.compile(rb'name="revision" value="(\d+)"')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tests', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=16, help='per process')
+    parser.add_argument('--backend', choices=('memory', 'sqlite'), default='memory')
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--submitters', type=int, default=2)
+    parser.add_argument('--graders', type=int, default=2)
+    parser.add_argument('--rescores', type=int, default=5, help='concurrent rescores while grading')
+    return parser.parse_args()
+
+
+args = parse_args() if __name__ == '__main__' else None
+if args and (args.backend == 'sqlite' or args.processes > 1):
+    os.environ['STORAGE_BACKEND'] = 'sqlite'
+    os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='pd-stress-'), 'stress.db')
+else:
+    os.environ['STORAGE_BACKEND'] = 'memory'
+os.environ['SCORING_WORKERS'] = '0'
+
+import app
+
+
+def answer_set(test_id, k):
+    return [f'submitter {k} answer to question {i} of {test_id}: setup and hold slack' for i in range(18)]
+
+
+def score_set(n, k):
+    return [(k * 3 + i + n) % 11 for i in range(18)]
+
+
+class Sessions(threading.local):
+    """One logged-in test client per user per thread"""
+
+    def client(self, username, password):
+        clients = self.__dict__.setdefault('clients', {})
+        if username not in clients:
+            clients[username] = app.app.test_client()
+            # A burst of first logins is partly refused as busy (503)
+            while clients[username].post('/login', data={'username': username, 'password': password}).status_code == 503:
+                time.sleep(0.1)
+        return clients[username]
+
+
+def run_job(sessions, job, outcome):
+    kind = job[0]
+    if kind == 'submit':
+        _, test_id, eng_id, k = job
+        client = sessions.client(eng_id, 'password123')
+        form = {f'answer_{i}': text for i, text in enumerate(answer_set(test_id, k))}
+        client.post(f'/student/test/{test_id}', data=form)
+    elif kind == 'draft':
+        _, test_id, eng_id = job
+        client = sessions.client(eng_id, 'password123')
+        client.post(f'/student/test/{test_id}/draft', json={'answers': [[i, f'draft {i}'] for i in range(0, 18, 3)]})
+    elif kind == 'grade':
+        _, test_id, n, k = job
+        client = sessions.client(*ADMIN)
+        form = {f'score_{i}': str(score) for i, score in enumerate(score_set(n, k))}
+        while True:
+            page = client.get(f'/admin/review/{test_id}').data
+            form['revision'] = REVISION.search(page).group(1).decode()
+            response = client.post(f'/admin/review/{test_id}', data=form)
+            if 'conflict' not in response.location:
+                outcome['grades'].append((test_id, k))
+                return
+            outcome['conflicts'] += 1
+            if app.storage.get_test(test_id).status == 'completed':
+                return
+    elif kind == 'rescore':
+        sessions.client(*ADMIN).post('/admin/rescore')
+
+
+def check_consistency(test_ids, stop, outcome):
+    """Reads random tests until stop is set, counting impossible states"""
+    rng = random.Random(5)
+    while not stop.is_set():
+        test = app.storage.get_test(rng.choice(test_ids))
+        if test.status != 'pending' and (test.submitted_date is None or test.answered < 15):
+            outcome['torn'] += 1
+        if test.status == 'completed' and (
+                test.final_scores is None or test.score != sum(s for s in test.final_scores if s is not None)):
+            outcome['torn'] += 1
+        outcome['reads'] += 1
+
+
+def run_jobs(jobs, test_ids, threads):
+    """Runs jobs on threads in this process; returns what happened"""
+    outcome = {'grades': [], 'conflicts': 0, 'torn': 0, 'reads': 0, 'submits': 0}
+    before = app.metrics.snapshot()[0] if app.metrics.pid == os.getpid() else {}
+    pending = queue.Queue()
+    for job in jobs:
+        pending.put(job)
+    sessions = Sessions()
+    lock = threading.Lock()
+
+    def worker():
+        local = {'grades': [], 'conflicts': 0}
+        while True:
+            try:
+                job = pending.get_nowait()
+            except queue.Empty:
+                break
+            run_job(sessions, job, local)
+        with lock:
+            outcome['grades'] += local['grades']
+            outcome['conflicts'] += local['conflicts']
+
+    stop = threading.Event()
+    checker = threading.Thread(target=check_consistency, args=(test_ids, stop, outcome))
+    checker.start()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    stop.set()
+    checker.join()
+    after = app.metrics.snapshot()[0]
+    outcome['submits'] = sum(value - before.get(key, 0) for key, value in after.items()
+                             if key[0] == 'pd_submissions_total')
+    return outcome
+
+
+def run_share(share):
+    jobs, test_ids, threads = share
+    return run_jobs(jobs, test_ids, threads)
+
+
+def run_phase(jobs, test_ids, threads, processes):
+    """Shuffles jobs over processes x threads; returns the summed outcome"""
+    random.Random(len(jobs)).shuffle(jobs)
+    if processes == 1:
+        return run_jobs(jobs, test_ids, threads)
+    shares = [(jobs[p::processes], test_ids, threads) for p in range(processes)]
+    with multiprocessing.get_context('fork').Pool(processes) as pool:
+        results = pool.map(run_share, shares)
+    total = {'grades': [], 'conflicts': 0, 'torn': 0, 'reads': 0, 'submits': 0}
+    for result in results:
+        for key, value in result.items():
+            total[key] += value
+    return total
+
+
+def main():
+    app.init_data()
+    engineers = [f'eng{n:03d}' for n in range(1, 19)]
+    topics = list(app.QUESTIONS)
+    failures = []
+
+    # Assign from several threads at once; every ID must be distinct
+    pairs = [(engineers[n % 18], topics[n % 3]) for n in range(args.tests)]
+    chunks = [pairs[k::8] for k in range(8)]
+    created = []
+    threads = [threading.Thread(target=lambda c=c: created.extend(app.create_tests(c))) for c in chunks]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    tests = {test.id: test for test in created}
+    if len(tests) != args.tests or app.storage.count_tests() != args.tests:
+        failures.append(f'{args.tests} assigned but {len(tests)} distinct IDs, {app.storage.count_tests()} stored')
+    test_ids = sorted(tests)
+
+    start = time.perf_counter()
+    jobs = [('submit', t.id, t.engineer_id, k) for t in tests.values() for k in range(args.submitters)]
+    jobs += [('draft', t.id, t.engineer_id) for t in tests.values()]
+    submitted = run_phase(jobs, test_ids, args.threads, args.processes)
+    submit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    jobs = [('grade', test_id, n, k) for n, test_id in enumerate(test_ids) for k in range(args.graders)]
+    jobs += [('rescore',)] * args.rescores
+    graded = run_phase(jobs, test_ids, args.threads, args.processes)
+    grade_time = time.perf_counter() - start
+
+    wins = {}
+    for test_id, k in graded['grades']:
+        wins.setdefault(test_id, []).append(k)
+    for n, test_id in enumerate(test_ids):
+        test = app.storage.get_test(test_id)
+        if not any(test.answers == answer_set(test_id, k) for k in range(args.submitters)):
+            failures.append(f'{test_id}: answers are not one submitter\'s set')
+        if len(wins.get(test_id, ())) != 1:
+            failures.append(f'{test_id}: graded {len(wins.get(test_id, ()))} times')
+        elif test.final_scores != score_set(n, wins[test_id][0]) or test.status != 'completed':
+            failures.append(f'{test_id}: final scores are not the winning grader\'s')
+    if submitted['submits'] != args.tests:
+        failures.append(f"{submitted['submits']} submissions accepted for {args.tests} tests")
+    torn = submitted['torn'] + graded['torn']
+    if torn:
+        failures.append(f'{torn} reads saw a half-applied update')
+
+    mode = f"{os.environ['STORAGE_BACKEND']}, {args.processes} process(es) x {args.threads} threads"
+    print(f"{mode}: {args.tests} tests")
+    print(f"submit: {args.submitters * args.tests} submits + {args.tests} autosaves in {submit_time:.2f}s, "
+          f"{submitted['submits']} accepted")
+    print(f"grade:  {args.graders * args.tests} grades + {args.rescores} rescores in {grade_time:.2f}s, "
+          f"{len(graded['grades'])} accepted, {graded['conflicts']} conflicts retried or refused")
+    print(f"checker: {submitted['reads'] + graded['reads']} reads, {torn} inconsistent")
+    for failure in failures[:20]:
+        print(f"❌ {failure}")
+    if failures:
+        print(f"❌ {len(failures)} violations")
+        sys.exit(1)
+    print("✅ No lost updates")
+
+
+if __name__ == '__main__':
+    main()
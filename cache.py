@@ -0,0 +1,91 @@
+# cache.py - bounded in-process caches
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Least-recently-used cache capped by the total size of its values.
+
+    Sizes are whatever the caller passes to put() (sys.getsizeof of the
+    value by default). Counts hits, misses and evictions so callers can
+    report how well the cache is doing. Each process has its own copy;
+    entries must be keyed so that a stale one can never be returned
+    (e.g. by including a revision number).
+
+    With ttl (seconds) set, an entry older than that is dropped when it
+    is next looked up, and the lookup counts as a miss.
+    """
+
+    def __init__(self, max_bytes, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            return self._get(key, default)
+
+    def get_many(self, keys, default=None):
+        """get() for each key, taking the lock once"""
+        with self.lock:
+            return [self._get(key, default) for key in keys]
+
+    def _get(self, key, default):
+        entry = self.entries.get(key)
+        if entry is not None and self.ttl is not None and time.monotonic() > entry[2]:
+            del self.entries[key]
+            self.bytes -= entry[1]
+            self.expired += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, size=None):
+        self.put_many([(key, value, size)])
+
+    def put_many(self, items):
+        """put() for each (key, value, size) in items, taking the lock once"""
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.lock:
+            for key, value, size in items:
+                if size is None:
+                    size = sys.getsizeof(value)
+                if size > self.max_bytes:
+                    continue
+                old = self.entries.pop(key, None)
+                if old is not None:
+                    self.bytes -= old[1]
+                self.entries[key] = (value, size, expires)
+                self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def discard(self, key):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expired': self.expired
+        }
@@ -0,0 +1,91 @@
+# deadlines.py - background expiry of pending tests
+import heapq
+import threading
+import time
+
+from background import Background
+
+
+class DeadlineScheduler(Background):
+    """Flips pending tests to overdue at their due time.
+
+    Deadlines sit in a min-heap of (due, test_id), due being the epoch
+    seconds stored on the test. One daemon thread sleeps until the
+    earliest and expires it with a pending -> overdue transition, so a
+    test that was submitted in time is left alone and a deadline
+    scheduled twice only expires once.
+
+    Each worker process runs its own thread (started on the first
+    request after a fork) and reloads the pending deadlines from storage
+    at start and every resync_seconds, which picks up tests created by
+    other workers.
+
+    on_expire, if given, is called with each test this worker expired.
+    """
+
+    def __init__(self, storage, resync_seconds=30, on_expire=None):
+        self.storage = storage
+        self.resync_seconds = resync_seconds
+        self.on_expire = on_expire
+        self.heap = []
+        # Reentrant, as load() takes it again under ensure_running()
+        self.lock = threading.RLock()
+        self.cond = threading.Condition(self.lock)
+        self.expired = 0
+
+    def schedule(self, test_id, due):
+        self.schedule_many([(test_id, due)])
+
+    def schedule_many(self, deadlines):
+        """Schedules (test_id, due) pairs under one lock acquisition"""
+        with self.cond:
+            for test_id, due in deadlines:
+                heapq.heappush(self.heap, (due, test_id))
+            self.cond.notify()
+
+    def start_in_process(self):
+        self.heap = []
+        self.load()
+        threading.Thread(target=self.run, name='deadline-scheduler', daemon=True).start()
+
+    def load(self):
+        """Merges every pending deadline in storage into the heap"""
+        loaded = {
+            (due, test_id) for test_id, due in self.storage.list_deadlines('pending')
+            if due is not None
+        }
+        with self.cond:
+            self.heap = list(loaded.union(self.heap))
+            heapq.heapify(self.heap)
+            self.cond.notify()
+
+    def run(self):
+        next_resync = time.time() + self.resync_seconds
+        while True:
+            with self.cond:
+                now = time.time()
+                due = []
+                while self.heap and self.heap[0][0] <= now:
+                    due.append(heapq.heappop(self.heap)[1])
+                if not due and now < next_resync:
+                    wake = min(self.heap[0][0], next_resync) if self.heap else next_resync
+                    self.cond.wait(wake - now)
+                    continue
+            for test_id in due:
+                self.expire(test_id)
+            if time.time() >= next_resync:
+                self.load()
+                next_resync = time.time() + self.resync_seconds
+
+    def expire(self, test_id):
+        try:
+            test = self.storage.transition_test(test_id, 'pending', status='overdue')
+            if test:
+                self.expired += 1
+                if self.on_expire is not None:
+                    self.on_expire(test)
+        except Exception as e:
+            print(f"⚠️ Could not expire {test_id}: {e}")
+
+    def stats(self):
+        return {'scheduled': len(self.heap), 'expired': self.expired}
@@ -0,0 +1,100 @@
+# drafts.py - write-coalescing buffer for answer autosave
+import atexit
+import threading
+import time
+
+from background import Background
+from models import is_older
+
+
+class DraftBuffer(Background):
+    """Collects per-question answer edits and writes them in batches.
+
+    Autosave requests only touch this buffer; a background thread
+    flushes it every flush_seconds with one merge_answers call per test,
+    however many edits arrived for it in between. Later edits to the
+    same question replace earlier ones before they ever reach storage.
+
+    If a scorer is given, the flush also scores each edited answer with
+    scorer(topic, question version, index, text) -> (score, reasoning,
+    answer hash) and saves the result with it, so the scores are ready
+    at submission. An answer the scorer fails on is saved unscored.
+
+    Edits carry the time the engineer made them (client clock,
+    milliseconds; None for "unknown, always apply"). Each worker process
+    has its own buffer and thread (started on the first request after a
+    fork), so edits to one test can reach storage from several workers
+    in any order: an edit older than the one already buffered or saved
+    for its question is dropped. What is left is flushed at exit.
+    """
+
+    def __init__(self, storage, flush_seconds=2, scorer=None):
+        self.storage = storage
+        self.flush_seconds = flush_seconds
+        self.scorer = scorer
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.edits = 0
+        self.writes = 0
+
+    def add(self, test_id, topic, question_version, edits):
+        """Buffers {question index: (text or None, edited at)} for one test"""
+        with self.lock:
+            buffered = self.pending.setdefault(test_id, ((topic, question_version), {}))[1]
+            for index, edit in edits.items():
+                if not is_older(edit[1], buffered.get(index, (None, None))[1]):
+                    buffered[index] = edit
+            self.edits += len(edits)
+
+    def peek(self, test_id):
+        """{question index: text} for one test's edits not written yet"""
+        with self.lock:
+            return {index: text for index, (text, _) in self.pending.get(test_id, (None, {}))[1].items()}
+
+    def flush(self, test_id=None, score=True):
+        """Writes the buffered edits for one test, or for all of them.
+        With score=False they are saved unscored (submission scores
+        whatever has no draft score on the scoring workers)."""
+        with self.lock:
+            if test_id is None:
+                batch, self.pending = self.pending, {}
+            elif test_id in self.pending:
+                batch = {test_id: self.pending.pop(test_id)}
+            else:
+                batch = {}
+        for tid, (questions, edits) in batch.items():
+            scores = None
+            if score and self.scorer is not None:
+                scores = self.score(tid, questions, edits)
+            try:
+                # None once the test is no longer pending: the edit is moot
+                self.storage.merge_answers(tid, edits, scores)
+                self.writes += 1
+            except Exception as e:
+                print(f"⚠️ Could not save draft for {tid}: {e}")
+
+    def score(self, test_id, questions, edits):
+        """Draft scores for one test's edits, leaving out any that fail"""
+        topic, question_version = questions
+        scores = {}
+        for i, (text, _) in edits.items():
+            if not text:
+                continue
+            try:
+                scores[i] = self.scorer(topic, question_version, i, text)
+            except Exception as e:
+                print(f"⚠️ Could not score draft answer {i} for {test_id}: {e}")
+        return scores
+
+    def start_in_process(self):
+        self.pending = {}
+        threading.Thread(target=self.run, name='draft-flusher', daemon=True).start()
+        atexit.register(self.flush)
+
+    def run(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+    def stats(self):
+        return {'buffered_tests': len(self.pending), 'edits': self.edits, 'writes': self.writes}
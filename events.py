@@ -0,0 +1,236 @@
+# events.py - per-user event streams (Server-Sent Events) for the async serving mode
+import asyncio
+import json
+import time
+
+
+class Stream:
+    """One open event stream: its audience, queue and pending timers.
+
+    While held is a list, events pushed to the stream wait there instead
+    of in the queue (see EventHub.release).
+    """
+
+    def __init__(self, audience, queue_size, hold=False):
+        self.audience = audience
+        self.queue = asyncio.Queue(queue_size)
+        self.timers = []
+        self.last_id = 0
+        self.closed = False
+        self.held = [] if hold else None
+
+
+class EventHub:
+    """Hands published events to this worker's open event streams.
+
+    Events are published to storage (storage.publish_events) by
+    whichever worker or thread caused them. One task per worker polls
+    storage every poll_seconds and passes each new event to the streams
+    of its audience: a user id, or 'admins' for every admin. An idle
+    stream is an asyncio task waiting on its queue, with no thread of
+    its own, so thousands of open streams cost little more than their
+    sockets.
+
+    Deadline warnings are timers on the stream itself, set for
+    warn_before seconds ahead of each pending test's due time (and for
+    tests assigned while the stream is open).
+    """
+
+    def __init__(self, storage, poll_seconds=0.5, warn_before=2 * 3600, queue_size=100):
+        self.storage = storage
+        self.poll_seconds = poll_seconds
+        self.warn_before = warn_before
+        self.queue_size = queue_size
+        self.subscribers = {}
+        self.task = None
+        self.last_id = None
+        self.delivered = 0
+        self.dropped = 0
+
+    def ensure_running(self):
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def subscribe(self, audience, hold=False):
+        stream = Stream(audience, self.queue_size, hold)
+        self.subscribers.setdefault(audience, set()).add(stream)
+        return stream
+
+    def unsubscribe(self, stream):
+        for timer in stream.timers:
+            timer.cancel()
+        streams = self.subscribers.get(stream.audience)
+        if streams is not None:
+            streams.discard(stream)
+            if not streams:
+                del self.subscribers[stream.audience]
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self.last_id = await loop.run_in_executor(None, self.storage.last_event_id)
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                events = await loop.run_in_executor(None, self.storage.events_after, self.last_id)
+            except Exception as e:
+                print(f"⚠️ Could not read events: {e}")
+                continue
+            for event in events:
+                self.last_id = event[0]
+                for stream in list(self.subscribers.get(event[1], ())):
+                    self.push(stream, event)
+                    if event[2] == 'assigned':
+                        self.warn(stream, event[3]['test_id'], event[3]['due'])
+
+    def release(self, stream, events):
+        """Queues events, then whatever was held on the stream while
+        they were read, so a replay is never queued behind newer live
+        events"""
+        held, stream.held = stream.held or [], None
+        for event in events + held:
+            self.push(stream, event)
+
+    def push(self, stream, event):
+        if stream.closed:
+            return
+        if stream.held is not None:
+            stream.held.append(event)
+            return
+        try:
+            stream.queue.put_nowait(event)
+            self.delivered += 1
+        except asyncio.QueueFull:
+            # A stream this far behind is ended; the browser reconnects
+            # and catches up from its Last-Event-ID
+            stream.closed = True
+            self.dropped += 1
+
+    def warn(self, stream, test_id, due):
+        """Schedules a deadline warning for one test on one stream"""
+        now = time.time()
+        if due <= now:
+            return
+        event = (None, stream.audience, 'deadline', {'test_id': test_id, 'due': due})
+        delay = max(0, due - self.warn_before - now)
+        stream.timers.append(asyncio.get_running_loop().call_later(delay, self.push, stream, event))
+
+    def stats(self):
+        return {
+            'streams': sum(map(len, self.subscribers.values())),
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'last_id': self.last_id
+        }
+
+
+def format_event(event):
+    event_id, _, kind, data = event
+    lines = [] if event_id is None else [f'id: {event_id}']
+    lines.append(f'event: {kind}')
+    lines.append(f'data: {json.dumps(data)}')
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+class EventStreamApp:
+    """ASGI app: GET path streams events from hub, anything else goes to app.
+
+    authenticate(headers) maps the request's headers (a dict of lower-
+    case byte names to byte values) to a stream audience, or None to
+    refuse; deadlines(audience) lists the (test id, due) pairs to warn
+    about. Both may touch storage, so they run on the thread pool. A
+    comment line every keepalive seconds keeps proxies from closing an
+    idle stream. on_shutdown, if given, is called when the server
+    shuts down.
+    """
+
+    def __init__(self, app, hub, authenticate, deadlines, path='/events', keepalive=20, on_shutdown=None):
+        self.app = app
+        self.hub = hub
+        self.authenticate = authenticate
+        self.deadlines = deadlines
+        self.path = path
+        self.keepalive = keepalive
+        self.on_shutdown = on_shutdown
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http' and scope['path'] == self.path and scope['method'] == 'GET':
+            await self.stream(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.on_shutdown is not None:
+                    await asyncio.get_running_loop().run_in_executor(None, self.on_shutdown)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def stream(self, scope, receive, send):
+        loop = asyncio.get_running_loop()
+        headers = dict(scope['headers'])
+        audience = await loop.run_in_executor(None, self.authenticate, headers)
+        if audience is None:
+            await send({'type': 'http.response.start', 'status': 401,
+                        'headers': [(b'content-type', b'text/plain')]})
+            await send({'type': 'http.response.body', 'body': b'login required'})
+            return
+
+        self.hub.ensure_running()
+        last_id = headers.get(b'last-event-id', b'')
+        # Subscribed before the replay is read, so nothing published
+        # meanwhile is missed; held until the replay is queued
+        stream = self.hub.subscribe(audience, hold=last_id.isdigit())
+        disconnected = loop.create_task(wait_for_disconnect(receive))
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no')
+            ]})
+            if last_id.isdigit():
+                # Reconnecting: replay what this audience missed
+                missed = await loop.run_in_executor(None, self.hub.storage.events_after, int(last_id))
+                self.hub.release(stream, [event for event in missed if event[1] == audience])
+            for test_id, due in await loop.run_in_executor(None, self.deadlines, audience):
+                self.hub.warn(stream, test_id, due)
+
+            while not stream.closed:
+                getter = loop.create_task(stream.queue.get())
+                try:
+                    done, _ = await asyncio.wait(
+                        {getter, disconnected}, timeout=self.keepalive, return_when=asyncio.FIRST_COMPLETED
+                    )
+                except asyncio.CancelledError:
+                    # The server is shutting down: end the response so
+                    # the browser reconnects rather than seeing an error
+                    getter.cancel()
+                    break
+                if getter not in done:
+                    getter.cancel()
+                    if disconnected in done:
+                        return
+                    body = b': keepalive\n\n'
+                else:
+                    event = getter.result()
+                    if event[0] is not None:
+                        # Replayed events may also arrive from the hub
+                        if event[0] <= stream.last_id:
+                            continue
+                        stream.last_id = event[0]
+                    body = format_event(event)
+                await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            self.hub.unsubscribe(stream)
+            disconnected.cancel()
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
@@ -0,0 +1,38 @@
+# gunicorn.conf.py - production serving settings, all overridable from the environment
+import multiprocessing
+import os
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Worker processes x threads per worker
+workers = int(os.environ.get('WEB_CONCURRENCY', min(4, multiprocessing.cpu_count() * 2 + 1)))
+threads = int(os.environ.get('WEB_THREADS', 4))
+# gthread serves wsgi:app; asgi.EventStreamWorker serves asgi:app,
+# which adds the per-user event streams
+worker_class = os.environ.get('WEB_WORKER_CLASS', 'gthread')
+
+# The in-memory backend lives inside one process; extra workers would each
+# see their own copy of every test
+if os.environ.get('STORAGE_BACKEND', 'sqlite') == 'memory' and workers > 1:
+    print("⚠️ STORAGE_BACKEND=memory cannot be shared between workers; using 1 worker")
+    workers = 1
+
+# Import the app once in the master so workers fork with it loaded
+preload_app = True
+
+# Each worker writes its metrics here for /metrics to add up; a fresh
+# directory per master start, so counts from a previous run never leak in
+os.environ.setdefault('METRICS_DIR', tempfile.mkdtemp(prefix='pd-metrics-'))
+
+# Keep-alive for browsers reusing connections between page loads
+keepalive = int(os.environ.get('WEB_KEEPALIVE', 5))
+
+# Graceful restarts: finish in-flight requests on HUP/TERM, and recycle
+# workers now and then so slow leaks never build up
+timeout = int(os.environ.get('WEB_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.environ.get('WEB_MAX_REQUESTS_JITTER', 500))
+
+accesslog = os.environ.get('WEB_ACCESS_LOG', '-')
@@ -0,0 +1,179 @@
+# metrics.py - counters and histograms shared by every worker process
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from background import Background
+
+# Histogram bucket upper bounds, in seconds (the last bucket is +Inf)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+
+class Metrics(Background):
+    """Counters and latency histograms, sharded per thread.
+
+    Every thread updates its own shard (plain dicts, no lock), so the
+    request path never waits on another thread; snapshot() sums the
+    shards. Series are keyed by (name, labels), labels being a tuple of
+    (label, value) pairs.
+
+    With a directory set, a daemon thread writes this process's
+    snapshot to <directory>/<pid>.json every flush_seconds, and
+    collect() adds up the files of every worker, including ones that
+    have since exited, so counters never go backwards when a worker is
+    recycled.
+    """
+
+    def __init__(self, directory=None, flush_seconds=1.0):
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.help = {}
+        self.local = threading.local()
+        self.shards = []
+        self.lock = threading.Lock()
+
+    def describe(self, name, kind, text):
+        self.help[name] = (kind, text)
+
+    def shard(self):
+        shard = getattr(self.local, 'shard', None)
+        if shard is None:
+            shard = self.local.shard = ({}, {})
+            with self.lock:
+                self.shards.append(shard)
+        return shard
+
+    def inc(self, name, labels=(), value=1):
+        counters = self.shard()[0]
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, labels, seconds):
+        histograms = self.shard()[1]
+        key = (name, labels)
+        histogram = histograms.get(key)
+        if histogram is None:
+            # one count per bucket, then the sum
+            histogram = histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        histogram[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        histogram[-1] += seconds
+
+    def snapshot(self):
+        """({key: value}, {key: bucket counts + [sum]}) for this process"""
+        counters, histograms = {}, {}
+        with self.lock:
+            shards = list(self.shards)
+        for shard_counters, shard_histograms in shards:
+            # dict() copies in one step, so a concurrent update can't
+            # change the dict while it is read
+            for key, value in dict(shard_counters).items():
+                counters[key] = counters.get(key, 0) + value
+            for key, histogram in dict(shard_histograms).items():
+                merge(histograms, key, list(histogram))
+        return counters, histograms
+
+    def start_in_process(self):
+        # Counts made before a fork belong to the parent
+        self.local = threading.local()
+        self.shards = []
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            threading.Thread(target=self.run, name='metrics-flusher', daemon=True).start()
+            atexit.register(self.flush)
+
+    def run(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+    def flush(self):
+        counters, histograms = self.snapshot()
+        data = {
+            'counters': [[name, labels, value] for (name, labels), value in counters.items()],
+            'histograms': [[name, labels, values] for (name, labels), values in histograms.items()]
+        }
+        path = os.path.join(self.directory, f'{os.getpid()}.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(path + '.tmp', path)
+
+    def collect(self):
+        """Snapshot summed over every worker (just this one without a directory)"""
+        if not self.directory:
+            return self.snapshot()
+        self.flush()
+        counters, histograms = {}, {}
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in data['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, values in data['histograms']:
+                merge(histograms, (name, tuple(map(tuple, labels))), values)
+        return counters, histograms
+
+    def render(self, gauges=()):
+        """Prometheus text format for collect() plus (name, labels, value) gauges"""
+        counters, histograms = self.collect()
+        # name -> [(labels, lines)]: one group per series, sorted by
+        # labels; a histogram's lines stay in bucket order
+        series = {}
+        for (name, labels), value in counters.items():
+            series.setdefault(name, []).append((labels, [f'{name}{format_labels(labels)} {value:g}']))
+        for (name, labels), values in histograms.items():
+            lines = []
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), values):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                lines.append(f'{name}_bucket{format_labels(labels + (("le", le),))} {cumulative}')
+            lines.append(f'{name}_sum{format_labels(labels)} {values[-1]:g}')
+            lines.append(f'{name}_count{format_labels(labels)} {cumulative}')
+            series.setdefault(name, []).append((labels, lines))
+        for name, labels, value in gauges:
+            series.setdefault(name, []).append((labels, [f'{name}{format_labels(labels)} {value:g}']))
+
+        out = []
+        for name in sorted(series):
+            kind, text = self.help.get(name, ('untyped', name))
+            out.append(f'# HELP {name} {text}')
+            out.append(f'# TYPE {name} {kind}')
+            for _, lines in sorted(series[name], key=lambda group: group[0]):
+                out.extend(lines)
+        return '\n'.join(out) + '\n'
+
+
+def merge(histograms, key, values):
+    existing = histograms.get(key)
+    if existing is None:
+        histograms[key] = values
+    else:
+        for i, value in enumerate(values):
+            existing[i] += value
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{label}="{value}"' for (label, _), value in zip(labels, escaped)) + '}'
+
+
+def quantile(values, q):
+    """Upper bound (seconds) of the bucket holding quantile q of a histogram"""
+    counts = values[:-1]
+    target = q * sum(counts)
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), counts):
+        seen += count
+        if count and seen >= target:
+            return bound
+    return None
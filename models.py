@@ -0,0 +1,103 @@
+# models.py - assessment records
+from dataclasses import dataclass
+from datetime import datetime
+
+# Question lists by (topic, version). A test stores only its topic and
+# version, so editing a topic's questions means registering a new
+# version and leaving the old one for tests already assigned from it.
+QUESTION_BANK = {}
+
+DATE_FIELDS = ('created', 'due', 'submitted_date', 'graded_date')
+
+
+@dataclass(slots=True)
+class Assignment:
+    """One test assigned to one engineer.
+
+    answers, auto_scores, reasoning and final_scores are indexed by
+    question number and as long as the question list; an unanswered or
+    unscored question holds None. The score lists stay None until the
+    test has been scored or graded. While a test is pending, auto_scores
+    holds draft scores and scored_hashes the hash of the scorer input
+    (app.answer_hash) each was computed from, and edited_at when (client
+    clock, epoch milliseconds) each autosaved answer was typed. Other
+    timestamps are epoch seconds.
+    """
+
+    id: str
+    engineer_id: str
+    topic: str
+    question_version: int
+    created: float
+    due: float
+    status: str = 'pending'
+    answers: list = None
+    auto_scores: list = None
+    reasoning: list = None
+    scored_hashes: list = None
+    edited_at: list = None
+    final_scores: list = None
+    score: int = None
+    scoring: bool = False
+    submitted_date: float = None
+    graded_by: str = None
+    graded_date: float = None
+    revision: int = 0
+
+    def __post_init__(self):
+        if self.answers is None:
+            self.answers = [None] * len(self.questions)
+
+    @property
+    def questions(self):
+        return QUESTION_BANK[(self.topic, self.question_version)]
+
+    @property
+    def answered(self):
+        return sum(1 for answer in self.answers if answer)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds an Assignment from to_dict() output or an older record.
+
+        Older records embedded the question list, kept answers and
+        scores in dicts keyed by str(question number) and stored
+        ISO date strings; those are converted as they are read.
+        """
+        if 'question_version' in data:
+            return cls(**data)
+        fields = {name: data[name] for name in cls.__slots__ if name in data}
+        fields['question_version'] = 1
+        for name in DATE_FIELDS:
+            if isinstance(fields.get(name), str):
+                fields[name] = datetime.fromisoformat(fields[name]).timestamp()
+        count = len(QUESTION_BANK[(fields['topic'], fields['question_version'])])
+        if isinstance(fields.get('answers'), dict):
+            fields['answers'] = from_keyed(fields['answers'], count)
+        if isinstance(fields.get('final_scores'), dict):
+            fields['final_scores'] = from_keyed(fields['final_scores'], count)
+        if isinstance(fields.get('auto_scores'), dict):
+            keyed = fields['auto_scores']
+            if keyed:
+                fields['auto_scores'] = from_keyed({i: s['score'] for i, s in keyed.items()}, count)
+                fields['reasoning'] = from_keyed({i: s['reasoning'] for i, s in keyed.items()}, count)
+            else:
+                fields['auto_scores'] = None
+        return cls(**fields)
+
+
+def is_older(edited_at, than):
+    """True if an answer edit made at edited_at predates one made at than
+    (None, for an edit of unknown age, is never older or newer)"""
+    return edited_at is not None and than is not None and edited_at < than
+
+
+def from_keyed(keyed, count):
+    """{'0': value, ...} -> [value, None, ...] of the given length"""
+    values = [None] * count
+    for i, value in keyed.items():
+        values[int(i)] = value
+    return values
@@ -0,0 +1,114 @@
+# passwords.py - password hashing (scrypt) and a bounded pool for checking them
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from background import Background
+from cache import LRUCache
+
+# scrypt cost: 16 MB and roughly 50-100 ms per hash. Stored hashes carry
+# their own parameters, so raising these upgrades users as they log in.
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_MAXMEM = 64 * 1024 * 1024
+
+# Checked in place of a missing user's hash, so that an unknown username
+# takes as long to refuse as a wrong password
+DUMMY_HASH = (
+    'scrypt$16384$8$1$09b191d0fc9fc8801fe0c04d04fc9bf7$'
+    '6562e46611124157b37bd53164b994fcbd47bfa53c968a81827d02c3a8eec70c'
+)
+
+
+def hash_password(password):
+    """'scrypt$n$r$p$salt$key' for a password, with a fresh random salt"""
+    salt = os.urandom(16)
+    key = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P,
+                         maxmem=SCRYPT_MAXMEM, dklen=32)
+    return f'scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${key.hex()}'
+
+
+def verify_password(stored, password):
+    """True if password matches a stored hash: scrypt, or the unsalted
+    SHA-256 hex digests of older databases"""
+    if stored.startswith('scrypt$'):
+        _, n, r, p, salt, key = stored.split('$')
+        expected = bytes.fromhex(key)
+        candidate = hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt), n=int(n), r=int(r), p=int(p),
+                                   maxmem=SCRYPT_MAXMEM, dklen=len(expected))
+        return hmac.compare_digest(candidate, expected)
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest().encode(), stored.encode())
+
+
+def needs_rehash(stored):
+    """True for hashes made with other (or no) scrypt parameters"""
+    return not stored.startswith(f'scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$')
+
+
+class PasswordChecker(Background):
+    """Checks passwords on a small pool of threads.
+
+    hashlib.scrypt releases the GIL, so the pool's workers hash in
+    parallel with the request threads waiting on them. At most limit
+    checks are let in at once (running or queued); check() returns None
+    beyond that, so a burst of logins can never hold every request
+    thread of a worker.
+
+    A successful check is remembered for cache_seconds under an HMAC of
+    the stored hash and the password, keyed with a secret that never
+    leaves this process. Logging in again (another tab, a recycled
+    session) then skips the KDF. Failed checks are never remembered, and
+    a changed password changes the stored hash and so the key.
+    """
+
+    def __init__(self, workers=2, limit=3, cache_seconds=600):
+        self.workers = workers
+        self.limit = limit
+        self.verified = LRUCache(1024 * 1024, ttl=cache_seconds)
+        self.secret = os.urandom(32)
+        self.executor = None
+        self.slots = None
+        self.lock = threading.Lock()
+        self.checked = 0
+        self.refused = 0
+
+    def start_in_process(self):
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix='kdf')
+        self.slots = threading.BoundedSemaphore(self.limit)
+
+    def check(self, stored, password):
+        """True or False, or None if too many checks are already running.
+        stored may be None (no such user): the result is then False."""
+        key = hmac.new(self.secret, f'{stored}\n{password}'.encode(), 'sha256').digest()
+        if stored is not None and self.verified.get(key):
+            return True
+        self.ensure_running()
+        if not self.slots.acquire(blocking=False):
+            self.refused += 1
+            return None
+        try:
+            ok = self.executor.submit(verify_password, stored or DUMMY_HASH, password).result()
+        finally:
+            self.slots.release()
+        self.checked += 1
+        if ok and stored is not None:
+            self.verified.put(key, True, len(key) + len(stored))
+            return True
+        return False
+
+    def hash(self, password):
+        """hash_password on the pool"""
+        self.ensure_running()
+        return self.executor.submit(hash_password, password).result()
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'limit': self.limit,
+            'checked': self.checked,
+            'refused': self.refused,
+            'cache': self.verified.stats()
+        }
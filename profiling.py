@@ -0,0 +1,211 @@
+# profiling.py - request timing, spans and an opt-in stack sampler
+import functools
+import heapq
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from background import Background
+from metrics import quantile
+
+# Spans of the request running on this thread
+current = threading.local()
+
+
+@contextmanager
+def span(name):
+    """Adds the time spent inside the block to the current request's span"""
+    spans = getattr(current, 'spans', None)
+    if spans is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans[name] = spans.get(name, 0) + time.perf_counter() - start
+
+
+def timed(name):
+    """Decorator form of span()"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def time_methods(obj, names, name):
+    """Times the named methods of one object under a single span name"""
+    for method in names:
+        setattr(obj, method, timed(name)(getattr(obj, method)))
+    return obj
+
+
+def request_summary(metrics):
+    """This worker's requests per route: count, total and p50/p95/p99
+    bucket bounds in seconds, and time per span"""
+    counters, histograms = metrics.snapshot()
+    routes = {}
+    for (name, labels), values in histograms.items():
+        if name == 'pd_request_duration_seconds':
+            routes[dict(labels)['route']] = {
+                'count': sum(values[:-1]),
+                'sum': values[-1],
+                'p50': quantile(values, 0.5),
+                'p95': quantile(values, 0.95),
+                'p99': quantile(values, 0.99),
+                'spans': {}
+            }
+    for (name, labels), value in counters.items():
+        if name == 'pd_request_span_seconds_total':
+            labels = dict(labels)
+            routes.setdefault(labels['route'], {'spans': {}})['spans'][labels['span']] = value
+    return routes
+
+
+class StackSampler(Background):
+    """Samples the stacks of in-flight requests and keeps the slowest.
+
+    One daemon thread wakes every interval seconds and records the
+    stack of each thread that is serving a request, as folded
+    'outer;inner' lines. When a request ends, its samples are written
+    to directory as <ms>-<route>.folded if it is among the keep
+    slowest seen so far (the file it displaces is removed). The files
+    are the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, directory, interval=0.005, keep=20):
+        self.directory = directory
+        self.interval = interval
+        self.keep = keep
+        self.active = {}
+        self.slowest = []
+        self.lock = threading.Lock()
+
+    def start_in_process(self):
+        self.active = {}
+        os.makedirs(self.directory, exist_ok=True)
+        threading.Thread(target=self.run, name='stack-sampler', daemon=True).start()
+
+    def start(self):
+        with self.lock:
+            self.active[threading.get_ident()] = Counter()
+
+    def discard(self):
+        with self.lock:
+            self.active.pop(threading.get_ident(), None)
+
+    def stop(self, route, seconds):
+        with self.lock:
+            samples = self.active.pop(threading.get_ident(), None)
+            if not samples:
+                return
+            if len(self.slowest) >= self.keep and seconds <= self.slowest[0][0]:
+                return
+            name = re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_')
+            path = os.path.join(self.directory, f'{seconds * 1000:09.1f}ms-{os.getpid()}-{name}.folded')
+            if len(self.slowest) >= self.keep:
+                _, displaced = heapq.heapreplace(self.slowest, (seconds, path))
+            else:
+                heapq.heappush(self.slowest, (seconds, path))
+                displaced = None
+        with open(path, 'w') as f:
+            for stack, count in samples.most_common():
+                f.write(f'{stack} {count}\n')
+        if displaced:
+            try:
+                os.remove(displaced)
+            except OSError:
+                pass
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self.lock:
+                for ident, samples in self.active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        samples[fold(frame)] += 1
+
+
+def fold(frame):
+    """'outer;...;inner' for a stack, one 'function (file:line)' per frame"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def install(app, metrics, sampler=None):
+    """Times every request of a Flask app, and samples it if a sampler is given.
+
+    Register before any other request hooks: the timer then starts
+    first and stops last, after the other after_request handlers
+    (compression included) have run. Latency goes to the
+    pd_request_duration_seconds histogram and spans to
+    pd_request_span_seconds_total, both labelled by route (method and
+    URL rule, so every test shares one series). Each response carries
+    a Server-Timing header with its spans.
+    """
+    metrics.describe('pd_request_duration_seconds', 'histogram', 'Request latency by route')
+    metrics.describe('pd_request_span_seconds_total', 'counter',
+                     'Time spent in storage, template rendering and scoring, by route')
+    from flask import request
+    from flask.signals import before_render_template, template_rendered
+
+    @app.before_request
+    def start_timer():
+        metrics.ensure_running()
+        current.spans = {}
+        current.start = time.perf_counter()
+        if sampler is not None:
+            sampler.ensure_running()
+            sampler.start()
+
+    @app.after_request
+    def stop_timer(response):
+        start = getattr(current, 'start', None)
+        if start is None:
+            return response
+        seconds = time.perf_counter() - start
+        spans, current.spans, current.start = current.spans, None, None
+        route = f'{request.method} {request.url_rule.rule if request.url_rule else "<unmatched>"}'
+        metrics.observe('pd_request_duration_seconds', (('route', route),), seconds)
+        for name, spent in spans.items():
+            metrics.inc('pd_request_span_seconds_total', (('route', route), ('span', name)), spent)
+        if sampler is not None:
+            sampler.stop(route, seconds)
+        parts = [f'{name};dur={spent * 1000:.2f}' for name, spent in spans.items()]
+        parts.append(f'total;dur={seconds * 1000:.2f}')
+        response.headers['Server-Timing'] = ', '.join(parts)
+        return response
+
+    @app.teardown_request
+    def drop_timer(exc):
+        # after_request doesn't run when a view raises
+        if getattr(current, 'start', None) is not None:
+            current.spans, current.start = None, None
+            if sampler is not None:
+                sampler.discard()
+
+    def render_started(sender, template, context, **extra):
+        current.render_start = time.perf_counter()
+
+    def render_finished(sender, template, context, **extra):
+        spans = getattr(current, 'spans', None)
+        started = getattr(current, 'render_start', None)
+        if spans is not None and started is not None:
+            spans['render'] = spans.get('render', 0) + time.perf_counter() - started
+
+    before_render_template.connect(render_started, app, weak=False)
+    template_rendered.connect(render_finished, app, weak=False)
@@ -0,0 +1,47 @@
+# ratelimit.py - token buckets, for throttling repeated failed logins
+import threading
+import time
+
+
+class TokenBuckets:
+    """One token bucket per key (a username, a client address).
+
+    A bucket holds up to burst tokens and regains rate tokens per
+    second; the caller spends one per event it wants to limit and waits
+    retry_after() seconds when the bucket is empty. Buckets are per
+    process, so under gunicorn each worker counts separately. A full
+    bucket is the same as no bucket, so full ones are dropped whenever
+    more than max_keys are held.
+    """
+
+    def __init__(self, burst, rate, max_keys=10000):
+        self.burst = burst
+        self.rate = rate
+        self.max_keys = max_keys
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.limited = 0
+
+    def level(self, key, now):
+        tokens, updated = self.buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - updated) * self.rate)
+
+    def retry_after(self, key):
+        """0 if key has a token to spend, else the seconds until it has"""
+        with self.lock:
+            tokens = self.level(key, time.monotonic())
+            if tokens >= 1:
+                return 0
+            self.limited += 1
+            return (1 - tokens) / self.rate
+
+    def take(self, key):
+        """Spends one of key's tokens (none left is not an error)"""
+        now = time.monotonic()
+        with self.lock:
+            self.buckets[key] = (max(0, self.level(key, now) - 1), now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets = {k: v for k, v in self.buckets.items() if self.level(k, now) < self.burst}
+
+    def stats(self):
+        return {'keys': len(self.buckets), 'limited': self.limited}
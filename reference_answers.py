@@ -0,0 +1,280 @@
+# reference_answers.py - model answers for the similarity scorer
+#
+# One answer per question, in the same order as app.QUESTIONS. Editing
+# an answer changes the scorer version, so scores memoized against the
+# old text are not reused.
+
+REFERENCE_ANSWERS = {
+    "sta": [
+        "Static timing analysis checks every timing path in the design against the clock constraints "
+        "without simulation vectors. It computes arrival and required times through cell and net delays "
+        "to find setup and hold violations. It is exhaustive and fast, so it is the standard way to prove "
+        "the chip meets its target frequency before tape-out.",
+
+        "Setup time is how long data must be stable before the capturing clock edge; hold time is how long "
+        "it must stay stable after the edge. A setup violation means the data arrives too late and the "
+        "design cannot run at the target frequency. A hold violation means new data races through and "
+        "corrupts the captured value, which no frequency change can fix.",
+
+        "Slack is the margin between required time and arrival time on a path. Setup slack is the required "
+        "time (clock period plus capture clock latency minus setup time and uncertainty) minus the data "
+        "arrival time. Hold slack is the data arrival time minus the hold required time (capture clock "
+        "latency plus hold time). Negative slack is a timing violation.",
+
+        "To fix a -30ps setup violation: upsize the driving cells or swap to lower threshold voltage cells "
+        "for faster delay, insert buffers or restructure logic to cut long nets and logic depth, and use "
+        "useful skew by delaying the capture clock. Placement changes that shorten critical nets and "
+        "pipelining the path also help.",
+
+        "Clock skew is the difference in clock arrival time between the launching and capturing flops. "
+        "Positive skew, where the capture clock arrives later, helps setup because the data gets more time "
+        "but hurts hold. Negative skew hurts setup and helps hold. Skew must be balanced so both checks "
+        "have margin.",
+
+        "Timing corners are combinations of process, voltage and temperature such as slow-slow low voltage "
+        "and fast-fast high voltage. Setup is checked at the slow corner where cells are slowest, often at "
+        "low temperature too because of temperature inversion. Hold is checked at the fast corner where "
+        "paths are fastest. Signoff runs many corners with RC extraction corners as well.",
+
+        "Timing exceptions tell STA that a path should not be timed with the default single-cycle check: "
+        "false paths, multicycle paths and min/max delay constraints. A false path is used for paths that "
+        "can never be exercised functionally, such as asynchronous clock domain crossings that go through "
+        "synchronizers, static configuration registers or test-mode only logic.",
+
+        "Ideal clock analysis assumes the clock arrives at every flop at the same time with zero latency, "
+        "used before clock tree synthesis with estimated latency and uncertainty. Propagated clock analysis "
+        "uses the real delays through the built clock tree buffers and nets, so actual skew and insertion "
+        "delay are included after CTS.",
+
+        "Clock jitter is the cycle-to-cycle variation of the clock edge from the PLL or source. It reduces "
+        "the usable period, so it is modeled as clock uncertainty: set_clock_uncertainty adds jitter margin "
+        "to setup checks, and hold uncertainty covers the remaining skew. The uncertainty is reduced after "
+        "CTS once real skew is known.",
+
+        "Hold violations of 25ps are fixed by adding delay to the data path: insert delay buffers or delay "
+        "cells near the capture flop, downsize cells or use higher threshold voltage cells, and reroute with "
+        "longer wires. Reducing clock skew between launch and capture flops also helps. Fixes must be "
+        "checked so they do not create new setup violations.",
+
+        "OCV, on-chip variation, is the difference in delay between cells of the same type on one die due "
+        "to local process, voltage and temperature variation. STA adds OCV derates, or AOCV and POCV "
+        "tables, so the launch path is pessimistically slow and the capture path fast for setup, and the "
+        "reverse for hold. Common path pessimism removal avoids over-counting the shared clock path.",
+
+        "A multicycle path is a path allowed more than one clock cycle for data to propagate. With "
+        "set_multicycle_path the setup check moves to a later edge, and the hold check must usually be "
+        "adjusted back by setting a hold multiplier. An example is a slow multiplier whose result is only "
+        "sampled every second cycle by an enable.",
+
+        "For multiple clock domains, define every clock and generated clock, then set clock groups: "
+        "synchronous clocks are timed against each other, while asynchronous or exclusive clocks are "
+        "declared with set_clock_groups or false paths. Crossings between async domains are checked by "
+        "CDC tools and max delay constraints, and each domain is timed at its own period.",
+
+        "Clock domain crossing is when a signal launched by one clock is captured by an unrelated clock. "
+        "It risks metastability, so synchronizers such as two-flop synchronizers, handshakes or async FIFOs "
+        "are used. Timing checks include max delay or skew constraints on the crossing paths, false paths "
+        "on the synchronizer input, and structural CDC verification.",
+
+        "Memory interface timing uses the SRAM timing model (liberty) for setup and hold on address, data "
+        "and control pins and the clock-to-output access time. It differs because the memory is a hard "
+        "macro with its own internal timing, long pin access, large input capacitance and often separate "
+        "read and write timing arcs, so constraints and placement near the macro matter.",
+
+        "Signoff timing reports include report_timing for the worst setup and hold paths in every corner "
+        "and mode, total negative slack and worst negative slack summaries, max transition, max capacitance "
+        "and max fanout violations, clock skew and latency reports, constraint coverage checks for unclocked "
+        "or unconstrained endpoints, and SI crosstalk delta delay reports.",
+
+        "Generated clocks are defined with create_generated_clock on the divider or mux output, with the "
+        "master clock as source and the divide or multiply ratio. STA then propagates the source latency "
+        "from the master clock. Clock muxes need exclusive clock groups, and paths between the master and "
+        "generated clocks are timed as synchronous.",
+
+        "Timing correlation means STA results match silicon and other tools. It is ensured with accurate "
+        "signoff extraction and library characterization, correct OCV and derate margins, SI analysis, "
+        "comparing signoff STA with SPICE simulation of critical paths, and checking silicon measurements "
+        "such as ring oscillators and speed binning against predicted delays."
+    ],
+
+    "cts": [
+        "Clock tree synthesis builds the buffered network that distributes the clock from its source to "
+        "every flop and clock pin. It is needed because one driver cannot drive thousands of sinks with "
+        "good transition. CTS balances skew and insertion delay, meets max transition and capacitance, and "
+        "keeps clock power reasonable.",
+
+        "Clock skew is the difference in clock arrival time between sinks. It reduces the timing margin "
+        "for setup or hold. A typical target is about 5 to 10 percent of the clock period, for example "
+        "50ps to 100ps at 1GHz, with tighter local skew between flops that talk to each other.",
+
+        "Insertion delay, or clock latency, is the delay from the clock source to a sink through the clock "
+        "tree. Skew is the difference in insertion delay between two sinks. A tree can have large insertion "
+        "delay but small skew if every branch is balanced; large latency costs power and increases OCV "
+        "impact.",
+
+        "To reduce skew from 150ps to 50ps: rebalance the tree by adding or sizing buffers on the short "
+        "branches, reduce latency on long branches, fix sink clustering and placement of clock gating "
+        "cells, use non-default routing rules with wider spacing and shielding, and set proper skew groups "
+        "and exceptions so CTS balances the right sinks.",
+
+        "Clock trees are built from clock buffers and clock inverters with balanced rise and fall delay, "
+        "plus clock gating cells and sometimes muxes. Inverters are smaller and give better duty cycle "
+        "because rise and fall alternate; buffers are two inverters and are easier for polarity. Both are "
+        "sized to meet transition targets.",
+
+        "Clock tree balancing equalizes insertion delay to all sinks so skew is within target. It is "
+        "achieved by clustering sinks, building symmetric levels of buffers, sizing drivers, adding delay "
+        "on shorter branches, and balancing across clock gating and divider branches with skew groups. "
+        "Routing with non-default rules keeps wire delay predictable.",
+
+        "Useful skew intentionally delays or advances the clock to some flops to borrow time between "
+        "stages. For example, if the path into a flop has negative setup slack but the path out of it has "
+        "positive slack, delaying that flop's clock fixes the setup violation while keeping both stages "
+        "timing clean, as long as hold still passes.",
+
+        "Clock gating cells stop the clock to idle logic to save power. They add delay and create separate "
+        "branches, so CTS must balance through them and check the enable setup and hold timing. They are "
+        "placed close to the root to gate large subtrees for power, but not so far that enable timing or "
+        "skew suffers.",
+
+        "An H-tree is a symmetric topology with equal wire lengths from the root to every leaf, giving low "
+        "skew and good variation tolerance but high wire and power cost; it suits regular high-performance "
+        "designs. A balanced tree built by CTS clusters sinks by placement, uses less power and area, and "
+        "is used for most designs.",
+
+        "With 3 clock domains, define each clock and its skew group, and build a separate tree per clock "
+        "balanced only within its own domain. Asynchronous clocks need no inter-clock balancing, while "
+        "synchronous or related clocks need balancing between them. Handle clock muxes and generated clocks "
+        "and keep clock trees apart to avoid crosstalk.",
+
+        "To reduce clock tree power: use clock gating aggressively, reduce the number of buffers and "
+        "levels, use multi-bit flops to cut sinks, lower clock net capacitance with better sink clustering "
+        "and shorter wires, use lower voltage or smaller cells off the critical branches, and avoid over "
+        "tight skew targets.",
+
+        "For multiple voltage domains, build the clock tree per domain using buffers that belong to that "
+        "domain's supply, and cross domains through level shifters placed at the boundary. Balance latency "
+        "across the level shifter, account for different delays at each voltage, and check skew in every "
+        "voltage mode and corner.",
+
+        "A clock mesh is a grid of shorted wires driven by many drivers, with sinks tapping the mesh. It "
+        "gives very low skew and strong tolerance to variation, but costs high power, area and routing, "
+        "and needs SPICE analysis. It is chosen over a tree for very high frequency processors where skew "
+        "must be minimal.",
+
+        "High-frequency designs above 1GHz have very tight skew and transition budgets, so jitter, OCV "
+        "and crosstalk take a large share of the period. Challenges include duty cycle distortion, power "
+        "from fast clocks, electromigration on clock nets, and needing shielded non-default routing, "
+        "meshes or H-trees and careful useful skew.",
+
+        "With power gating, the clock tree must not pass through a domain that can be powered off to "
+        "reach always-on logic. Use always-on buffers for clock nets that cross switched regions, add "
+        "isolation, gate the clock before shutdown and balance the clock for retention flops. Check clock "
+        "timing in every power state.",
+
+        "The typical flow is synthesis, floorplan, power planning, placement and placement optimization, "
+        "then CTS, then post-CTS optimization with propagated clocks, routing and post-route optimization, "
+        "and finally signoff. CTS happens after placement because it needs flop locations, and before "
+        "routing because clock nets are routed first.",
+
+        "To optimize clock trees for variation and yield: reduce insertion delay and levels so there is "
+        "less OCV, increase common path between launch and capture flops for pessimism removal, use "
+        "balanced cells and non-default wide routing, shield clock nets, and verify skew across corners "
+        "and Monte Carlo variation.",
+
+        "After CTS, check skew and insertion delay reports per clock and skew group, max transition and "
+        "capacitance on clock nets, clock tree power and buffer count, timing reports with propagated "
+        "clocks for setup and hold, duty cycle and clock net crosstalk. The tree structure report shows "
+        "levels and branches to verify quality."
+    ],
+
+    "signoff": [
+        "Signoff is the final verification that the design is correct and manufacturable before tape-out. "
+        "Timing must close in every corner and mode, DRC and LVS must be clean, antenna and density rules "
+        "must pass, IR drop and electromigration must meet limits, and formal equivalence, power and signal "
+        "integrity checks must pass.",
+
+        "Five major signoff checks: STA timing signoff so the chip runs at frequency; DRC so the layout "
+        "can be manufactured; LVS so the layout matches the netlist; IR drop and EM analysis so power "
+        "delivery is reliable; and formal equivalence so the final netlist matches the RTL. Each one "
+        "catches failures the others cannot.",
+
+        "DRC, design rule check, verifies the layout obeys the foundry manufacturing rules. Common "
+        "violations are minimum spacing between metal shapes, minimum width of a wire, and minimum area or "
+        "enclosure of vias. Others include end-of-line spacing, density and notch violations.",
+
+        "LVS, layout versus schematic, extracts devices and connectivity from the layout and compares them "
+        "with the netlist. A mismatch means the layout does not implement the intended circuit: opens, "
+        "shorts, missing or extra devices, wrong device parameters or mismatched pins, any of which can "
+        "break the chip.",
+
+        "For 20 LVS errors, debug systematically: check the LVS rule deck and setup first, fix shorts "
+        "first because one short causes many errors, then opens, then pin and label mismatches, then "
+        "device and parameter mismatches. Use the highlight and cross-probing tools, fix in groups, and "
+        "rerun after each set of fixes.",
+
+        "Antenna checking finds long metal wires connected to a gate without a discharge path during "
+        "manufacturing. Plasma etching charges the metal and the charge can break down the thin gate "
+        "oxide, damaging the transistor. Fixes are antenna diodes, layer jumping to a higher metal, and "
+        "shorter wire segments.",
+
+        "Metal density rules require each layer's metal fill to stay within a minimum and maximum percentage "
+        "in every window. If density is too low, chemical mechanical polishing causes dishing and thickness "
+        "variation that changes resistance and can cause opens or shorts. Dummy metal fill is inserted to "
+        "meet the rules.",
+
+        "IR drop analysis computes the voltage drop across the power grid due to current through its "
+        "resistance, statically from average current and dynamically from switching activity. Lower supply "
+        "voltage slows cells and can cause timing failures. Typical limits are about 5 percent of supply "
+        "for static and about 10 percent for dynamic drop.",
+
+        "To fix 120mV IR drop: strengthen the power grid with wider or more straps and more vias, add power "
+        "pads or bumps, add decoupling capacitors near hot spots, spread high switching cells apart, reduce "
+        "simultaneous switching with clock gating or staggered activity, and move high-power blocks closer "
+        "to the supply.",
+
+        "Electromigration is the gradual movement of metal atoms caused by high current density, which "
+        "creates voids and hillocks that open or short wires over the chip lifetime. Prevent EM by "
+        "widening wires, adding vias, using non-default routing rules for high-current nets, limiting "
+        "driver strength and checking current density against foundry limits.",
+
+        "Timing signoff runs STA with signoff extraction across all corners and modes, including OCV and "
+        "SI effects. Required reports are worst setup and hold paths, total and worst negative slack, max "
+        "transition, capacitance and fanout, clock skew and latency, unconstrained endpoint checks and "
+        "crosstalk delta delay reports.",
+
+        "Signal integrity analysis checks coupling between neighboring nets. Effects checked are crosstalk "
+        "delta delay, which speeds up or slows down a victim net and affects timing, crosstalk glitches "
+        "that can flip a latch or flop, and noise on clock nets. Fixes are spacing, shielding, "
+        "upsizing drivers and layer changes.",
+
+        "Power analysis uses switching activity from simulation or vectorless estimates to compute dynamic "
+        "and leakage power per corner. Metrics that matter are total power against the budget, leakage at "
+        "the hot corner, peak power, power density for thermal limits, and the current used for IR drop "
+        "and EM analysis.",
+
+        "Multi-voltage designs need level shifters on signals between voltage domains, isolation cells on "
+        "outputs of power-gated domains, correct always-on buffering and retention, power switch checks, "
+        "UPF or CPF power intent verification, and STA and IR drop in every power state and voltage mode.",
+
+        "Formal verification proves mathematically that two designs are equivalent, such as RTL versus the "
+        "synthesized or final netlist, or that properties always hold. Simulation only checks the vectors "
+        "that are run, while formal equivalence checking covers every input combination without "
+        "testbenches.",
+
+        "Thermal analysis computes the temperature across the die from the power map and package thermal "
+        "model. Hot spots raise leakage, slow cells and worsen EM. Ensure the chip won't overheat by "
+        "spreading high-power blocks, meeting power density limits, choosing an adequate package and heat "
+        "sink, and signing off timing and EM at the right temperature.",
+
+        "Yield analysis estimates the fraction of manufactured dies that work. Optimize manufacturing "
+        "yield with design for manufacturing: redundant vias, wider spacing where possible, metal fill "
+        "and density balancing, litho hotspot fixes, critical area reduction, and enough timing margin "
+        "for process variation.",
+
+        "The typical signoff flow: timing closure with STA, physical verification with DRC, LVS and "
+        "antenna, power integrity with IR drop and EM, formal equivalence and low-power checks, then "
+        "final tape-out review. STA engineers sign off timing, physical verification engineers sign off "
+        "DRC and LVS, and the design lead signs off the tape-out checklist."
+    ]
+}
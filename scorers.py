@@ -0,0 +1,112 @@
+# scorers.py - answer scoring strategies
+import re
+from collections import Counter
+from itertools import chain
+
+import numpy as np
+
+# Scorers by name. A scorer has score(question, answer, topic) and
+# score_batch(topic, questions, answers), both giving (score, reasoning)
+# pairs; app.TOPIC_SCORERS picks one per topic.
+SCORERS = {}
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+STOP_WORDS = frozenset(
+    'a an and are as at be been but by can do does for from has have how if in into is it its '
+    'of on or so such than that the their then there these they this to was we what when where '
+    'which while who why will with would you your'.split()
+)
+
+
+def tokenize(text):
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def register_scorer(name, scorer):
+    SCORERS[name] = scorer
+
+
+class TfidfScorer:
+    """Scores answers by cosine similarity to a reference answer.
+
+    For each topic the vocabulary, IDF weights and the L2-normalized
+    TF-IDF vector of every question's reference (question text plus
+    model answer) are computed once, as a questions x terms matrix. A
+    batch of answers becomes one sparse answers x terms matrix in
+    coordinate form, and its product with the reference rows gives all
+    the similarities at once. Terms no reference uses still count
+    towards an answer's norm, with the highest IDF.
+
+    A similarity of full_marks or more scores 10; answers shorter than
+    min_words are scaled down so a few keywords alone don't score well.
+    """
+
+    def __init__(self, questions, references, full_marks=0.5, min_words=40):
+        self.full_marks = full_marks
+        self.min_words = min_words
+        self.topics = {}
+        for topic, topic_questions in questions.items():
+            docs = [tokenize(f'{q} {r}') for q, r in zip(topic_questions, references[topic])]
+            vocab = {t: j for j, t in enumerate(sorted({t for doc in docs for t in doc}))}
+            df = np.zeros(len(vocab))
+            for doc in docs:
+                df[[vocab[t] for t in set(doc)]] += 1
+            idf = np.log((1 + len(docs)) / (1 + df)) + 1
+            matrix = np.zeros((len(docs), len(vocab)))
+            for row, doc in enumerate(docs):
+                for term, tf in Counter(doc).items():
+                    matrix[row, vocab[term]] = tf * idf[vocab[term]]
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+            self.topics[topic] = {
+                'vocab': vocab,
+                'idf': idf,
+                'unknown_idf': np.log(1 + len(docs)) + 1,
+                'references': matrix,
+                'rows': {q: row for row, q in enumerate(topic_questions)}
+            }
+
+    def score(self, question, answer, topic):
+        return self.score_batch(topic, [question], [answer])[0]
+
+    def score_batch(self, topic, questions, answers):
+        results = [(0, "Answer too short or empty")] * len(answers)
+        model = self.topics[topic]
+        vocab = model['vocab']
+        keep = [k for k, answer in enumerate(answers) if answer and len(answer.strip()) >= 20]
+        if not keep:
+            return results
+
+        # Answers x terms counts in coordinate form. Every distinct token
+        # in the batch gets a local id; tokens are then counted per
+        # (answer, local id) pair in one pass.
+        tokens = [TOKEN_PATTERN.findall(answers[k].lower()) for k in keep]
+        flat = list(chain.from_iterable(tokens))
+        local = {t: i for i, t in enumerate(dict.fromkeys(flat))}
+        ids = np.fromiter(map(local.__getitem__, flat), dtype=np.int64, count=len(flat))
+        owner = np.repeat(np.arange(len(keep)), list(map(len, tokens)))
+        pairs, counts = np.unique(owner * len(local) + ids, return_counts=True)
+        rows, local_ids = np.divmod(pairs, max(1, len(local)))
+        # local id -> vocabulary column, -1 if no reference uses the term
+        # and -2 for stop words
+        columns = np.array(
+            [-2 if t in STOP_WORDS else vocab.get(t, -1) for t in local], dtype=np.int64
+        )[local_ids] if local else np.zeros(0, dtype=np.int64)
+        idf = np.append(model['idf'], model['unknown_idf'])
+        weights = np.where(columns == -2, 0.0, counts * idf[columns])
+        norms = np.sqrt(np.bincount(rows, weights * weights, minlength=len(keep)))
+        known = columns >= 0
+        rows, cols, weights = rows[known], columns[known], weights[known]
+
+        # Each answer against its own question's reference row
+        reference_rows = np.array([model['rows'][questions[k]] for k in keep])
+        dots = np.bincount(rows, weights * model['references'][reference_rows[rows], cols], minlength=len(keep))
+        similarity = np.divide(dots, norms, out=np.zeros(len(keep)), where=norms > 0)
+
+        for n, k in enumerate(keep):
+            word_count = len(answers[k].split())
+            value = min(1, similarity[n] / self.full_marks) * min(1, word_count / self.min_words)
+            results[k] = (
+                int(round(10 * value)),
+                f"{similarity[n]:.0%} similar to reference answer ({word_count} words)"
+            )
+        return results
@@ -0,0 +1,70 @@
+# sessions.py - server-side login sessions
+import hashlib
+import secrets
+import time
+
+from cache import LRUCache
+
+
+class SessionStore:
+    """Login sessions kept on the server, behind an opaque cookie.
+
+    The cookie holds a random ID and nothing else. Storage keeps the
+    SHA-256 of each ID with its user and expiry time, so sessions
+    survive worker restarts (with the SQLite backend) and a copy of the
+    database can't be used to log in. resolve() turns an ID into the
+    user's record (less the password hash); the answer is cached per
+    worker for cache_seconds, so most requests touch neither the
+    sessions nor the users table. Ending a session removes it at once
+    from storage and from this worker's cache; other workers may
+    accept it until their cached copy expires.
+    """
+
+    def __init__(self, storage, lifetime, cache_bytes=4 * 1024 * 1024, cache_seconds=30):
+        self.storage = storage
+        self.lifetime = lifetime
+        self.users = LRUCache(cache_bytes, ttl=cache_seconds)
+        self.created = 0
+        self.ended = 0
+
+    def create(self, user):
+        """Starts a session for user; returns the ID for the cookie"""
+        session_id = secrets.token_urlsafe(32)
+        now = time.time()
+        # Logins are rare next to page loads, so old sessions go here
+        self.storage.delete_expired_sessions(now)
+        self.storage.save_session(session_key(session_id), user['id'], now + self.lifetime)
+        self.created += 1
+        return session_id
+
+    def resolve(self, session_id):
+        """The user a session belongs to, or None if it is unknown or expired"""
+        if not session_id:
+            return None
+        cached = self.users.get(session_id)
+        if cached is None:
+            found = self.storage.get_session(session_key(session_id))
+            user = self.storage.get_user(found[0]) if found else None
+            if user is None:
+                return None
+            cached = ({k: v for k, v in user.items() if k != 'password'}, found[1])
+            self.users.put(session_id, cached, 512)
+        user, expires = cached
+        if time.time() >= expires:
+            self.end(session_id)
+            return None
+        return user
+
+    def end(self, session_id):
+        if session_id:
+            self.storage.delete_session(session_key(session_id))
+            self.users.discard(session_id)
+            self.ended += 1
+
+    def stats(self):
+        return {'created': self.created, 'ended': self.ended, 'cache': self.users.stats()}
+
+
+def session_key(session_id):
+    """What storage keeps instead of the ID itself"""
+    return hashlib.sha256(session_id.encode()).hexdigest()
@@ -0,0 +1,231 @@
+# similarity.py - near-duplicate answer detection
+import hashlib
+import queue
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from background import Background
+
+# Each permutation is a multiply-shift hash of a 64-bit shingle hash:
+# the top 32 bits of (a * x + b) mod 2**64, a odd
+SHIFT = np.uint64(32)
+MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+class MinHasher:
+    """MinHash signatures and LSH band keys for answers.
+
+    Each answer is reduced to its word shingles (runs of `shingle`
+    words) and summarized by a MinHash signature of num_perm values;
+    the fraction of equal values estimates the Jaccard similarity of
+    two answers. Signatures are split into bands, and answers sharing a
+    whole band land in the same bucket.
+
+    Holds only its parameters and a few arrays, so it pickles small and
+    sign() can run in a scoring worker process.
+    """
+
+    def __init__(self, num_perm=64, bands=8, shingle=3, min_words=8):
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle = shingle
+        self.min_words = min_words
+        rng = np.random.default_rng(17)
+        self.a = (rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1))[:, None]
+        self.b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)[:, None]
+        self.band_mix = rng.integers(0, 1 << 63, (self.rows, 1), dtype=np.uint64)
+
+    def minhash(self, texts):
+        """MinHash signature of each text, None for a missing or short one"""
+        results = [None] * len(texts)
+        positions, words = [], []
+        for k, text in enumerate(texts):
+            split = text.lower().split() if text else ()
+            if len(split) >= self.min_words:
+                positions.append(k)
+                words.append(split)
+        if not positions:
+            return results
+
+        # Shingle hashes are combined from per-word hashes over all the
+        # texts' words at once; shingles that would run across two texts
+        # are dropped. Repeats don't change a minimum, so they need no
+        # deduplication.
+        lengths = np.array([len(w) for w in words])
+        flat = [w for split in words for w in split]
+        word_hashes = np.fromiter(map(zlib.crc32, map(str.encode, flat)), dtype=np.uint64, count=len(flat))
+        count = len(flat) - self.shingle + 1
+        shingles = np.zeros(count, dtype=np.uint64)
+        for j in range(self.shingle):
+            shingles = shingles * MIX + word_hashes[j:j + count]
+        text_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        keep = np.ones(count, dtype=bool)
+        for j in range(1, self.shingle):
+            # a shingle starting j words before the next text's start
+            keep[(text_starts[1:] - j)] = False
+        shingles = shingles[keep]
+
+        # Every shingle through every permutation at once, then the
+        # minimum over each text's columns
+        starts = text_starts - np.arange(len(lengths)) * (self.shingle - 1)
+        hashed = (self.a * shingles + self.b) >> SHIFT
+        minima = np.minimum.reduceat(hashed, starts, axis=1).astype(np.uint32).T
+        for k, signature in zip(positions, minima):
+            results[k] = signature
+        return results
+
+    def band_keys(self, topic, question_version, questions, signatures):
+        """One 64-bit key per band of each answer's signature. Keys are
+        salted with the question, so every question has its own buckets,
+        and are the same in every process (unlike hash())."""
+        band_hashes = np.stack(signatures).reshape(-1, self.bands, self.rows).astype(np.uint64) @ self.band_mix
+        salts = np.frombuffer(b''.join(hashlib.blake2b(
+            f'{topic}\0{question_version}\0{question}'.encode(), digest_size=8
+        ).digest() for question in questions), dtype=np.uint64)
+        # SQLite integers are signed
+        keys = (band_hashes.reshape(len(questions), self.bands) ^ salts[:, None]) * MIX
+        return (keys + np.arange(self.bands, dtype=np.uint64)).view(np.int64).tolist()
+
+    def sign(self, topic, question_version, answers):
+        """(signatures, {band key: question index}) for one test's answers.
+
+        signatures holds one num_perm row per answer as bytes; answers
+        too short to index stay zeros and are never looked up, as none
+        of their keys are stored.
+        """
+        rows = self.minhash(answers)
+        questions = [i for i, signature in enumerate(rows) if signature is not None]
+        matrix = np.zeros((len(rows), self.num_perm), dtype=np.uint32)
+        keys = {}
+        if questions:
+            for i in questions:
+                matrix[i] = rows[i]
+            for i, band in zip(questions, self.band_keys(topic, question_version, questions, matrix[questions])):
+                keys.update(dict.fromkeys(band, i))
+        return matrix.tobytes(), keys
+
+
+class AnswerIndex(Background):
+    """MinHash + LSH index over submitted answers, one per question.
+
+    Adding an answer only compares it with the few answers it shares a
+    band with (see MinHasher) instead of the whole archive. A candidate
+    is reported when its estimated similarity reaches threshold and it
+    belongs to a different engineer.
+
+    Signatures, band keys and the pairs found live in storage, so every
+    worker sees the same index and a new worker has nothing to rebuild.
+    Submitting only queues a test; a background thread per worker
+    process (started on the first request after a fork) stores it, and
+    first indexes any submitted test storage doesn't have yet (tests
+    from before the index was kept, or queued in a worker that died).
+    The MinHash work runs in the pool returned by executor (the scoring
+    workers), so it doesn't hold the GIL the request threads need;
+    without one it runs in the thread.
+    """
+
+    def __init__(self, storage, threshold=0.8, executor=None, num_perm=64, bands=8, shingle=3, min_words=8):
+        self.storage = storage
+        self.threshold = threshold
+        self.executor = executor
+        self.hasher = MinHasher(num_perm, bands, shingle, min_words)
+        self.queue = None
+        self.lock = threading.Lock()
+        self.indexed = 0
+        self.comparisons = 0
+
+    def sign(self, tests):
+        """MinHasher.sign() for each test, in the executor's pool if there is one"""
+        args = [[test.topic for test in tests], [test.question_version for test in tests],
+                [test.answers for test in tests]]
+        if self.executor is not None:
+            try:
+                return list(self.executor().map(self.hasher.sign, *args))
+            except Exception as e:
+                print(f"⚠️ Could not sign answers in the scoring pool ({e}); signing inline")
+        return list(map(self.hasher.sign, *args))
+
+    def add(self, tests):
+        """Indexes submitted tests' answers and records new near-duplicates"""
+        signed = self.sign(tests)
+        entries = [(test.id, test.engineer_id, signatures, keys) for test, (signatures, keys) in zip(tests, signed)]
+        signatures = {test.id: np.frombuffer(stored, dtype=np.uint32).reshape(-1, self.hasher.num_perm)
+                      for test, (stored, _) in zip(tests, signed)}
+        pairs = []
+        by_id = {test.id: test for test in tests}
+        for test_id, candidates in self.storage.add_signatures(entries).items():
+            test = by_id[test_id]
+            for i, other, other_engineer, stored in candidates:
+                self.comparisons += 1
+                other_signature = np.frombuffer(stored, dtype=np.uint32).reshape(-1, self.hasher.num_perm)[i]
+                similarity = float(np.mean(other_signature == signatures[test_id][i]))
+                if similarity >= self.threshold:
+                    pairs.append((test_id, i, other, other_engineer, similarity))
+                    pairs.append((other, i, test_id, test.engineer_id, similarity))
+            self.indexed += 1
+        if pairs:
+            self.storage.save_similar(pairs)
+
+    def submit(self, test):
+        """Queues a submitted test for indexing"""
+        self.ensure_running()
+        self.queue.put(test)
+
+    def start_in_process(self):
+        self.queue = queue.Queue()
+        threading.Thread(target=self.run, name='answer-index', daemon=True).start()
+
+    def run(self):
+        self.catch_up(time.time())
+        while True:
+            # Whatever queued up while the last batch was signed and
+            # written goes in one batch
+            tests = [self.queue.get()]
+            while len(tests) < 10:
+                try:
+                    tests.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self.index(tests)
+
+    def catch_up(self, started):
+        """Indexes tests submitted before started that storage has no
+        signatures for (later ones are queued by the worker they were
+        submitted to). A batch at a time, so tests another worker
+        indexes meanwhile are skipped."""
+        failed = set()
+        while True:
+            tests = [t for t in self.storage.unindexed_tests(50 + len(failed), started) if t.id not in failed]
+            if not tests:
+                return
+            failed.update(self.index(tests))
+
+    def index(self, tests):
+        """Indexes tests, one at a time if the batch fails; returns the
+        ids of those that could not be indexed"""
+        try:
+            self.add(tests)
+            return []
+        except Exception as e:
+            if len(tests) > 1:
+                return [test_id for test in tests for test_id in self.index([test])]
+            print(f"⚠️ Could not index answers of {tests[0].id}: {e}")
+            return [tests[0].id]
+
+    def similar(self, test_ids):
+        """{test id: [(question index, other test id, its engineer, similarity)], best first}"""
+        return {
+            test_id: sorted(pairs, key=lambda pair: (-pair[3], pair[0]))
+            for test_id, pairs in self.storage.similar_answers(test_ids).items()
+        }
+
+    def stats(self):
+        return {
+            'queued': self.queue.qsize() if self.queue is not None else 0,
+            'indexed': self.indexed,
+            'comparisons': self.comparisons
+        }
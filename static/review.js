@@ -0,0 +1,53 @@
+// Review page: live score total and final-grade confirmation.
+
+// Calculate total score dynamically
+function updateTotal() {
+    const scoreInputs = document.querySelectorAll('.score-input');
+    let total = 0;
+    
+    scoreInputs.forEach(input => {
+        const value = parseInt(input.value) || 0;
+        total += Math.min(10, Math.max(0, value));
+    });
+    
+    document.getElementById('totalScore').textContent = total + '/180';
+}
+
+// Add event listeners to all score inputs
+document.querySelectorAll('.score-input').forEach(input => {
+    input.addEventListener('input', function() {
+        // Ensure value is between 0-10
+        const value = parseInt(this.value);
+        if (value > 10) this.value = 10;
+        if (value < 0) this.value = 0;
+        
+        updateTotal();
+    });
+});
+
+// Form submission confirmation
+document.getElementById('reviewForm').addEventListener('submit', function(e) {
+    if (!confirm('Are you sure you want to submit these final grades? This action cannot be undone.')) {
+        e.preventDefault();
+        return false;
+    }
+});
+
+// Initial total calculation
+updateTotal();
+
+// In async mode the server says when this test's auto-scores are in
+const scoringNotice = document.getElementById('scoringNotice');
+if (scoringNotice && window.EventSource) {
+    const testId = document.getElementById('reviewForm').dataset.testId;
+    const events = new EventSource('/events');
+    events.addEventListener('scored', function(e) {
+        if (JSON.parse(e.data).test_id !== testId) return;
+        scoringNotice.textContent = '✅ Auto-scores are ready. ';
+        const link = document.createElement('a');
+        link.href = window.location.pathname;
+        link.textContent = 'Refresh to see the suggested scores';
+        scoringNotice.appendChild(link);
+        events.close();
+    });
+}
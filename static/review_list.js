@@ -0,0 +1,33 @@
+// Review list: live notices for new submissions and finished auto-scoring.
+// Only active in async mode; under plain WSGI the event stream answers 204.
+
+const liveNotice = document.getElementById('liveNotice');
+let newSubmissions = 0;
+
+function showNotice(text) {
+    liveNotice.textContent = text + ' ';
+    const link = document.createElement('a');
+    link.href = '/admin/review';
+    link.textContent = 'Reload';
+    liveNotice.appendChild(link);
+    liveNotice.hidden = false;
+}
+
+if (window.EventSource) {
+    const events = new EventSource('/events');
+    
+    events.addEventListener('submission', function(e) {
+        const data = JSON.parse(e.data);
+        newSubmissions += 1;
+        const plural = newSubmissions === 1 ? '' : 's';
+        showNotice(`📥 ${newSubmissions} new submission${plural}, latest from ${data.engineer} (${data.topic.toUpperCase()}).`);
+    });
+    
+    events.addEventListener('scored', function(e) {
+        const card = document.querySelector(`.review-card[data-test-id="${JSON.parse(e.data).test_id}"]`);
+        if (!card) return;
+        card.querySelectorAll('.scoring').forEach(span => {
+            span.textContent = 'scored, reload to see';
+        });
+    });
+}
@@ -0,0 +1,210 @@
+// Assessment page: deadline lock, progress tracking and auto-save.
+// The test id and due time (epoch milliseconds) come from data attributes on the form.
+const assessmentForm = document.getElementById('assessmentForm');
+const dueDate = new Date(Number(assessmentForm.dataset.due));
+const testId = assessmentForm.dataset.testId;
+const draftUrl = `/student/test/${testId}/draft`;
+
+// Deadline checking
+function checkDeadline() {
+    const now = new Date();
+    
+    if (now > dueDate) {
+        alert('⏰ DEADLINE EXCEEDED! This test is now locked. Redirecting to dashboard.');
+        window.location.href = '/student';
+        return;
+    }
+    
+    // Show warning if less than 2 hours remaining
+    const timeLeft = dueDate - now;
+    const hoursLeft = timeLeft / (1000 * 60 * 60);
+    
+    if (hoursLeft <= 2 && hoursLeft > 0) {
+        document.body.style.background = 'linear-gradient(135deg, #dc2626 0%, #991b1b 100%)';
+    }
+}
+
+checkDeadline(); // Initial check
+
+// In async mode the server pushes a warning two hours before the
+// deadline and tells the page when the test expires. Without the event
+// stream (it answers 204, or EventSource is missing) the clock is
+// checked every minute instead.
+function onThisTest(handler) {
+    return event => {
+        if (JSON.parse(event.data).test_id === testId) handler();
+    };
+}
+
+if (window.EventSource) {
+    const events = new EventSource('/events');
+    events.addEventListener('deadline', onThisTest(checkDeadline));
+    events.addEventListener('expired', onThisTest(() => {
+        alert('⏰ DEADLINE EXCEEDED! This test is now locked. Redirecting to dashboard.');
+        window.location.href = '/student';
+    }));
+    events.onerror = () => {
+        if (events.readyState === EventSource.CLOSED) setInterval(checkDeadline, 60000);
+    };
+} else {
+    setInterval(checkDeadline, 60000);
+}
+
+// Character counting and progress tracking
+const textareas = document.querySelectorAll('textarea');
+const progressBar = document.getElementById('progressBar');
+const progressText = document.getElementById('progressText');
+const submitBtn = document.getElementById('submitBtn');
+
+textareas.forEach((textarea, index) => {
+    const counter = document.getElementById(`count_${index}`);
+    
+    textarea.addEventListener('input', function() {
+        const length = this.value.length;
+        counter.textContent = `${length} characters`;
+        
+        // Update progress
+        updateProgress();
+    });
+});
+
+function updateProgress() {
+    const answered = Array.from(textareas).filter(ta => ta.value.trim().length >= 20).length;
+    const percentage = (answered / 18) * 100;
+    
+    progressBar.style.width = percentage + '%';
+    progressText.textContent = `Progress: ${answered}/18 questions answered`;
+    
+    // Enable submit button if at least 15 questions answered
+    submitBtn.disabled = answered < 15;
+    if (answered >= 15) {
+        submitBtn.style.opacity = '1';
+        submitBtn.style.cursor = 'pointer';
+    } else {
+        submitBtn.style.opacity = '0.6';
+        submitBtn.style.cursor = 'not-allowed';
+    }
+}
+
+// Form submission validation
+assessmentForm.addEventListener('submit', function(e) {
+    // Final deadline check
+    const now = new Date();
+    
+    if (now > dueDate) {
+        e.preventDefault();
+        alert('⏰ DEADLINE EXCEEDED! Cannot submit after deadline.');
+        window.location.href = '/student';
+        return false;
+    }
+    
+    const answered = Array.from(textareas).filter(ta => ta.value.trim().length >= 20).length;
+    if (answered < 15) {
+        e.preventDefault();
+        alert('Please answer at least 15 questions (minimum 20 characters each) before submitting.');
+        return false;
+    }
+    
+    if (!confirm('⏰ FINAL SUBMISSION: Are you sure you want to submit? You cannot edit after submission and the deadline is enforced!')) {
+        e.preventDefault();
+        return false;
+    }
+    
+    // The server already has the answers once the last edits are saved
+    // through to storage, so the submit itself only confirms. If saving
+    // fails, or an earlier save hasn't reached storage yet, post everything.
+    e.preventDefault();
+    saveDraft(true).then(saved => {
+        if (saved) {
+            textareas.forEach(ta => { ta.disabled = true; });
+        }
+        assessmentForm.submit();
+    });
+});
+
+// Auto-save: edits are kept in localStorage straight away and sent to
+// the server in batches, once typing pauses for DRAFT_DELAY ms (or at
+// least every DRAFT_MAX_WAIT ms while it doesn't). Each edit carries
+// the time it was typed, so the server can put saves that reach
+// different workers back in order.
+const DRAFT_DELAY = 1500;
+const DRAFT_MAX_WAIT = 10000;
+const saveStatus = document.getElementById('saveStatus');
+const dirty = new Set();
+const editedAt = new Map();
+let draftTimer = null;
+let firstDirtyAt = 0;
+
+function draftEdits() {
+    const edits = Array.from(dirty, index => [index, textareas[index].value, editedAt.get(index)]);
+    dirty.clear();
+    firstDirtyAt = 0;
+    return edits;
+}
+
+// The final save (before submitting) is written straight to storage and
+// resolves to true only if storage then has every edit made on this page
+function saveDraft(final = false) {
+    clearTimeout(draftTimer);
+    if (!dirty.size && !final) {
+        return Promise.resolve(true);
+    }
+    const edits = draftEdits();
+    const body = final ? {answers: edits, flush: true, expect: Array.from(editedAt)} : {answers: edits};
+    saveStatus.textContent = 'Saving…';
+    return fetch(draftUrl, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(body),
+        credentials: 'same-origin'
+    }).then(response => {
+        if (!response.ok) {
+            throw new Error(response.status);
+        }
+        return response.json();
+    }).then(result => {
+        saveStatus.textContent = 'Saved';
+        return !(result.missing && result.missing.length);
+    }).catch(() => {
+        // Keep the edits for the next attempt
+        edits.forEach(([index]) => dirty.add(index));
+        saveStatus.textContent = 'Not saved - retrying';
+        draftTimer = setTimeout(saveDraft, DRAFT_MAX_WAIT);
+        return false;
+    });
+}
+
+textareas.forEach((textarea, index) => {
+    const key = `test_${testId}_answer_${index}`;
+    // The server copy wins; localStorage only fills answers it doesn't have
+    if (!textarea.value) {
+        textarea.value = localStorage.getItem(key) || '';
+        if (textarea.value) {
+            dirty.add(index);
+            editedAt.set(index, Date.now());
+        }
+    }
+    document.getElementById(`count_${index}`).textContent = `${textarea.value.length} characters`;
+    
+    textarea.addEventListener('input', function() {
+        localStorage.setItem(key, this.value);
+        dirty.add(index);
+        editedAt.set(index, Date.now());
+        firstDirtyAt = firstDirtyAt || Date.now();
+        clearTimeout(draftTimer);
+        const wait = Math.max(0, Math.min(DRAFT_DELAY, firstDirtyAt + DRAFT_MAX_WAIT - Date.now()));
+        draftTimer = setTimeout(saveDraft, wait);
+    });
+});
+
+// Send whatever is left when the page goes away
+window.addEventListener('pagehide', () => {
+    if (dirty.size) {
+        const body = new Blob([JSON.stringify({answers: draftEdits()})], {type: 'application/json'});
+        navigator.sendBeacon(draftUrl, body);
+    }
+});
+saveDraft();
+
+// Initial progress update
+updateProgress();
@@ -0,0 +1,668 @@
+# storage.py - persistence for users and assessments
+import copy
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import threading
+from collections import deque
+
+from models import Assignment, is_older
+
+# Newest events kept for event streams to catch up from (see publish_events)
+EVENT_LOG_SIZE = 1000
+
+
+class MemoryStorage:
+    """Keeps everything in process memory; lost on restart.
+
+    Tests are also indexed by engineer and by status, so dashboard
+    queries touch only the tests they return. The status index is
+    keyed off the status recorded at the last save/update.
+
+    Updates are copy-on-write: the changed test replaces the stored
+    one, so a test handed to a reader never changes under it, the same
+    as a row read from SQLite. Callers must copy a test before editing
+    it in place.
+    """
+
+    def __init__(self):
+        self.users = {}
+        self.tests = {}
+        self.by_engineer = {}
+        self.by_status = {}
+        self.indexed_status = {}
+        self.counter = 0
+        self.events = deque(maxlen=EVENT_LOG_SIZE)
+        self.event_counter = 0
+        self.sessions = {}
+        self.signatures = {}
+        self.bands = {}
+        self.similar = {}
+        self.lock = threading.Lock()
+
+    def get_user(self, user_id):
+        return self.users.get(user_id)
+
+    def save_user(self, user):
+        self.users[user['id']] = user
+
+    def list_users(self):
+        return list(self.users.values())
+
+    def next_test_number(self):
+        return self.reserve_test_numbers(1)[0]
+
+    def reserve_test_numbers(self, count):
+        """A block of count consecutive test numbers, as a range"""
+        with self.lock:
+            self.counter += count
+            return range(self.counter - count + 1, self.counter + 1)
+
+    def get_test(self, test_id):
+        return self.tests.get(test_id)
+
+    def index_status(self, test):
+        old = self.indexed_status.get(test.id)
+        if old != test.status:
+            if old is not None:
+                del self.by_status[old][test.id]
+            self.by_status.setdefault(test.status, {})[test.id] = test
+            self.indexed_status[test.id] = test.status
+
+    def save_test(self, test):
+        self.save_tests([test])
+
+    def save_tests(self, tests):
+        with self.lock:
+            for test in tests:
+                previous = self.tests.get(test.id)
+                if previous is not None and previous.engineer_id != test.engineer_id:
+                    del self.by_engineer[previous.engineer_id][test.id]
+                self.tests[test.id] = test
+                self.by_engineer.setdefault(test.engineer_id, {})[test.id] = test
+                self.index_status(test)
+                self.by_status[test.status][test.id] = test
+
+    def update_test(self, test_id, **fields):
+        """Applies field changes to one test and bumps its revision.
+
+        Returns the updated test, or None if it doesn't exist.
+        """
+        with self.lock:
+            test = self.tests.get(test_id)
+            if test is None:
+                return None
+            return self.replace(test, fields)
+
+    def transition_test(self, test_id, from_status, expected_revision=None, **fields):
+        """update_test, but only while the test is still in from_status
+        (and, with expected_revision, unchanged since that revision).
+
+        Returns the updated test, or None if it is missing or has moved on.
+        """
+        with self.lock:
+            test = self.tests.get(test_id)
+            if test is None or self.indexed_status.get(test_id) != from_status:
+                return None
+            if expected_revision is not None and test.revision != expected_revision:
+                return None
+            return self.replace(test, fields)
+
+    def merge_answers(self, test_id, edits, scores=None):
+        """Applies {question index: text} to a pending test's answers.
+
+        scores, if given, maps indexes to (score, reasoning, answer hash)
+        for the new text. Returns the updated test, or None if it is
+        missing or no longer pending.
+        """
+        with self.lock:
+            test = self.tests.get(test_id)
+            if test is None or self.indexed_status.get(test_id) != 'pending':
+                return None
+            return self.replace(test, draft_fields(test, edits, scores))
+
+    def replace(self, test, fields):
+        """Stores a copy of test with fields applied; call with the lock held"""
+        updated = copy.copy(test)
+        apply_fields(updated, fields)
+        self.tests[test.id] = updated
+        self.by_engineer[test.engineer_id][test.id] = updated
+        self.index_status(updated)
+        self.by_status[updated.status][test.id] = updated
+        return updated
+
+    def list_deadlines(self, status='pending'):
+        """(test_id, due) for every test in the given status"""
+        return [(t.id, t.due) for t in list(self.by_status.get(status, {}).values())]
+
+    def list_tests(self, engineer_id=None, status=None):
+        # Start from the smaller index; list() snapshots it so concurrent
+        # writes can't break the scan
+        if engineer_id is not None:
+            tests = list(self.by_engineer.get(engineer_id, {}).values())
+            if status is not None:
+                tests = [t for t in tests if t.status == status]
+            return tests
+        if status is not None:
+            return list(self.by_status.get(status, {}).values())
+        return list(self.tests.values())
+
+    def count_tests(self, status=None):
+        if status is None:
+            return len(self.tests)
+        return len(self.by_status.get(status, ()))
+
+    def size_bytes(self, sample=200):
+        """Heap held by the test records, extrapolated from an even sample"""
+        tests = list(self.tests.values())
+        if not tests:
+            return 0
+        picked = tests[::max(1, len(tests) // sample)]
+        return sum(map(record_bytes, picked)) * len(tests) // len(picked)
+
+    def publish_events(self, events):
+        """Appends (audience, kind, data) events to the event log"""
+        with self.lock:
+            for audience, kind, data in events:
+                self.event_counter += 1
+                self.events.append((self.event_counter, audience, kind, data))
+
+    def events_after(self, event_id, limit=EVENT_LOG_SIZE):
+        """[(id, audience, kind, data)] published after event_id, oldest first"""
+        with self.lock:
+            if not self.events:
+                return []
+            # ids are consecutive, so the position follows from the first id
+            start = max(0, event_id - self.events[0][0] + 1)
+            return list(itertools.islice(self.events, start, start + limit))
+
+    def last_event_id(self):
+        return self.event_counter
+
+    def save_session(self, key, user_id, expires):
+        self.sessions[key] = (user_id, expires)
+
+    def get_session(self, key):
+        """(user id, expires) for a session key, or None"""
+        return self.sessions.get(key)
+
+    def delete_session(self, key):
+        self.sessions.pop(key, None)
+
+    def delete_expired_sessions(self, now):
+        for key, (_, expires) in list(self.sessions.items()):
+            if expires <= now:
+                self.sessions.pop(key, None)
+
+    def add_signatures(self, tests):
+        """Stores tests' answer signatures with their band keys.
+
+        tests are (test id, engineer id, signatures bytes, {band key:
+        question index}). Returns {test id: [(question index, other
+        test id, its engineer, its signatures bytes)]}, one entry per
+        answer of another engineer sharing a band with one of the
+        test's; tests that were already added are left out.
+        """
+        with self.lock:
+            added = []
+            for test_id, engineer_id, signatures, keys in tests:
+                if test_id in self.signatures:
+                    continue
+                self.signatures[test_id] = (engineer_id, signatures)
+                for key in keys:
+                    self.bands.setdefault(key, []).append(test_id)
+                added.append((test_id, engineer_id, keys))
+            candidates = {}
+            for test_id, engineer_id, keys in added:
+                found = candidates[test_id] = {}
+                for key, question in keys.items():
+                    for other in self.bands[key]:
+                        owner, signatures = self.signatures[other]
+                        if owner != engineer_id:
+                            found[(question, other)] = (question, other, owner, signatures)
+            return {test_id: list(found.values()) for test_id, found in candidates.items()}
+
+    def save_similar(self, pairs):
+        """Records (test id, question index, other test id, its engineer, similarity) pairs"""
+        with self.lock:
+            for test_id, *pair in pairs:
+                self.similar.setdefault(test_id, []).append(tuple(pair))
+
+    def similar_answers(self, test_ids):
+        """{test id: [(question index, other test id, its engineer, similarity)]}"""
+        return {test_id: list(self.similar.get(test_id, ())) for test_id in test_ids}
+
+    def unindexed_tests(self, limit, submitted_before):
+        """Up to limit submitted or graded tests with no stored
+        signatures, submitted before the given time"""
+        tests = []
+        for status in ('submitted', 'completed'):
+            for test in list(self.by_status.get(status, {}).values()):
+                if test.id not in self.signatures and (test.submitted_date or 0) < submitted_before:
+                    tests.append(test)
+                    if len(tests) == limit:
+                        return tests
+        return tests
+
+
+class SQLiteStorage:
+    """Durable storage in a single SQLite file.
+
+    Runs in WAL mode so page reads never wait on a submission being
+    written. Each thread (and each forked worker) gets its own
+    connection; the fixed SQL below is compiled once per connection by
+    sqlite3's statement cache.
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS tests (
+            id TEXT PRIMARY KEY,
+            engineer_id TEXT NOT NULL,
+            status TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS tests_engineer_id ON tests (engineer_id);
+        CREATE INDEX IF NOT EXISTS tests_status ON tests (status);
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            audience TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS sessions (
+            key TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            expires REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires);
+        CREATE TABLE IF NOT EXISTS answer_signatures (
+            test_id TEXT PRIMARY KEY,
+            engineer_id TEXT NOT NULL,
+            signatures BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS answer_bands (
+            key INTEGER NOT NULL,
+            test_id TEXT NOT NULL,
+            PRIMARY KEY (key, test_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS similar_answers (
+            test_id TEXT NOT NULL,
+            question INTEGER NOT NULL,
+            other_id TEXT NOT NULL,
+            other_engineer TEXT NOT NULL,
+            similarity REAL NOT NULL,
+            PRIMARY KEY (test_id, question, other_id)
+        ) WITHOUT ROWID;
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.connect().executescript(self.SCHEMA)
+
+    def connect(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None,
+                                   cached_statements=64)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def get_user(self, user_id):
+        row = self.connect().execute(
+            'SELECT data FROM users WHERE id = ?', (user_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_user(self, user):
+        self.connect().execute(
+            'INSERT OR REPLACE INTO users (id, data) VALUES (?, ?)',
+            (user['id'], json.dumps(user))
+        )
+
+    def list_users(self):
+        rows = self.connect().execute('SELECT data FROM users ORDER BY rowid')
+        return [json.loads(data) for data, in rows]
+
+    def next_test_number(self):
+        return self.reserve_test_numbers(1)[0]
+
+    def reserve_test_numbers(self, count):
+        """A block of count consecutive test numbers, as a range.
+
+        The counter row is bumped by count in one write transaction, so
+        workers reserving at the same time get disjoint blocks.
+        """
+        conn = self.connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                "INSERT INTO counters (name, value) VALUES ('tests', ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                (count,)
+            )
+            last = conn.execute("SELECT value FROM counters WHERE name = 'tests'").fetchone()[0]
+        return range(last - count + 1, last + 1)
+
+    def get_test(self, test_id):
+        row = self.connect().execute(
+            'SELECT data FROM tests WHERE id = ?', (test_id,)
+        ).fetchone()
+        return Assignment.from_dict(json.loads(row[0])) if row else None
+
+    def save_test(self, test):
+        self.connect().execute(
+            'INSERT OR REPLACE INTO tests (id, engineer_id, status, data) VALUES (?, ?, ?, ?)',
+            (test.id, test.engineer_id, test.status, json.dumps(test.to_dict()))
+        )
+
+    def save_tests(self, tests):
+        """Saves several tests in one transaction"""
+        conn = self.connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(
+                'INSERT OR REPLACE INTO tests (id, engineer_id, status, data) VALUES (?, ?, ?, ?)',
+                [(test.id, test.engineer_id, test.status, json.dumps(test.to_dict())) for test in tests]
+            )
+
+    def update_test(self, test_id, **fields):
+        """Applies field changes to one test and bumps its revision.
+
+        Returns the updated test, or None if it doesn't exist.
+        """
+        conn = self.connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT data FROM tests WHERE id = ?', (test_id,)).fetchone()
+            if row is None:
+                return None
+            test = Assignment.from_dict(json.loads(row[0]))
+            apply_fields(test, fields)
+            conn.execute(
+                'UPDATE tests SET status = ?, data = ? WHERE id = ?',
+                (test.status, json.dumps(test.to_dict()), test_id)
+            )
+            return test
+
+    def transition_test(self, test_id, from_status, expected_revision=None, **fields):
+        """update_test, but only while the test is still in from_status
+        (and, with expected_revision, unchanged since that revision).
+
+        Returns the updated test, or None if it is missing or has moved on.
+        """
+        conn = self.connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT data FROM tests WHERE id = ? AND status = ?', (test_id, from_status)
+            ).fetchone()
+            if row is None:
+                return None
+            test = Assignment.from_dict(json.loads(row[0]))
+            if expected_revision is not None and test.revision != expected_revision:
+                return None
+            apply_fields(test, fields)
+            conn.execute(
+                'UPDATE tests SET status = ?, data = ? WHERE id = ?',
+                (test.status, json.dumps(test.to_dict()), test_id)
+            )
+            return test
+
+    def merge_answers(self, test_id, edits, scores=None):
+        """Applies {question index: text} to a pending test's answers.
+
+        scores, if given, maps indexes to (score, reasoning, answer hash)
+        for the new text. Returns the updated test, or None if it is
+        missing or no longer pending.
+        """
+        conn = self.connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                "SELECT data FROM tests WHERE id = ? AND status = 'pending'", (test_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            test = Assignment.from_dict(json.loads(row[0]))
+            apply_fields(test, draft_fields(test, edits, scores))
+            conn.execute(
+                'UPDATE tests SET data = ? WHERE id = ?', (json.dumps(test.to_dict()), test_id)
+            )
+            return test
+
+    def list_deadlines(self, status='pending'):
+        """(test_id, due) for every test in the given status"""
+        rows = self.connect().execute(
+            "SELECT id, json_extract(data, '$.due') FROM tests WHERE status = ?", (status,)
+        )
+        return rows.fetchall()
+
+    def list_tests(self, engineer_id=None, status=None):
+        conn = self.connect()
+        if engineer_id is not None and status is not None:
+            rows = conn.execute(
+                'SELECT data FROM tests WHERE engineer_id = ? AND status = ? ORDER BY rowid',
+                (engineer_id, status)
+            )
+        elif engineer_id is not None:
+            rows = conn.execute(
+                'SELECT data FROM tests WHERE engineer_id = ? ORDER BY rowid', (engineer_id,)
+            )
+        elif status is not None:
+            rows = conn.execute(
+                'SELECT data FROM tests WHERE status = ? ORDER BY rowid', (status,)
+            )
+        else:
+            rows = conn.execute('SELECT data FROM tests ORDER BY rowid')
+        return [Assignment.from_dict(json.loads(data)) for data, in rows]
+
+    def count_tests(self, status=None):
+        conn = self.connect()
+        if status is None:
+            return conn.execute('SELECT COUNT(*) FROM tests').fetchone()[0]
+        return conn.execute(
+            'SELECT COUNT(*) FROM tests WHERE status = ?', (status,)
+        ).fetchone()[0]
+
+    def size_bytes(self):
+        """Bytes of stored test records (their JSON)"""
+        return self.connect().execute('SELECT COALESCE(SUM(LENGTH(data)), 0) FROM tests').fetchone()[0]
+
+    def publish_events(self, events):
+        """Appends (audience, kind, data) events to the event log.
+
+        Every worker's event hub reads the log, so an event reaches a
+        user's stream whichever worker it was published in. Only the
+        newest EVENT_LOG_SIZE are kept.
+        """
+        conn = self.connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(
+                'INSERT INTO events (audience, kind, data) VALUES (?, ?, ?)',
+                [(audience, kind, json.dumps(data)) for audience, kind, data in events]
+            )
+            conn.execute(
+                'DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?', (EVENT_LOG_SIZE,)
+            )
+
+    def events_after(self, event_id, limit=EVENT_LOG_SIZE):
+        """[(id, audience, kind, data)] published after event_id, oldest first"""
+        rows = self.connect().execute(
+            'SELECT id, audience, kind, data FROM events WHERE id > ? ORDER BY id LIMIT ?',
+            (event_id, limit)
+        )
+        return [(event_id, audience, kind, json.loads(data)) for event_id, audience, kind, data in rows]
+
+    def last_event_id(self):
+        return self.connect().execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+
+    def save_session(self, key, user_id, expires):
+        self.connect().execute(
+            'INSERT OR REPLACE INTO sessions (key, user_id, expires) VALUES (?, ?, ?)',
+            (key, user_id, expires)
+        )
+
+    def get_session(self, key):
+        """(user id, expires) for a session key, or None"""
+        row = self.connect().execute(
+            'SELECT user_id, expires FROM sessions WHERE key = ?', (key,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def delete_session(self, key):
+        self.connect().execute('DELETE FROM sessions WHERE key = ?', (key,))
+
+    def delete_expired_sessions(self, now):
+        self.connect().execute('DELETE FROM sessions WHERE expires <= ?', (now,))
+
+    def add_signatures(self, tests):
+        """Stores tests' answer signatures with their band keys.
+
+        tests are (test id, engineer id, signatures bytes, {band key:
+        question index}). Returns {test id: [(question index, other
+        test id, its engineer, its signatures bytes)]}, one entry per
+        answer of another engineer sharing a band with one of the
+        test's; tests that were already added are left out.
+
+        The rows are committed before the lookups, which then run
+        outside the write lock: of two similar tests added at once, the
+        one that looks second always finds the other.
+        """
+        conn = self.connect()
+        added = []
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            for test_id, engineer_id, signatures, keys in tests:
+                if conn.execute(
+                    'INSERT OR IGNORE INTO answer_signatures (test_id, engineer_id, signatures) VALUES (?, ?, ?)',
+                    (test_id, engineer_id, signatures)
+                ).rowcount:
+                    added.append((test_id, engineer_id, keys))
+            conn.executemany(
+                'INSERT INTO answer_bands (key, test_id) VALUES (?, ?)',
+                [(key, test_id) for test_id, _, keys in added for key in keys]
+            )
+        candidates = {}
+        for test_id, engineer_id, keys in added:
+            found = candidates[test_id] = {}
+            band_keys = list(keys)
+            # In chunks, to stay under SQLite's limit on bound parameters
+            for n in range(0, len(band_keys), 500):
+                chunk = band_keys[n:n + 500]
+                rows = conn.execute(
+                    'SELECT b.key, b.test_id, s.engineer_id, s.signatures FROM answer_bands b '
+                    'JOIN answer_signatures s ON s.test_id = b.test_id '
+                    f'WHERE b.key IN ({",".join("?" * len(chunk))}) AND s.engineer_id != ?',
+                    chunk + [engineer_id]
+                )
+                for key, other, owner, signatures in rows:
+                    found[(keys[key], other)] = (keys[key], other, owner, signatures)
+        return {test_id: list(found.values()) for test_id, found in candidates.items()}
+
+    def save_similar(self, pairs):
+        """Records (test id, question index, other test id, its engineer, similarity) pairs"""
+        conn = self.connect()
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO similar_answers (test_id, question, other_id, other_engineer, similarity) '
+                'VALUES (?, ?, ?, ?, ?)',
+                pairs
+            )
+
+    def similar_answers(self, test_ids):
+        """{test id: [(question index, other test id, its engineer, similarity)]}"""
+        similar = {test_id: [] for test_id in test_ids}
+        ids = list(similar)
+        for n in range(0, len(ids), 500):
+            chunk = ids[n:n + 500]
+            rows = self.connect().execute(
+                'SELECT test_id, question, other_id, other_engineer, similarity FROM similar_answers '
+                f'WHERE test_id IN ({",".join("?" * len(chunk))})',
+                chunk
+            )
+            for test_id, *pair in rows:
+                similar[test_id].append(tuple(pair))
+        return similar
+
+    def unindexed_tests(self, limit, submitted_before):
+        """Up to limit submitted or graded tests with no stored
+        signatures, submitted before the given time"""
+        rows = self.connect().execute(
+            "SELECT data FROM tests WHERE status IN ('submitted', 'completed') "
+            "AND COALESCE(json_extract(data, '$.submitted_date'), 0) < ? "
+            'AND id NOT IN (SELECT test_id FROM answer_signatures) ORDER BY rowid LIMIT ?',
+            (submitted_before, limit)
+        )
+        return [Assignment.from_dict(json.loads(data)) for data, in rows]
+
+
+def apply_fields(test, fields):
+    """Sets the given fields on a test and bumps its revision"""
+    for name, value in fields.items():
+        setattr(test, name, value)
+    test.revision += 1
+
+
+def record_bytes(test):
+    """Approximate heap size of one Assignment with its lists and their items"""
+    size = sys.getsizeof(test)
+    for name in test.__slots__:
+        value = getattr(test, name)
+        if isinstance(value, list):
+            size += sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value if item is not None)
+        elif isinstance(value, (str, float)):
+            size += sys.getsizeof(value)
+    return size
+
+
+def draft_fields(test, edits, scores=None):
+    """Fields for a pending test with draft edits (and their scores) applied.
+
+    edits maps question indexes to (text, edited at). An edit older than
+    the one the test already has for its question is dropped, and one
+    that leaves the text as it was keeps that text's score.
+    """
+    count = len(test.answers)
+    answers = list(test.answers)
+    edited_at = list(test.edited_at or [None] * count)
+    auto_scores = list(test.auto_scores or [None] * count)
+    reasoning = list(test.reasoning or [None] * count)
+    hashes = list(test.scored_hashes or [None] * count)
+    for index, (text, at) in edits.items():
+        if is_older(at, edited_at[index]):
+            continue
+        if at is not None:
+            edited_at[index] = at
+        if text == answers[index] and index not in (scores or {}):
+            continue
+        answers[index] = text
+        score = (scores or {}).get(index, (None, None, None))
+        auto_scores[index], reasoning[index], hashes[index] = score
+    fields = {'answers': answers, 'edited_at': edited_at}
+    if scores is not None:
+        fields.update(auto_scores=auto_scores, reasoning=reasoning, scored_hashes=hashes)
+    return fields
+
+
+def open_storage(backend, path=None):
+    """Creates the storage backend named by STORAGE_BACKEND"""
+    if backend == 'memory':
+        return MemoryStorage()
+    if backend == 'sqlite':
+        return SQLiteStorage(path)
+    raise ValueError(f"Unknown storage backend: {backend}")
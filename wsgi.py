@@ -0,0 +1,5 @@
+# wsgi.py - production entry point (gunicorn -c gunicorn.conf.py wsgi:app)
+from app import app, init_data
+
+# Seed accounts once; with preload_app this runs in the master before forking
+init_data()